@@ -1,13 +1,79 @@
 
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_chroma import Chroma
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from app.core.config import settings
+from app.core.embeddings import BatchingEmbeddings, DiskEmbeddingCache
+from app.core.lazy import Lazy
+from app.core.metrics import register_collector
+from app.utils.lru import TTLCache
 
-embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-mpnet-base-v2")
+# sentence-transformers and chromadb are imported only when first needed
+def _load_embedding_model():
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL)
 
-# Initialize ChromaDB client
-collection =Chroma(
-    collection_name="resumes",
-    persist_directory="./chroma_db",
-    embedding_function=embeddings
-)
\ No newline at end of file
+def _load_client():
+    import chromadb
+    return chromadb.PersistentClient(path="./chroma_db")
+
+# Shared embedding service: micro-batches concurrent requests on its own thread and memoizes by text hash
+embeddings = BatchingEmbeddings(
+    Lazy(_load_embedding_model, "embedding_model"),
+    max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+    max_wait_ms=settings.EMBEDDING_MAX_WAIT_MS,
+    cache_size=settings.EMBEDDING_CACHE_SIZE,
+    disk_cache=DiskEmbeddingCache(settings.EMBEDDING_CACHE_PATH, settings.EMBEDDING_DISK_CACHE_MAX_ENTRIES) if settings.EMBEDDING_CACHE_PATH else None,
+)
+register_collector("embeddings", embeddings.stats)
+
+# Initialize ChromaDB client; collections are picked per user by app.vector_db.tenancy
+client = Lazy(_load_client, "chroma")
+
+# name -> langchain Chroma store; per-user layouts have far more collections than are hot
+_stores = TTLCache(settings.CHROMA_COLLECTION_CACHE_SIZE)
+# name -> chromadb collection, for reads the langchain store has no public API for
+_collections = TTLCache(settings.CHROMA_COLLECTION_CACHE_SIZE)
+
+
+def get_collection(name: str):
+    # Created on first use, for writes
+    store = _stores.get(name)
+    if store is None:
+        from langchain_chroma import Chroma
+        store = Chroma(client=client.get(), collection_name=name, embedding_function=embeddings)
+        _stores.set(name, store)
+    return store
+
+
+def find_chroma_collection(name: str):
+    # Reads never create collections: None when nothing was indexed there yet
+    collection = _collections.get(name)
+    if collection is None:
+        from chromadb.errors import NotFoundError
+        try:
+            collection = client.get().get_collection(name)
+        except NotFoundError:
+            return None
+        _collections.set(name, collection)
+    return collection
+
+
+def find_collection(name: str):
+    # The langchain store over an existing collection, or None
+    store = _stores.get(name)
+    if store is not None:
+        return store
+    if find_chroma_collection(name) is None:
+        return None
+    return get_collection(name)
+
+# Chroma and the embedding model are blocking; run them on a bounded pool off the event loop
+chroma_executor = ThreadPoolExecutor(max_workers=settings.CHROMA_MAX_WORKERS, thread_name_prefix="chroma")
+
+async def run_in_chroma(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    # run_in_executor does not carry context variables over; spans inside need the request's
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(chroma_executor, partial(context.run, fn, *args, **kwargs))
\ No newline at end of file
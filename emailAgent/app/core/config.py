@@ -1,13 +1,83 @@
+import os
 from pydantic_settings import BaseSettings
 from typing import Optional
 
 class Settings(BaseSettings):
     GROQ_API_KEY: str
     MONGODB_URL: str
+    MONGODB_DATABASE: str = "emailagent"
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1000
     CHROMA_HUGGINGFACE_API_KEY: str
+    PRELOAD_RESOURCES: bool = False
+    JOB_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    JOB_CACHE_MAX_ENTRIES: int = 1024
+    SCRAPER_TIMEOUT_SECONDS: float = 15.0
+    SCRAPER_MAX_CONNECTIONS: int = 200
+    SCRAPER_MAX_BYTES: int = 5 * 1024 * 1024
+    SCRAPER_CACHE_MAX_ENTRIES: int = 512
+    SCRAPER_CACHE_TTL_SECONDS: int = 6 * 60 * 60
+    CHROMA_MAX_WORKERS: int = 8
+    CHROMA_TENANCY: str = "shared"
+    CHROMA_SHARDS: int = 16
+    CHROMA_COLLECTION_CACHE_SIZE: int = 1024
+    RETRIEVAL_BACKEND: str = "chroma"
+    RETRIEVAL_DTYPE: str = "float32"
+    RETRIEVAL_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    RETRIEVAL_CACHE_TTL_SECONDS: int = 10 * 60
+    EMBEDDING_MODEL: str = "sentence-transformers/all-mpnet-base-v2"
+    EMBEDDING_MAX_BATCH_SIZE: int = 32
+    EMBEDDING_MAX_WAIT_MS: float = 5.0
+    EMBEDDING_CACHE_SIZE: int = 10000
+    EMBEDDING_CACHE_PATH: Optional[str] = "./embedding_cache.sqlite3"
+    EMBEDDING_DISK_CACHE_MAX_ENTRIES: int = 200000
+    BATCH_MAX_URLS: int = 50
+    BATCH_FETCH_CONCURRENCY: int = 10
+    BATCH_PER_HOST_CONCURRENCY: int = 2
+    BATCH_HOST_DELAY_SECONDS: float = 0.5
+    BATCH_GENERATION_CONCURRENCY: int = 5
+    RESUME_WORKERS: int = 2
+    RESUME_JOB_MAX_ATTEMPTS: int = 3
+    RESUME_JOB_RETRY_BACKOFF_SECONDS: float = 5.0
+    RESUME_JOB_TIMEOUT_SECONDS: int = 300
+    RESUME_JOB_POLL_SECONDS: float = 2.0
+    PDF_MAX_BYTES: int = 10 * 1024 * 1024
+    PDF_MAX_PAGES: int = 50
+    PDF_TIMEOUT_SECONDS: float = 60.0
+    PDF_WORKERS: int = max(1, min(4, os.cpu_count() or 1))
+    PDF_PARALLEL_MIN_PAGES: int = 4
+    PDF_TEXT_CACHE_PERSIST: bool = True
+    PDF_TEXT_CACHE_TTL_SECONDS: int = 30 * 24 * 60 * 60
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    PASSWORD_HASH_PER_KEY_LIMIT: int = 2
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    PROMPT_TOKEN_ENCODING: str = "cl100k_base"
+    STRUCTURING_PROMPT_TOKEN_BUDGET: int = 6000
+    EMAIL_PROMPT_TOKEN_BUDGET: int = 3000
+    LLM_MODEL: str = "llama-3.3-70b-versatile"
+    GROQ_BASE_URL: Optional[str] = None
+    LLM_MAX_CONNECTIONS: int = 50
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_REQUEST_TIMEOUT_SECONDS: float = 30.0
+    LLM_DEADLINE_SECONDS: float = 60.0
+    LLM_MAX_ATTEMPTS: int = 3
+    LLM_RETRY_BACKOFF_SECONDS: float = 0.5
+    LLM_RETRY_BACKOFF_MAX_SECONDS: float = 8.0
+    LLM_HEDGING: bool = False
+    LLM_HEDGE_PERCENTILE: float = 0.95
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 1.0
+    LLM_BREAKER_FAILURES: int = 5
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    LLM_CACHE_MEMORY_ENTRIES: int = 1024
+    LLM_CACHE_ALLOW_BYPASS: bool = False
+    SERVER_TIMING_ENABLED: bool = False
     class Config:
         env_file = ".env"
 
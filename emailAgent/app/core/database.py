@@ -1,9 +1,27 @@
-from pymongo import MongoClient
+from gridfs import AsyncGridFSBucket, GridFSBucket
+from pymongo import AsyncMongoClient, MongoClient
 from app.core.config import settings
+from app.core.lazy import Lazy
 
-# MongoDB connection
-client = MongoClient(settings.MONGODB_URL)
-db = client.emailagent
+# MongoDB connection, created on first use
+client = Lazy(lambda: MongoClient(settings.MONGODB_URL), "mongo")
+db = Lazy(lambda: client.get()[settings.MONGODB_DATABASE])
+
+# Async connection for the request path (shares no state with the sync client)
+async_client = Lazy(lambda: AsyncMongoClient(settings.MONGODB_URL), "mongo_async")
+async_db = Lazy(lambda: async_client.get()[settings.MONGODB_DATABASE])
 
 # Collections
-users_collection = db.users
\ No newline at end of file
+users_collection = Lazy(lambda: db.get().users)
+async_users_collection = Lazy(lambda: async_db.get().users)
+job_cache_collection = Lazy(lambda: async_db.get().job_cache)
+resume_jobs_collection = Lazy(lambda: db.get().resume_jobs)
+async_resume_jobs_collection = Lazy(lambda: async_db.get().resume_jobs)
+resume_job_locks_collection = Lazy(lambda: async_db.get().resume_job_locks)
+pdf_text_cache_collection = Lazy(lambda: db.get().pdf_text_cache)
+llm_cache_collection = Lazy(lambda: db.get().llm_cache)
+async_llm_cache_collection = Lazy(lambda: async_db.get().llm_cache)
+
+# Uploaded resume PDFs waiting for a worker; kept out of the job documents (16MB limit)
+resume_uploads_bucket = Lazy(lambda: GridFSBucket(db.get(), bucket_name="resume_uploads"))
+async_resume_uploads_bucket = Lazy(lambda: AsyncGridFSBucket(async_db.get(), bucket_name="resume_uploads"))
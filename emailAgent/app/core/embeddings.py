@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import Future
+from typing import Optional
+from langchain_core.embeddings import Embeddings
+from app.utils.lru import TTLCache
+
+logger = logging.getLogger(__name__)
+
+SQLITE_BUSY_TIMEOUT_SECONDS = 5.0
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class DiskEmbeddingCache:
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first use, with self._lock held: processes that import this module but never
+        # embed anything (resume workers, CLI tools) don't touch the file
+        if self._conn is None:
+            # Every app process shares the file; wait for its lock instead of failing
+            conn = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[list[float]]:
+        with self._lock:
+            row = self._connection().execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        vector = array("f")
+        vector.frombytes(row[0])
+        return vector.tolist()
+
+    def set_many(self, items: list[tuple[str, list[float]]]):
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, array("f", vector).tobytes()) for key, vector in items],
+            )
+            self._writes += len(items)
+            # Trim the oldest rows now and then rather than counting on every write
+            if self._writes >= 1000:
+                self._writes = 0
+                conn.execute(
+                    "DELETE FROM embeddings WHERE rowid <= (SELECT MAX(rowid) FROM embeddings) - ?",
+                    (self.max_entries,),
+                )
+            conn.commit()
+
+
+class BatchingEmbeddings(Embeddings):
+    # Coalesces concurrent embed calls into batches run on one model thread, memoized by text hash
+    def __init__(self, model, max_batch_size: int, max_wait_ms: float, cache_size: int, disk_cache: Optional[DiskEmbeddingCache] = None):
+        # Anything with embed_documents; a Lazy defers loading the model to the first batch
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.disk_cache = disk_cache
+        self._memory = TTLCache(cache_size)
+        self._queue = queue.Queue()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._counters = {"texts": 0, "memory_hits": 0, "disk_hits": 0, "coalesced": 0, "batches": 0, "embedded": 0, "errors": 0}
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+            self._thread.start()
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _lookup(self, key: str) -> Optional[list[float]]:
+        # Called without self._lock: a disk read must not hold up other callers or the batcher
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._count("memory_hits")
+            return vector
+        if self.disk_cache is not None:
+            try:
+                vector = self.disk_cache.get(key)
+            except sqlite3.Error as exc:
+                self._count("errors")
+                logger.warning("Embedding disk cache read failed: %s", exc)
+                return None
+            if vector is not None:
+                self._count("disk_hits")
+                self._memory.set(key, vector)
+                return vector
+        return None
+
+    def _submit(self, texts: list[str]) -> list[Future]:
+        futures = []
+        for text in texts:
+            key = text_key(text)
+            vector = self._lookup(key)
+            with self._lock:
+                self._counters["texts"] += 1
+                if vector is None:
+                    # The batcher may have finished this text while the disk was read
+                    vector = self._memory.get(key)
+                if vector is not None:
+                    future = Future()
+                    future.set_result(vector)
+                elif key in self._inflight:
+                    # Same text already queued by another caller
+                    self._counters["coalesced"] += 1
+                    future = self._inflight[key]
+                else:
+                    future = self._inflight[key] = Future()
+                    self._queue.put((key, text, future))
+                    self._ensure_thread()
+            futures.append(future)
+        return futures
+
+    def _next_batch(self) -> list[tuple[str, str, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._embed_batch(batch)
+            except Exception as exc:
+                # Whatever failed, no caller may be left waiting and the thread must live on
+                logger.exception("Embedding batch of %d failed", len(batch))
+                with self._lock:
+                    for key, _, future in batch:
+                        self._inflight.pop(key, None)
+                        if not future.done():
+                            future.set_exception(exc)
+
+    def _embed_batch(self, batch: list[tuple[str, str, Future]]):
+        vectors = self.model.embed_documents([text for _, text, _ in batch])
+        if self.disk_cache is not None:
+            try:
+                self.disk_cache.set_many([(key, vector) for (key, _, _), vector in zip(batch, vectors)])
+            except sqlite3.Error as exc:
+                # The vectors are good; only the shared cache file is unavailable
+                self._count("errors")
+                logger.warning("Embedding disk cache write failed: %s", exc)
+        with self._lock:
+            self._counters["batches"] += 1
+            self._counters["embedded"] += len(batch)
+            for (key, _, future), vector in zip(batch, vectors):
+                self._memory.set(key, vector)
+                self._inflight.pop(key, None)
+                future.set_result(vector)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [future.result() for future in self._submit(texts)]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [await asyncio.wrap_future(future) for future in self._submit(texts)]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([text]))[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        return {
+            **counters,
+            "hit_ratio": hits / counters["texts"] if counters["texts"] else 0.0,
+            "avg_batch_size": counters["embedded"] / counters["batches"] if counters["batches"] else 0.0,
+            "queued": self._queue.qsize(),
+        }
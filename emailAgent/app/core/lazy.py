@@ -0,0 +1,42 @@
+import threading
+
+_UNSET = object()
+
+# Named resources, reported by the readiness endpoint and loaded by warmup
+registry = {}
+# Set once startup warmup (if any) has finished
+ready = threading.Event()
+
+
+class Lazy:
+    # Builds its value on first use (thread-safe) and proxies attribute access to it
+    def __init__(self, factory, name: str | None = None):
+        self._factory = factory
+        self._value = _UNSET
+        self._lock = threading.Lock()
+        if name is not None:
+            registry[name] = self
+
+    def get(self):
+        if self._value is _UNSET:
+            with self._lock:
+                if self._value is _UNSET:
+                    self._value = self._factory()
+        return self._value
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not _UNSET
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+def warmup(names=None):
+    for name, resource in registry.items():
+        if names is None or name in names:
+            resource.get()
+
+
+def status() -> dict:
+    return {name: resource.loaded for name, resource in registry.items()}
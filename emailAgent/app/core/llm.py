@@ -1,7 +1,25 @@
-from langchain_groq import ChatGroq
 from .config import settings
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0,
-    api_key= settings.GROQ_API_KEY
-) 
\ No newline at end of file
+from .lazy import Lazy
+
+def _load_llm():
+    import httpx
+    from langchain_groq import ChatGroq
+    # Retries, deadlines and concurrency are handled by app.core.llm_gateway, so the
+    # SDK never retries on its own; both clients keep a pool of warm connections
+    limits = httpx.Limits(
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+    )
+    timeout = httpx.Timeout(settings.LLM_REQUEST_TIMEOUT_SECONDS, connect=5.0)
+    return ChatGroq(
+        model=settings.LLM_MODEL,
+        temperature=0,
+        api_key= settings.GROQ_API_KEY,
+        base_url=settings.GROQ_BASE_URL,
+        timeout=settings.LLM_REQUEST_TIMEOUT_SECONDS,
+        max_retries=0,
+        http_client=httpx.Client(limits=limits, timeout=timeout),
+        http_async_client=httpx.AsyncClient(limits=limits, timeout=timeout),
+    )
+
+llm = Lazy(_load_llm, "llm")
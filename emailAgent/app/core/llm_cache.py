@@ -0,0 +1,180 @@
+import hashlib
+import json
+import logging
+import threading
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+from pymongo.errors import CollectionInvalid, DuplicateKeyError, PyMongoError
+from .config import settings
+from .database import async_db, async_llm_cache_collection, db, llm_cache_collection
+from .metrics import register_collector, span
+from app.utils.lru import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Set per request (X-LLM-Cache: bypass, when LLM_CACHE_ALLOW_BYPASS is on): skip cached
+# answers but still store the fresh one
+llm_cache_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+class LLMCache:
+    """Exact-match cache of structured LLM outputs. All chains run at temperature 0,
+    so the same model, prompt, inputs and schema always give the same answer.
+
+    Entries live in a capped Mongo collection (oldest evicted first once
+    `max_bytes` is reached) behind an in-process LRU.
+    """
+
+    def __init__(self, max_bytes: int, memory_entries: int, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._memory = TTLCache(memory_entries, 24 * 60 * 60)
+        self._counters = {"memory_hits": 0, "store_hits": 0, "misses": 0, "bypassed": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self._sync_ready = False
+        self._async_ready = False
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def key(self, name: str, prompt, schema, inputs: dict) -> str:
+        # The rendered prompt covers both the template text and the inputs; inputs the
+        # template does not use cannot change the answer and are left out
+        schema_json = json.dumps(schema.model_json_schema(), sort_keys=True)
+        rendered = prompt.format(**inputs)
+        payload = "\x1f".join([settings.LLM_MODEL, name, rendered, schema_json])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _skip(self) -> bool:
+        if not self.enabled:
+            return True
+        if llm_cache_bypass.get():
+            self._count("bypassed")
+            return True
+        return False
+
+    def _from_memory(self, key: str, schema):
+        value = self._memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return schema.model_validate(value)
+        return None
+
+    def _from_doc(self, key: str, doc: Optional[dict], schema):
+        if doc is None:
+            self._count("misses")
+            return None
+        self._count("store_hits")
+        self._memory.set(key, doc["value"])
+        return schema.model_validate(doc["value"])
+
+    def _doc(self, key: str, name: str, value: dict) -> dict:
+        return {"_id": key, "chain": name, "value": value, "created_at": datetime.utcnow()}
+
+    def _failed(self, action: str, exc: Exception):
+        # A broken cache never fails the request
+        self._count("errors")
+        logger.warning("LLM cache %s failed: %s", action, exc)
+
+    def _check_capped(self, options: dict) -> bool:
+        # True when the existing collection must be converted to evict by size
+        if options.get("capped"):
+            if options.get("size") != self.max_bytes:
+                logger.warning("llm_cache is capped at %s bytes, not LLM_CACHE_MAX_BYTES=%d; drop it to resize", options.get("size"), self.max_bytes)
+            return False
+        logger.warning("llm_cache exists but is not capped; converting it to a %d byte capped collection", self.max_bytes)
+        return True
+
+    def _ensure_collection(self):
+        if not self._sync_ready:
+            try:
+                db.create_collection(llm_cache_collection.name, capped=True, size=self.max_bytes)
+            except CollectionInvalid:
+                if self._check_capped(llm_cache_collection.options()):
+                    db.command("convertToCapped", llm_cache_collection.name, size=self.max_bytes)
+            self._sync_ready = True
+
+    async def _aensure_collection(self):
+        if not self._async_ready:
+            try:
+                await async_db.create_collection(async_llm_cache_collection.name, capped=True, size=self.max_bytes)
+            except CollectionInvalid:
+                if self._check_capped(await async_llm_cache_collection.options()):
+                    await async_db.command("convertToCapped", async_llm_cache_collection.name, size=self.max_bytes)
+            self._async_ready = True
+
+    def get(self, key: str, schema):
+        if self._skip():
+            return None
+        cached = self._from_memory(key, schema)
+        if cached is not None:
+            return cached
+        try:
+            self._ensure_collection()
+            with span("mongo.llm_cache"):
+                doc = llm_cache_collection.find_one({"_id": key})
+            return self._from_doc(key, doc, schema)
+        except PyMongoError as exc:
+            self._failed("read", exc)
+            return None
+
+    async def aget(self, key: str, schema):
+        if self._skip():
+            return None
+        cached = self._from_memory(key, schema)
+        if cached is not None:
+            return cached
+        try:
+            await self._aensure_collection()
+            with span("mongo.llm_cache"):
+                doc = await async_llm_cache_collection.find_one({"_id": key})
+            return self._from_doc(key, doc, schema)
+        except PyMongoError as exc:
+            self._failed("read", exc)
+            return None
+
+    def set(self, key: str, name: str, result):
+        if not self.enabled:
+            return
+        value = result.model_dump(mode="json")
+        self._memory.set(key, value)
+        try:
+            self._ensure_collection()
+            llm_cache_collection.insert_one(self._doc(key, name, value))
+        except DuplicateKeyError:
+            pass
+        except PyMongoError as exc:
+            self._failed("write", exc)
+
+    async def aset(self, key: str, name: str, result):
+        if not self.enabled:
+            return
+        value = result.model_dump(mode="json")
+        self._memory.set(key, value)
+        try:
+            await self._aensure_collection()
+            await async_llm_cache_collection.insert_one(self._doc(key, name, value))
+        except DuplicateKeyError:
+            pass
+        except PyMongoError as exc:
+            self._failed("write", exc)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["memory_hits"] + counters["store_hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_ratio": (counters["memory_hits"] + counters["store_hits"]) / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+
+llm_cache = LLMCache(
+    max_bytes=settings.LLM_CACHE_MAX_BYTES,
+    memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+    enabled=settings.LLM_CACHE_ENABLED,
+)
+register_collector("llm_cache", llm_cache.stats)
@@ -0,0 +1,363 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Optional
+import httpx
+from fastapi import HTTPException, status
+from .config import settings
+from .llm import llm
+from .llm_cache import llm_cache
+from .metrics import register_collector, span, token_counter
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+def _status_code(exc) -> Optional[int]:
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    # 429/5xx from the API, or no response at all (groq.APIConnectionError / APITimeoutError)
+    code = _status_code(exc)
+    if code is not None:
+        return code in RETRYABLE_STATUS or code >= 500
+    return isinstance(exc, (ConnectionError, httpx.TransportError)) or type(exc).__name__ in (
+        "APIConnectionError",
+        "APITimeoutError",
+    )
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    # Opens after `failures` consecutive upstream failures; after `reset_seconds` one probe call is let through
+    def __init__(self, failures: int, reset_seconds: float):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self._consecutive = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self._opened_at >= self.reset_seconds else "open"
+
+    def acquire(self) -> Optional[str]:
+        # None: rejected; "probe": the single half-open trial call, which must end in release_probe()
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._probing:
+                return None
+            self._probing = True
+            return "probe"
+
+    def release_probe(self):
+        # A probe that was cancelled or interrupted recorded neither outcome; let the next call probe
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive += 1
+            self._probing = False
+            if self._opened_at is not None or self._consecutive >= self.failures:
+                if self._opened_at is None:
+                    logger.warning("LLM circuit opened after %d consecutive failures", self._consecutive)
+                self._opened_at = time.monotonic()
+
+
+class LLMGateway:
+    """Every LLM call goes through here: bounded concurrency, an overall deadline,
+    jittered retries on 429/5xx, optional hedging after the observed p95 latency,
+    and a circuit breaker that fails fast while the upstream is down."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        deadline: float,
+        max_attempts: int,
+        backoff: float,
+        backoff_max: float,
+        hedging: bool,
+        hedge_percentile: float,
+        hedge_min_samples: int,
+        hedge_min_delay: float,
+        breaker: CircuitBreaker,
+    ):
+        self.max_concurrency = max_concurrency
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.hedging = hedging
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker = breaker
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._sync_semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._latencies = defaultdict(lambda: deque(maxlen=500))
+        self._counters = defaultdict(int)
+
+    def _check_breaker(self) -> bool:
+        # True when this attempt is the half-open probe
+        admitted = self.breaker.acquire()
+        if admitted is None:
+            self._counters["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="LLM service unavailable, please try again shortly",
+                headers={"Retry-After": str(int(self.breaker.reset_seconds))},
+            )
+        return admitted == "probe"
+
+    def _retry_delay(self, name: str, attempt: int, exc: BaseException, deadline_at: float) -> Optional[float]:
+        # None: give up and re-raise
+        if not is_retryable(exc):
+            # The upstream answered, the request itself is at fault
+            self.breaker.record_success()
+            return None
+        self.breaker.record_failure()
+        if attempt >= self.max_attempts:
+            return None
+        delay = retry_after(exc)
+        if delay is None:
+            delay = random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+        delay = min(delay, self.backoff_max)
+        if time.monotonic() + delay >= deadline_at:
+            return None
+        self._counters["retries"] += 1
+        logger.warning("%s attempt %d failed (%s), retrying in %.2fs", name, attempt, exc, delay)
+        return delay
+
+    def _record(self, name: str, started: float):
+        self._latencies[name].append(time.perf_counter() - started)
+
+    def _percentile(self, name: str, p: float) -> Optional[float]:
+        latencies = sorted(self._latencies[name])
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    def _hedge_delay(self, name: str) -> Optional[float]:
+        if not self.hedging or len(self._latencies[name]) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self._percentile(name, self.hedge_percentile))
+
+    async def _attempt(self, name: str, runnable, inputs):
+        async with self._semaphore:
+            self._counters["attempts"] += 1
+            started = time.perf_counter()
+            result = await runnable.ainvoke(inputs, config={"callbacks": [token_counter(name)]})
+            self._record(name, started)
+            return result
+
+    async def _hedged(self, name: str, runnable, inputs):
+        # A second identical request after the p95 delay; the first answer wins
+        first = asyncio.ensure_future(self._attempt(name, runnable, inputs))
+        delay = self._hedge_delay(name)
+        tasks = {first}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                # Never hedge into a saturated pool, that only adds load to a slow upstream
+                if not done and not self._semaphore.locked():
+                    self._counters["hedges"] += 1
+                    hedge = asyncio.ensure_future(self._attempt(name, runnable, inputs))
+                    tasks.add(hedge)
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self._counters["hedge_wins"] += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def ainvoke(self, name: str, runnable, inputs, deadline: Optional[float] = None):
+        # The span covers retries and backoff: it is the time the request waited on the LLM
+        with span(f"llm.{name}"):
+            return await self._ainvoke(name, runnable, inputs, deadline)
+
+    async def _ainvoke(self, name: str, runnable, inputs, deadline: Optional[float] = None):
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        self._counters["calls"] += 1
+        attempt = 0
+        while True:
+            probe = self._check_breaker()
+            attempt += 1
+            try:
+                async with asyncio.timeout(max(0.0, deadline_at - time.monotonic())):
+                    result = await self._hedged(name, runnable, inputs)
+            except TimeoutError:
+                self.breaker.record_failure()
+                self._counters["timeouts"] += 1
+                raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="LLM request timed out")
+            except Exception as exc:
+                delay = self._retry_delay(name, attempt, exc, deadline_at)
+                if delay is None:
+                    self._counters["failures"] += 1
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled or interrupted mid-call: no outcome to record, but the probe slot must be freed
+                if probe:
+                    self.breaker.release_probe()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def astream(self, name: str, runnable, inputs, deadline: Optional[float] = None):
+        # Retried only until the first chunk; once output has been sent a failure is final
+        with span(f"llm.{name}"):
+            async for chunk in self._astream(name, runnable, inputs, deadline):
+                yield chunk
+
+    async def _astream(self, name: str, runnable, inputs, deadline: Optional[float] = None):
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        self._counters["calls"] += 1
+        attempt = 0
+        while True:
+            probe = self._check_breaker()
+            attempt += 1
+            streamed = False
+            try:
+                async with self._semaphore:
+                    self._counters["attempts"] += 1
+                    started = time.perf_counter()
+                    chunks = runnable.astream(inputs, config={"callbacks": [token_counter(name)]}).__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline_at - time.monotonic()))
+                        except StopAsyncIteration:
+                            break
+                        streamed = True
+                        yield chunk
+                    self._record(name, started)
+            except TimeoutError:
+                self.breaker.record_failure()
+                self._counters["timeouts"] += 1
+                raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="LLM request timed out")
+            except Exception as exc:
+                delay = None if streamed else self._retry_delay(name, attempt, exc, deadline_at)
+                if delay is None:
+                    self._counters["failures"] += 1
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled or interrupted mid-call: no outcome to record, but the probe slot must be freed
+                if probe:
+                    self.breaker.release_probe()
+                raise
+            self.breaker.record_success()
+            return
+
+    def invoke(self, name: str, runnable, inputs, deadline: Optional[float] = None):
+        # Blocking variant for the resume worker processes; each attempt is bounded
+        # by LLM_REQUEST_TIMEOUT_SECONDS on the HTTP client, no hedging
+        with span(f"llm.{name}"):
+            return self._invoke(name, runnable, inputs, deadline)
+
+    def _invoke(self, name: str, runnable, inputs, deadline: Optional[float] = None):
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        self._counters["calls"] += 1
+        attempt = 0
+        while True:
+            probe = self._check_breaker()
+            attempt += 1
+            try:
+                with self._sync_semaphore:
+                    self._counters["attempts"] += 1
+                    started = time.perf_counter()
+                    result = runnable.invoke(inputs, config={"callbacks": [token_counter(name)]})
+                    self._record(name, started)
+            except Exception as exc:
+                delay = self._retry_delay(name, attempt, exc, deadline_at)
+                if delay is None:
+                    self._counters["failures"] += 1
+                    raise
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled or interrupted mid-call: no outcome to record, but the probe slot must be freed
+                if probe:
+                    self.breaker.release_probe()
+                raise
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> dict:
+        return {
+            **self._counters,
+            "circuit": self.breaker.state,
+            "in_flight": self.max_concurrency - self._semaphore._value,
+            "latency": {
+                name: {"p50": self._percentile(name, 0.5), "p95": self._percentile(name, 0.95)}
+                for name in list(self._latencies)
+            },
+        }
+
+
+gateway = LLMGateway(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    deadline=settings.LLM_DEADLINE_SECONDS,
+    max_attempts=settings.LLM_MAX_ATTEMPTS,
+    backoff=settings.LLM_RETRY_BACKOFF_SECONDS,
+    backoff_max=settings.LLM_RETRY_BACKOFF_MAX_SECONDS,
+    hedging=settings.LLM_HEDGING,
+    hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+    hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+    hedge_min_delay=settings.LLM_HEDGE_MIN_DELAY_SECONDS,
+    breaker=CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_RESET_SECONDS),
+)
+register_collector("llm", lambda: {**gateway.stats(), "circuit_open": gateway.breaker.state != "closed"})
+
+
+async def ainvoke_structured(name: str, prompt, schema, inputs: dict, deadline: Optional[float] = None):
+    # `name` labels the chain in logs, stats and cache keys
+    key = llm_cache.key(name, prompt, schema, inputs)
+    result = await llm_cache.aget(key, schema)
+    if result is None:
+        result = await gateway.ainvoke(name, prompt | llm.with_structured_output(schema), inputs, deadline)
+        await llm_cache.aset(key, name, result)
+    return result
+
+
+def invoke_structured(name: str, prompt, schema, inputs: dict, deadline: Optional[float] = None):
+    key = llm_cache.key(name, prompt, schema, inputs)
+    result = llm_cache.get(key, schema)
+    if result is None:
+        result = gateway.invoke(name, prompt | llm.with_structured_output(schema), inputs, deadline)
+        llm_cache.set(key, name, result)
+    return result
@@ -0,0 +1,215 @@
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# (stage, seconds) for every span finished in the current request, for Server-Timing;
+# tasks and to_thread calls inherit the list, so spans anywhere below the request land here
+request_timings: ContextVar[Optional[list]] = ContextVar("request_timings", default=None)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labels, key)} {_number(value)}" for key, value in values]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = bound if bound == "+Inf" else _number(bound)
+                labels = _labels(self.labels, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+_metrics = {}
+_collectors = {}
+_registry_lock = threading.Lock()
+
+
+def _register(metric):
+    with _registry_lock:
+        return _metrics.setdefault(metric.name, metric)
+
+
+def counter(name: str, help: str, labels: tuple = ()) -> Counter:
+    return _register(Counter(name, help, labels))
+
+
+def histogram(name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help, labels, buckets))
+
+
+def register_collector(name: str, stats: Callable[[], dict]):
+    # Numeric values of an existing stats() dict become gauges named jobscribe_<name>_<key>;
+    # a "hit_ratio" key is exported as jobscribe_cache_hit_ratio{cache="<name>"}
+    _collectors[name] = stats
+
+
+stage_seconds = histogram("jobscribe_stage_duration_seconds", "Time spent in each request stage", ("stage",))
+http_seconds = histogram("jobscribe_http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status"))
+llm_tokens = counter("jobscribe_llm_tokens_total", "Tokens sent to and received from the LLM", ("chain", "kind"))
+
+
+def record(stage: str, seconds: float):
+    stage_seconds.observe(seconds, stage=stage)
+    timings = request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+@contextmanager
+def span(stage: str):
+    # Times the block into the stage histogram and the current request's Server-Timing
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started)
+
+
+def server_timing(timings: list, total: Optional[float] = None) -> str:
+    # Repeated stages (several LLM calls, say) are summed, in order of first appearance
+    durations = {}
+    for stage, seconds in timings:
+        durations[stage] = durations.get(stage, 0.0) + seconds
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in durations.items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class TokenCounter(BaseCallbackHandler):
+    # Attached per call by the LLM gateway; reads usage from the final (or last streamed) message
+    run_inline = True
+
+    def __init__(self, chain: str):
+        self.chain = chain
+
+    def on_llm_end(self, response, **kwargs):
+        usage = None
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or usage
+        if usage:
+            llm_tokens.inc(usage.get("input_tokens", 0), chain=self.chain, kind="input")
+            llm_tokens.inc(usage.get("output_tokens", 0), chain=self.chain, kind="output")
+            return
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        llm_tokens.inc(token_usage.get("prompt_tokens", 0), chain=self.chain, kind="input")
+        llm_tokens.inc(token_usage.get("completion_tokens", 0), chain=self.chain, kind="output")
+
+
+_token_counters = {}
+
+
+def token_counter(chain: str) -> TokenCounter:
+    if chain not in _token_counters:
+        _token_counters[chain] = TokenCounter(chain)
+    return _token_counters[chain]
+
+
+def _metric_name(*parts: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", "_".join(("jobscribe", *parts)))
+
+
+def _render_collectors() -> list[str]:
+    lines = []
+    ratios = []
+    for name, stats in list(_collectors.items()):
+        try:
+            values = stats()
+        except Exception as exc:
+            logger.warning("Metrics collector %s failed: %s", name, exc)
+            continue
+        for key, value in values.items():
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                continue
+            if key == "hit_ratio":
+                ratios.append((name, value))
+                continue
+            metric = _metric_name(name, key)
+            lines += [f"# TYPE {metric} gauge", f"{metric} {_number(value)}"]
+    if ratios:
+        lines.append("# TYPE jobscribe_cache_hit_ratio gauge")
+        lines += [f'jobscribe_cache_hit_ratio{{cache="{name}"}} {_number(value)}' for name, value in ratios]
+    return lines
+
+
+def render() -> str:
+    # Prometheus text exposition format
+    lines = []
+    for metric in list(_metrics.values()):
+        lines += metric.render()
+    lines += _render_collectors()
+    return "\n".join(lines) + "\n"
@@ -2,14 +2,65 @@ from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from jose import JWTError, jwt
 from app.core.config import settings
-from app.core.database import users_collection
-from app.models.user import UserInDB
+from app.core.llm_cache import llm_cache_bypass
+from app.core.metrics import http_seconds, request_timings, server_timing
+from app.core.user_cache import cache_token, token_cache, user_cache
+from app.repositories import users
 import re
+import time
+
+class MetricsMiddleware:
+    # Request latency by route template; with server_timing=True the per-stage spans of the
+    # request are also sent back in a Server-Timing header. Streaming responses only carry
+    # the stages that finished before their headers went out.
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = []
+        request_timings.set(timings)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    header = server_timing(timings, time.perf_counter() - started)
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # The route template, not the raw path, keeps label cardinality bounded
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_seconds.observe(time.perf_counter() - started, method=scope["method"], route=route, status=str(status_code))
+
+class LLMCacheBypassMiddleware:
+    # "X-LLM-Cache: bypass" makes every LLM call in the request skip cached answers. Only
+    # installed when LLM_CACHE_ALLOW_BYPASS is on: browsers and proxies send Cache-Control:
+    # no-cache on their own, and each bypassed request is paid for in LLM calls
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            llm_cache_bypass.set(Request(scope).headers.get("X-LLM-Cache", "").lower() == "bypass")
+        await self.app(scope, receive, send)
 
 class AuthMiddleware:
     def __init__(self, app, exclude_paths=None):
         self.app = app
         self.exclude_paths = exclude_paths or []
+        # One alternation instead of a re.match per pattern on every request
+        self.exclude_matcher = re.compile("|".join(f"(?:{pattern})" for pattern in self.exclude_paths)) if self.exclude_paths else None
         
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http":
@@ -25,10 +76,9 @@ class AuthMiddleware:
             
         # Check if path should be excluded from authentication
         path = request.url.path
-        for pattern in self.exclude_paths:
-            if re.match(pattern, path):
-                await self.app(scope, receive, send)
-                return
+        if self.exclude_matcher and self.exclude_matcher.match(path):
+            await self.app(scope, receive, send)
+            return
                 
         # Extract token from Authorization header
         auth_header = request.headers.get("Authorization")
@@ -44,30 +94,31 @@ class AuthMiddleware:
         
         # Validate token and get user
         try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-            email: str = payload.get("sub")
+            email = token_cache.get(token)
             if email is None:
-                response = JSONResponse(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    content={"detail": "Could not validate credentials"}
-                )
-                await response(scope, receive, send)
-                return
-                
-            # Get user from database
-            user_data = users_collection.find_one({"email": email})
-            if user_data is None:
-                response = JSONResponse(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    content={"detail": "User not found"}
-                )
-                await response(scope, receive, send)
-                return
-                
-            # Convert MongoDB's _id to id for Pydantic model
-            user_data["id"] = str(user_data["_id"])
-            del user_data["_id"]
-            user = UserInDB(**user_data)
+                payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+                email: str = payload.get("sub")
+                if email is None:
+                    response = JSONResponse(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        content={"detail": "Could not validate credentials"}
+                    )
+                    await response(scope, receive, send)
+                    return
+                cache_token(token, email, payload.get("exp"))
+
+            user = user_cache.get(email)
+            if user is None:
+                # The one profile read of the request; services take it from scope["user"]
+                user = await users.aget_profile(email)
+                if user is None:
+                    response = JSONResponse(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        content={"detail": "User not found"}
+                    )
+                    await response(scope, receive, send)
+                    return
+                user_cache.set(email, user)
             
             # Add user to request state
             scope["user"] = user
@@ -0,0 +1,20 @@
+import time
+from app.core.config import settings
+from app.utils.lru import TTLCache
+
+# token -> email (bounded by the token's own expiry) and email -> UserProfile
+token_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+user_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+def cache_token(token: str, email: str, expires_at: float | None):
+    ttl = settings.AUTH_CACHE_TTL_SECONDS
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    if ttl > 0:
+        token_cache.set(token, email, ttl)
+
+
+def invalidate_user(email: str):
+    # Other workers pick up the change once their entry expires
+    user_cache.pop(email)
@@ -1,10 +1,38 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from  app.routes.main import router
-from app.core.middleware import AuthMiddleware
+from app.core.middleware import AuthMiddleware, LLMCacheBypassMiddleware, MetricsMiddleware
+from app.core.config import settings
+from app.core import lazy
+from app.services.resume_jobs import resume_job_dispatcher
+from app.services.passwords import password_hasher
+from app.repositories import users
 import uvicorn
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup = None
+    if settings.PRELOAD_RESOURCES:
+        # Load clients and the embedding model in the background; /ready reports 503 until done
+        async def preload():
+            await asyncio.to_thread(lazy.warmup)
+            lazy.ready.set()
+        warmup = asyncio.create_task(preload())
+    else:
+        lazy.ready.set()
+    # Index bootstrap runs in the background so an unreachable Mongo does not block startup
+    indexes = asyncio.create_task(users.ensure_indexes())
+    resume_job_dispatcher.start()
+    yield
+    indexes.cancel()
+    if warmup is not None:
+        warmup.cancel()
+    await resume_job_dispatcher.stop()
+    password_hasher.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -23,12 +51,20 @@ app.add_middleware(
     exclude_paths=[
         "/user/register",
         "/user/token",
+        "/ready",
+        "/metrics",
         "/docs",
         "/redoc",
         "/openapi.json"
     ]
 )
 
+if settings.LLM_CACHE_ALLOW_BYPASS:
+    app.add_middleware(LLMCacheBypassMiddleware)
+
+# Outermost, so request latency includes authentication
+app.add_middleware(MetricsMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+
 app.include_router(router)
 
 if __name__ == "__main__":
@@ -32,4 +32,14 @@ class EmailContent(BaseModel):
     greeting: str
     para1: str
     para2: str
-    sign_off: str
\ No newline at end of file
+    sign_off: str
+
+
+class BatchEmailRequest(BaseModel):
+    urls: List[str]
+
+
+class ScrapedPage(BaseModel):
+    url: str
+    text: str
+    job_posting: Optional[dict] = None
@@ -2,7 +2,7 @@ from pydantic import BaseModel, EmailStr
 from typing import Optional, List
 from datetime import datetime
 
-from app.models.resumeModels import Education
+from app.models.resumeModels import Education, Skill
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -21,6 +21,12 @@ class UserInDB(UserBase):
     updated_at: Optional[datetime] = None
 
 
+class UserProfile(UserBase):
+    # Loaded once per request by the auth middleware; services read the profile from here
+    id: str
+    skills: List[Skill] = []
+
+
 class User(UserBase):
     id: str
     created_at: datetime
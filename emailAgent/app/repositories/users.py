@@ -0,0 +1,69 @@
+import logging
+from typing import Optional
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from app.core.database import async_users_collection, users_collection
+from app.core.metrics import span
+from app.models.user import UserInDB, UserProfile
+
+logger = logging.getLogger(__name__)
+
+# Each call site reads only what it needs; the password hash never leaves login
+AUTH_PROJECTION = {"email": 1, "full_name": 1, "hashed_password": 1, "created_at": 1, "updated_at": 1}
+PROFILE_PROJECTION = {"email": 1, "full_name": 1, "phone": 1, "total_experience": 1, "education": 1, "skills": 1}
+
+# Set once the unique users.email index is known to exist
+_email_index_ready = False
+
+
+def _with_id(doc: dict) -> dict:
+    # Convert MongoDB's _id to id for Pydantic models
+    doc["id"] = str(doc.pop("_id"))
+    return doc
+
+
+async def ensure_indexes():
+    # Run at startup, and again on registration until it succeeds. Registration relies on
+    # the unique index instead of a lookup first
+    global _email_index_ready
+    try:
+        await async_users_collection.create_index("email", unique=True)
+        _email_index_ready = True
+    except PyMongoError as exc:
+        logger.error("Could not create the unique users.email index (duplicate emails?): %s", exc)
+
+
+async def aget_for_auth(email: str) -> Optional[UserInDB]:
+    with span("mongo.user"):
+        doc = await async_users_collection.find_one({"email": email}, projection=AUTH_PROJECTION)
+    return UserInDB(**_with_id(doc)) if doc else None
+
+
+async def aget_profile(email: str) -> Optional[UserProfile]:
+    with span("mongo.user"):
+        doc = await async_users_collection.find_one({"email": email}, projection=PROFILE_PROJECTION)
+    return UserProfile(**_with_id(doc)) if doc else None
+
+
+async def insert(doc: dict) -> str:
+    # Raises DuplicateKeyError when the email is taken
+    if not _email_index_ready:
+        await ensure_indexes()
+    with span("mongo.user"):
+        if not _email_index_ready:
+            # Without the index only a lookup stands between two accounts on one email. It
+            # can still race, so the index error logged above needs fixing
+            if await async_users_collection.find_one({"email": doc["email"]}, projection={"_id": 1}):
+                raise DuplicateKeyError("users.email already exists", code=11000)
+        result = await async_users_collection.insert_one(doc)
+    return str(result.inserted_id)
+
+
+async def set_password_hash(email: str, hashed_password: str):
+    with span("mongo.user"):
+        await async_users_collection.update_one({"email": email}, {"$set": {"hashed_password": hashed_password}})
+
+
+def update_profile(email: str, fields: dict):
+    # Blocking; called from the resume worker processes
+    with span("mongo.profile_update"):
+        users_collection.update_one({"email": email}, {"$set": fields})
@@ -1,14 +1,51 @@
-from fastapi import APIRouter,Request
-from app.utils.scraper import fetch_page_content
-from app.services.email import generate_email_service
+import json
+from fastapi import APIRouter,HTTPException,Request,status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from app.services.email import generate_email_service, generate_emails_batch_service, stream_email_service
+from app.services.job_cache import job_cache
+from app.services import eligibility
+from app.models.jobUrl import BatchEmailRequest
+from app.core.config import settings
+from app.core.chroma_db import embeddings
+from app.core.llm_gateway import gateway
+from app.core.llm_cache import llm_cache
 emailRouter = APIRouter(
     prefix="/email",
     tags=["email"]
 )
 
 @emailRouter.post('/generate-email')
-def generate_email(request:Request,url: str):
+async def generate_email(request:Request,url: str):
     user = request.scope.get("user")  
-    content = fetch_page_content(url)
-    email=generate_email_service(content,user)
-    return {"message": "Email generated successfully", "email": email}
\ No newline at end of file
+    email=await generate_email_service(url,user)
+    return {"message": "Email generated successfully", "email": email}
+
+@emailRouter.post('/generate-emails')
+async def generate_emails(request:Request,batch: BatchEmailRequest):
+    if len(batch.urls) > settings.BATCH_MAX_URLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_MAX_URLS} URLs per batch"
+        )
+    user = request.scope.get("user")
+    results=await generate_emails_batch_service(batch.urls,user)
+    return {"message": "Emails generated", "results": results}
+
+@emailRouter.post('/generate-email/stream')
+async def generate_email_stream(request:Request,url: str):
+    user = request.scope.get("user")
+
+    async def event_stream():
+        async for event, data in stream_email_service(url,user):
+            yield f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@emailRouter.get('/cache-stats')
+def cache_stats():
+    return {"job_cache": job_cache.stats(), "embeddings": embeddings.stats(), "eligibility": eligibility.stats(), "llm": gateway.stats(), "llm_cache": llm_cache.stats()}
\ No newline at end of file
@@ -0,0 +1,16 @@
+from fastapi import APIRouter,Response,status
+from app.core import lazy, metrics
+healthRouter = APIRouter(
+    tags=["health"]
+)
+
+@healthRouter.get('/ready')
+def readiness(response:Response):
+    ready = lazy.ready.is_set()
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"ready": ready, "loaded": lazy.status()}
+
+@healthRouter.get('/metrics', include_in_schema=False)
+def prometheus_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -2,8 +2,10 @@ from fastapi import APIRouter
 from .email import emailRouter
 from .user import apiRouter as userRouter
 from .resume import resumeRouter
+from .health import healthRouter
 router = APIRouter()
 
 router.include_router(emailRouter)
 router.include_router(userRouter)
-router.include_router(resumeRouter)
\ No newline at end of file
+router.include_router(resumeRouter)
+router.include_router(healthRouter)
\ No newline at end of file
@@ -1,13 +1,33 @@
-from fastapi import APIRouter,UploadFile,Request
-from app.services.resume import process_resume
+from fastapi import APIRouter,HTTPException,UploadFile,Request,status
+from app.core.config import settings
+from app.services.resume_jobs import enqueue_resume_job, get_resume_job
 resumeRouter = APIRouter(
     prefix="/resume",  
     tags=["resume"]
 )
 
-@resumeRouter.post('/upload')
-def upload_resume(request:Request,file: UploadFile):
+@resumeRouter.post('/upload', status_code=status.HTTP_202_ACCEPTED)
+async def upload_resume(request:Request,file: UploadFile):
     
     user = request.scope.get("user")  # Access the authenticated user
-    user = process_resume(file, user)
-    return {"filename": file.filename, "content_type": file.content_type,"user":user}
\ No newline at end of file
+    # One byte over the limit is enough to reject; don't queue a job that can only fail
+    data = await file.read(settings.PDF_MAX_BYTES + 1)
+    if len(data) > settings.PDF_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"PDF is larger than {settings.PDF_MAX_BYTES} bytes"
+        )
+    # Processing happens on the resume worker pool; poll /resume/jobs/{job_id} for progress
+    job_id = await enqueue_resume_job(user, file.filename, file.content_type, data)
+    return {"filename": file.filename, "content_type": file.content_type,"job_id":job_id,"status":"queued"}
+
+@resumeRouter.get('/jobs/{job_id}')
+async def resume_job_status(request:Request,job_id: str):
+    user = request.scope.get("user")
+    job = await get_resume_job(job_id, user)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
\ No newline at end of file
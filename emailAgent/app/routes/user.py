@@ -1,18 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
 from app.models.user import UserCreate, User, Token
-from app.services.auth import authenticate_user, create_user, create_access_token, get_user
+from app.services.auth import authenticate_user, create_user, create_access_token
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 apiRouter = APIRouter(
     prefix="/user",
     tags=["user"]
 )
 
 @apiRouter.post("/register", response_model=User)
-def register_user(user: UserCreate):
-    db_user = create_user(user)
+async def register_user(request: Request, user: UserCreate):
+    db_user = await create_user(user, request.client.host if request.client else None)
     return User(
         id=db_user.id,
         email=db_user.email,
@@ -22,11 +25,10 @@ def register_user(user: UserCreate):
     )
 
 @apiRouter.post("/token", response_model=Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login_for_access_token(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
     # In OAuth2PasswordRequestForm, "username" field is used for email
     email = form_data.username
-    print(email,form_data.password)
-    user = authenticate_user(email, form_data.password)
+    user = await authenticate_user(email, form_data.password, request.client.host if request.client else None)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -37,7 +39,7 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
     )
-    print(access_token)
+    logger.info("Issued access token for %s", user.email)
     return {
         "access_token": access_token,
         "token_type": "bearer"
@@ -1,53 +1,42 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
+from pymongo.errors import DuplicateKeyError
 from app.core.config import settings
-from app.core.database import users_collection
+from app.core.user_cache import invalidate_user
+from app.repositories import users
+from app.services.passwords import password_hasher
 from app.models.user import UserInDB, UserCreate, TokenData
 from fastapi import HTTPException, status
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # JWT
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
-
-def get_user(email: str) -> Optional[UserInDB]:
-    user = users_collection.find_one({"email": email})
-    if user:
-        # Convert MongoDB's _id to id for Pydantic model
-        user["id"] = str(user["_id"])
-        del user["_id"]
-        return UserInDB(**user)
-    return None
+def _limit_keys(email: str, client_ip: Optional[str]) -> list[str]:
+    keys = [f"email:{email.lower()}"]
+    if client_ip:
+        keys.append(f"ip:{client_ip}")
+    return keys
 
-def authenticate_user(email: str, password: str):
-    user = get_user(email)
+async def authenticate_user(email: str, password: str, client_ip: Optional[str] = None):
+    user = await users.aget_for_auth(email)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await password_hasher.verify(password, user.hashed_password, _limit_keys(email, client_ip))
+    if not valid:
         return False
+    if new_hash:
+        # Hash cost changed since this password was stored
+        await users.set_password_hash(user.email, new_hash)
+        invalidate_user(user.email)
+        user.hashed_password = new_hash
     return user
 
-def create_user(user: UserCreate):
-    # Check if user already exists
-    if get_user(user.email):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User with this email already exists"
-        )
-    
+async def create_user(user: UserCreate, client_ip: Optional[str] = None):
     # Hash password
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password, _limit_keys(user.email, client_ip))
     
     # Create user document
     user_dict = {
@@ -58,9 +47,15 @@ def create_user(user: UserCreate):
         "updated_at": None
     }
     
-    # Insert user into database
-    result = users_collection.insert_one(user_dict)
-    user_dict["id"] = str(result.inserted_id)
+    # Insert user into database; the unique email index rejects an existing user
+    try:
+        user_dict["id"] = await users.insert(user_dict)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email already exists"
+        )
+    invalidate_user(user.email)
     
     return UserInDB(**user_dict)
 
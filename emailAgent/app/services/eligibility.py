@@ -0,0 +1,231 @@
+import re
+from typing import Optional
+from app.core.llm_gateway import ainvoke_structured
+from app.core.metrics import register_collector
+from app.models.jobUrl import ExperienceEducationMatch, JobData, MatchEnum
+from app.utils.prompts import experience_education_match_prompt
+
+# Canonical skill -> other spellings seen on resumes and job posts. Keys and aliases
+# go through skill_key, so "React.js", "ReactJS" and "react js" need no extra entries.
+SKILL_ALIASES = {
+    "javascript": ["js", "ecmascript", "es6"],
+    "typescript": ["ts"],
+    "react": ["reactjs", "react.js"],
+    "react native": ["rn"],
+    "next.js": ["nextjs", "next"],
+    "vue": ["vuejs", "vue.js"],
+    "angular": ["angularjs", "angular.js"],
+    "node.js": ["node", "nodejs"],
+    "express": ["expressjs", "express.js"],
+    "python": ["python3", "py"],
+    "golang": ["go", "go lang"],
+    "c++": ["cpp", "cplusplus"],
+    "c#": ["csharp", "c sharp"],
+    ".net": ["dotnet", "asp.net", "net core", ".net core"],
+    "postgresql": ["postgres", "psql", "pgsql"],
+    "mongodb": ["mongo"],
+    "mysql": ["my sql"],
+    "sql": ["structured query language"],
+    "kubernetes": ["k8s"],
+    "docker": ["containers", "containerization"],
+    "amazon web services": ["aws"],
+    "google cloud platform": ["gcp", "google cloud"],
+    "microsoft azure": ["azure"],
+    "ci/cd": ["cicd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "machine learning": ["ml"],
+    "deep learning": ["dl"],
+    "natural language processing": ["nlp"],
+    "large language models": ["llm", "llms", "genai", "generative ai"],
+    "artificial intelligence": ["ai"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "pytorch": ["torch"],
+    "tensorflow": ["tf2"],
+    "rest api": ["rest", "restful", "restful apis", "rest apis", "restful api"],
+    "graphql": ["gql"],
+    "html": ["html5"],
+    "css": ["css3"],
+    "tailwind css": ["tailwind", "tailwindcss"],
+    "apache kafka": ["kafka"],
+    "apache spark": ["spark", "pyspark"],
+    "redis": ["redis cache"],
+    "git": ["github", "gitlab", "version control"],
+    "linux": ["unix"],
+    "fastapi": ["fast api"],
+    "django": ["django rest framework", "drf"],
+    "data structures and algorithms": ["dsa", "data structures", "algorithms"],
+    "object oriented programming": ["oop", "oops"],
+}
+
+
+def skill_key(name: str) -> str:
+    # Case, spacing and separators do not distinguish skills; + and # do (C, C++, C#)
+    return re.sub(r"[\s.\-_/]+", "", str(name).casefold())
+
+
+SKILL_LOOKUP = {}
+for canonical, aliases in SKILL_ALIASES.items():
+    for alias in [canonical, *aliases]:
+        SKILL_LOOKUP[skill_key(alias)] = canonical
+
+
+def canonical_skill(name: str) -> str:
+    key = skill_key(name)
+    return SKILL_LOOKUP.get(key, key)
+
+
+def match_skills(candidate_skills: list[str], jd_skills: list[str]) -> list[str]:
+    # JD spellings of the skills the candidate has, in JD order
+    have = {canonical_skill(skill) for skill in candidate_skills}
+    matched = []
+    seen = set()
+    for skill in jd_skills:
+        canonical = canonical_skill(skill)
+        if canonical in have and canonical not in seen:
+            seen.add(canonical)
+            matched.append(skill)
+    return matched
+
+
+NUMBER = r"(\d+(?:\.\d+)?)"
+YEARS_RANGE = re.compile(rf"{NUMBER}\s*(?:\+|plus)?\s*(?:-|–|to)?\s*(?:{NUMBER}\s*)?\+?\s*(years?|yrs?|months?|mos?)\b", re.I)
+BARE_NUMBER = re.compile(rf"^\s*{NUMBER}\s*$")
+
+# Years a seniority word implies when the post gives no number
+SENIORITY_YEARS = [
+    (re.compile(r"\b(intern|internship|trainee|fresher|freshers|entry[- ]?level|new grad|graduate)\b", re.I), 0),
+    (re.compile(r"\b(junior|jr)\b", re.I), 0),
+    (re.compile(r"\b(associate)\b", re.I), 1),
+    (re.compile(r"\b(mid|intermediate)\b", re.I), 2),
+    (re.compile(r"\b(senior|sr|experienced)\b", re.I), 5),
+    (re.compile(r"\b(lead|tech lead)\b", re.I), 6),
+    (re.compile(r"\b(staff|principal|architect|director)\b", re.I), 8),
+]
+# A number next to these is how long the position lasts, not experience asked for
+INTERNSHIP = re.compile(r"\b(intern|internship|trainee|apprentice|apprenticeship)\b", re.I)
+NOT_REQUIRED = re.compile(r"^\s*(none|n/?a|not (?:applicable|specified|mentioned)|any|no experience(?: required)?|0)?\s*$", re.I)
+
+
+def parse_years(text) -> Optional[float]:
+    # "2.5", "3 years", "8 months" -> years
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return float(text)
+    match = BARE_NUMBER.match(str(text))
+    if match:
+        return float(match.group(1))
+    match = YEARS_RANGE.search(str(text))
+    if match:
+        value = float(match.group(1))
+        return value / 12 if match.group(3).lower().startswith("mo") else value
+    return None
+
+
+def required_years(text: Optional[str]) -> tuple[Optional[float], bool]:
+    # Lower bound of the JD requirement and whether it is exact (a number) or implied by seniority
+    if text is None or NOT_REQUIRED.match(str(text)) or INTERNSHIP.search(str(text)):
+        return 0.0, True
+    years = parse_years(text)
+    if years is not None:
+        return years, True
+    implied = [value for pattern, value in SENIORITY_YEARS if pattern.search(text)]
+    if implied:
+        return float(min(implied)), False
+    return None, False
+
+
+def match_experience(candidate, required: Optional[str]) -> Optional[MatchEnum]:
+    # None means uncertain
+    needed, exact = required_years(required)
+    if needed is None:
+        return None
+    if needed == 0:
+        return MatchEnum.YES
+    have = parse_years(candidate)
+    # The resume prompt answers 0 when it cannot tell, so 0 is no evidence either way
+    if not have:
+        return None
+    if have >= needed:
+        return MatchEnum.YES
+    if exact or have < needed / 2:
+        return MatchEnum.NO
+    return None
+
+
+DEGREE_LEVELS = [
+    (re.compile(r"\b(ph\.?\s?d|doctorate|doctoral|d\.?phil)\b", re.I), 4),
+    (re.compile(r"\b(masters?|m\.?\s?tech|m\.?\s?sc|mba|m\.?c\.?a|m\.?eng|m\.?phil|m\.?com|post[- ]?graduate|pgdm)\b", re.I), 3),
+    (re.compile(r"\b(M\.?S|M\.?E|M\.?A)\b"), 3),
+    (re.compile(r"\b(bachelors?|b\.?\s?tech|b\.?\s?sc|b\.?c\.?a|b\.?eng|b\.?com|undergraduate)\b", re.I), 2),
+    (re.compile(r"\b(B\.?S|B\.?E|B\.?A)\b"), 2),
+    (re.compile(r"\b(diploma|associate'?s? degree|associates)\b", re.I), 1),
+    (re.compile(r"\b(high school|secondary|12th|hsc|ged)\b", re.I), 0),
+]
+# "Degree in CS" or "any graduate" without a named degree means a Bachelor's
+GENERIC_DEGREE = re.compile(r"\b(degree|graduate|graduation)\b", re.I)
+SOFT_REQUIREMENT = re.compile(r"\b(preferred|equivalent|or similar|plus|nice to have|desirable|advantage)\b", re.I)
+
+
+def degree_levels(text: str) -> list[int]:
+    levels = [level for pattern, level in DEGREE_LEVELS if pattern.search(text)]
+    if not levels and GENERIC_DEGREE.search(text):
+        levels.append(2)
+    return levels
+
+
+def candidate_degree_level(education) -> Optional[int]:
+    if not education:
+        return None
+    entries = education if isinstance(education, list) else [education]
+    levels = []
+    for entry in entries:
+        text = (entry.get("degree") or "") if isinstance(entry, dict) else str(entry)
+        levels.extend(degree_levels(text))
+    return max(levels) if levels else None
+
+
+def match_education(candidate, required: Optional[str]) -> Optional[MatchEnum]:
+    if required is None or NOT_REQUIRED.match(required):
+        return MatchEnum.YES
+    levels = degree_levels(required)
+    if not levels:
+        return None
+    # "Bachelor's or Master's" asks for a Bachelor's
+    needed = min(levels)
+    have = candidate_degree_level(candidate)
+    if have is None:
+        return None
+    if have >= needed:
+        return MatchEnum.YES
+    return None if SOFT_REQUIREMENT.search(required) else MatchEnum.NO
+
+
+_counters = {"local": 0, "llm": 0}
+
+
+async def check_eligibility(profile: dict, structured_jd: JobData) -> ExperienceEducationMatch:
+    # Decided locally where the requirement parses; the LLM only settles what does not
+    experience = match_experience(profile.get("total_experience"), structured_jd.experience_level)
+    education = match_education(profile.get("education"), structured_jd.education)
+    if experience is not None and education is not None:
+        _counters["local"] += 1
+        return ExperienceEducationMatch(experience_match=experience, education_match=education)
+
+    _counters["llm"] += 1
+    result = await ainvoke_structured("eligibility", experience_education_match_prompt(), ExperienceEducationMatch, {
+        "candidate_experience": profile.get("total_experience"),
+        "candidate_education": profile.get("education"),
+        "jd_experience": structured_jd.experience_level,
+        "jd_education": structured_jd.education
+    })
+    return ExperienceEducationMatch(
+        experience_match=experience or result.experience_match,
+        education_match=education or result.education_match,
+    )
+
+
+def stats() -> dict:
+    return dict(_counters)
+
+
+register_collector("eligibility", stats)
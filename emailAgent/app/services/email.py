@@ -1,49 +1,222 @@
 from app.core.llm import llm
-from app.utils.prompts import email_generation_prompt, experience_education_match_prompt, job_structuring_prompt
-from app.models.jobUrl import EmailContent, ExperienceEducationMatch, JobData
-from app.core.database import users_collection
-from app.vector_db.resume import get_user_resumes_from_vector_db
-def generate_email_service(job_posting: str,user):
-    chain= job_structuring_prompt()|llm.with_structured_output(JobData)
-    structured_jd=chain.invoke({"job_posting": job_posting})
+from app.core.llm_gateway import ainvoke_structured, gateway
+from app.core.llm_cache import llm_cache
+from app.utils.prompts import email_generation_prompt, job_structuring_prompt
+from app.models.jobUrl import EmailContent, JobData
+from app.vector_db.resume import aget_user_resumes_from_vector_db
+from app.services.job_cache import job_cache, normalize_url
+from app.core.config import settings
+from app.utils.scraper import HostLimiter, fetch_page
+from app.utils.job_posting import job_fields_from_ld, missing_job_fields, partial_job_model
+from app.models.jobUrl import ScrapedPage
+from app.utils.prompt_budget import afit_prompt
+from app.services.eligibility import check_eligibility, match_skills
+from app.utils.pipeline import Pipeline, PipelineAborted
+from langchain_core.output_parsers.openai_tools import JsonOutputKeyToolsParser
+import asyncio
+import logging
 
+logger = logging.getLogger(__name__)
 
-    mongoUserData=users_collection.find_one(
-        filter={"email": user.email},
+# Pipeline stages reported to streaming clients, and the event name used for each
+STAGE_EVENTS = {"job": "structured", "eligibility": "eligibility", "retrieval": "retrieved"}
+
+async def get_structured_job(url: str, emit=None, limiter=None) -> JobData:
+    # Same posting seen recently: skip both the scrape and the LLM call
+    structured_jd = await job_cache.get_by_url(url)
+    if structured_jd is not None:
+        if emit:
+            emit("scraped", {"cached": True})
+        return structured_jd
+
+    page = await fetch_page(url, limiter)
+    if emit:
+        emit("scraped", {"cached": False, "characters": len(page.text), "structured_markup": page.job_posting is not None})
+    structured_jd = await job_cache.get_by_content(page.text)
+    if structured_jd is None:
+        structured_jd = await structure_job(page)
+    await job_cache.put(url, page.text, structured_jd)
+    return structured_jd
+
+async def structure_job(page: ScrapedPage) -> JobData:
+    # schema.org JobPosting markup is taken as is; the LLM only fills what it lacks
+    fields = {}
+    if page.job_posting:
+        try:
+            fields = job_fields_from_ld(page.job_posting)
+            if not missing_job_fields(fields):
+                return JobData(**fields)
+        except Exception as exc:
+            # Markup comes from the job site; when it is malformed the LLM reads the page instead
+            logger.warning("Ignoring malformed JobPosting markup: %s", exc)
+            fields = {}
+    schema = partial_job_model(fields) if fields else JobData
+    prompt = job_structuring_prompt()
+    inputs = await afit_prompt("job_structuring", prompt, {"job_posting": page.text}, settings.STRUCTURING_PROMPT_TOKEN_BUDGET, {"job_posting": 1.0})
+    extracted=await ainvoke_structured("job_structuring", prompt, schema, inputs)
+    return JobData(**{**extracted.model_dump(), **fields})
+
+async def astream_email(inputs: dict, emit) -> EmailContent:
+    # Same cache entry as the non-streaming path; a hit is sent as whole fields
+    prompt = email_generation_prompt()
+    key = llm_cache.key("email_generation", prompt, EmailContent, inputs)
+    cached = await llm_cache.aget(key, EmailContent)
+    if cached is not None:
+        for field, value in cached.model_dump().items():
+            emit("email_field", {"field": field, "value": value})
+        return cached
+
+    # Stream the tool-call arguments so each EmailContent field arrives as it is written
+    email_chain = prompt | llm.bind_tools([EmailContent], tool_choice="EmailContent") | JsonOutputKeyToolsParser(key_name="EmailContent", first_tool_only=True)
+    sent = {}
+    partial = {}
+    async for partial in gateway.astream("email_generation", email_chain, inputs):
+        if not isinstance(partial, dict):
+            continue
+        for field, value in partial.items():
+            if not isinstance(value, str) or value == sent.get(field):
+                continue
+            previous = sent.get(field, "")
+            if value.startswith(previous):
+                emit("email_delta", {"field": field, "delta": value[len(previous):]})
+            else:
+                emit("email_field", {"field": field, "value": value})
+            sent[field] = value
+    email = EmailContent(**partial)
+    await llm_cache.aset(key, "email_generation", email)
+    return email
+
+def build_email_pipeline(url: str,user,emit=None,limiter=None,retrieval_cache=None) -> Pipeline:
+    pipeline = Pipeline()
+
+    @pipeline.stage("job")
+    async def job():
+        return await get_structured_job(url, emit, limiter)
+
+    # The auth middleware already loaded the profile for this request
+    @pipeline.stage("profile")
+    async def profile():
+        return user.model_dump()
+
+    @pipeline.stage("eligibility", "job", "profile")
+    async def eligibility(structured_jd, mongoUserData):
+        result = await check_eligibility(mongoUserData, structured_jd)
+        if result.experience_match == "no" or result.education_match == "no":
+            raise PipelineAborted({"message": "Candidate does not meet the job requirements."})
+        return result
+
+    # Retrieval only needs the JD, so it overlaps with the eligibility call
+    @pipeline.stage("retrieval", "job")
+    async def retrieval(structured_jd):
+        if retrieval_cache is None:
+            return await aget_user_resumes_from_vector_db(user,structured_jd)
+        # Identical JDs in a batch share one lookup; shield it from a sibling's cancellation
+        key = structured_jd.model_dump_json()
+        if key not in retrieval_cache:
+            retrieval_cache[key] = asyncio.ensure_future(aget_user_resumes_from_vector_db(user,structured_jd))
+        return await asyncio.shield(retrieval_cache[key])
+
+    @pipeline.stage("email", "job", "profile", "eligibility", "retrieval")
+    async def email(structured_jd, mongoUserData, _eligibility, chromaUserData):
+        matched_skills = match_skills(
+            [skill['name'] for skill in mongoUserData.get("skills") or []],
+            [skill.name for skill in structured_jd.skills],
+        )
+        matched_skills_str = ", ".join(matched_skills)
+        # Retrieved chunks arrive best-first, so trimming keeps the most relevant ones
+        chroma_items = [f"- {item['type'].title()}: {item['content']}" for item in chromaUserData]
+
+        inputs = {
+            "name": mongoUserData.get("full_name"),
+            "email": mongoUserData.get("email"),
+            "phone": mongoUserData.get("phone"),
+            "matched_skills": matched_skills_str,  
+            "chroma_data": chroma_items,
+            "job_title": structured_jd.job_title,
+            "company_name": structured_jd.company_name,
+            "description": structured_jd.description,
+            "responsibilities": [f"- {item}" for item in structured_jd.responsibilities or []],
+            "jd_skills": ", ".join([skill.name for skill in structured_jd.skills]),  
+        }
+        inputs = await afit_prompt(
+            "email_generation", email_generation_prompt(), inputs, settings.EMAIL_PROMPT_TOKEN_BUDGET,
+            {"chroma_data": 0.4, "responsibilities": 0.3, "description": 1.0},
+        )
+        if emit:
+            return await astream_email(inputs, emit)
+
+        return await ainvoke_structured("email_generation", email_generation_prompt(), EmailContent, inputs)
+
+    return pipeline
+
+async def generate_email_service(url: str,user):
+    try:
+        results = await build_email_pipeline(url,user).run()
+    except PipelineAborted as aborted:
+        return aborted.result
+    return results["email"]
+
+async def generate_emails_batch_service(urls: list[str],user) -> list[dict]:
+    # Deduplicate equivalent links, keeping the first spelling of each
+    unique = {}
+    for url in urls:
+        unique.setdefault(normalize_url(url), url)
+
+    limiter = HostLimiter(
+        settings.BATCH_FETCH_CONCURRENCY,
+        settings.BATCH_PER_HOST_CONCURRENCY,
+        settings.BATCH_HOST_DELAY_SECONDS,
     )
-    eligibility_chain = experience_education_match_prompt() | llm.with_structured_output(ExperienceEducationMatch)
-
-    result = eligibility_chain.invoke({
-        "candidate_experience": mongoUserData.get("total_experience"),
-        "candidate_education": mongoUserData.get("education"),
-        "jd_experience": structured_jd.experience_level,
-        "jd_education": structured_jd.education
-    })
-
-    if result.experience_match == "no" or result.education_match == "no":
-        return {"message": "Candidate does not meet the job requirements."}
-
-    mongo_skills = [skill['name'].lower() for skill in mongoUserData.get("skills", [])]
-    jd_skills = [skill.name.lower() for skill in structured_jd.skills]
-    matched_skills = list(set(mongo_skills) & set(jd_skills))
-    matched_skills_str = ", ".join(matched_skills)
-    chromaUserData=get_user_resumes_from_vector_db(user,structured_jd)
-    chroma_text = "\n".join([f"- {item['type'].title()}: {item['content']}" for item in chromaUserData])
-
-    email_chain = email_generation_prompt() | llm.with_structured_output(EmailContent)
-
-    email_content = email_chain.invoke({
-        "name": mongoUserData.get("full_name"),
-        "email": mongoUserData.get("email"),
-        "phone": mongoUserData.get("phone"),
-        "matched_skills": matched_skills_str,  
-        "chroma_data": chroma_text,
-        "job_title": structured_jd.job_title,
-        "company_name": structured_jd.company_name,
-        "description": structured_jd.description,
-        "responsibilities": structured_jd.responsibilities,
-        "jd_skills": ", ".join([skill.name for skill in structured_jd.skills]),  
-    })
-
-
-    return email_content
\ No newline at end of file
+    retrieval_cache = {}
+    results = {}
+    queue = asyncio.Queue()
+    for key, url in unique.items():
+        queue.put_nowait((key, url))
+
+    async def worker():
+        while not queue.empty():
+            key, url = queue.get_nowait()
+            try:
+                pipeline = build_email_pipeline(url,user,limiter=limiter,retrieval_cache=retrieval_cache)
+                email = (await pipeline.run())["email"]
+            except PipelineAborted as aborted:
+                email = aborted.result
+            except Exception as exc:
+                results[key] = {"error": str(exc)}
+                continue
+            results[key] = {"email": email}
+
+    workers = min(settings.BATCH_GENERATION_CONCURRENCY, len(unique))
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return [{"url": url, **results[normalize_url(url)]} for url in urls]
+
+async def stream_email_service(url: str,user):
+    queue = asyncio.Queue()
+
+    def emit(event, data):
+        queue.put_nowait((event, data))
+
+    async def on_stage_done(name, value):
+        if name in STAGE_EVENTS:
+            emit(STAGE_EVENTS[name], value)
+
+    async def run():
+        try:
+            try:
+                results = await build_email_pipeline(url,user,emit).run(on_stage_done)
+                email = results["email"]
+            except PipelineAborted as aborted:
+                email = aborted.result
+            # Same payload as the non-streaming endpoint, always the last event
+            emit("done", {"message": "Email generated successfully", "email": email})
+        except Exception as exc:
+            emit("error", {"detail": str(exc)})
+        finally:
+            queue.put_nowait(None)
+
+    task = asyncio.create_task(run())
+    try:
+        while (item := await queue.get()) is not None:
+            yield item
+    finally:
+        task.cancel()
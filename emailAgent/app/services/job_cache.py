@@ -0,0 +1,157 @@
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure, PyMongoError
+from app.core.config import settings
+from app.core.database import job_cache_collection
+from app.core.metrics import register_collector, span
+from app.models.jobUrl import JobData
+from app.utils.lru import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Raised by create_index when an index on the same keys exists with other options
+INDEX_OPTIONS_CONFLICT = 85
+
+TRACKING_PARAMS = {"gclid", "fbclid", "mc_cid", "mc_eid", "trk", "trackingid", "refid"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    # Drop tracking parameters and sort the rest so equivalent links share a key
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class JobCache:
+    def __init__(self, collection, maxsize: int, ttl_seconds: int):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        # url -> content hash, content hash -> JobData
+        self._by_url = TTLCache(maxsize, ttl_seconds)
+        self._by_hash = TTLCache(maxsize, ttl_seconds)
+        self._counters = {"url_hits": 0, "content_hits": 0, "misses": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self._indexes_ready = False
+
+    async def _ensure_indexes(self):
+        if self._indexes_ready:
+            return
+        await self.collection.create_index([("urls", ASCENDING)])
+        try:
+            await self.collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+        except OperationFailure as exc:
+            if exc.code != INDEX_OPTIONS_CONFLICT:
+                raise
+            # JOB_CACHE_TTL_SECONDS changed since the index was built; update it in place
+            logger.info("Changing job_cache expiry to %ds", self.ttl_seconds)
+            await self.collection.database.command(
+                "collMod", self.collection.name,
+                index={"keyPattern": {"created_at": 1}, "expireAfterSeconds": self.ttl_seconds},
+            )
+        self._indexes_ready = True
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _failed(self, action: str, exc: Exception):
+        # An unreachable cache means a fresh scrape, not a failed request
+        self._count("errors")
+        logger.warning("Job cache %s failed: %s", action, exc)
+
+    async def _load(self, query: dict) -> Optional[tuple[str, JobData]]:
+        try:
+            await self._ensure_indexes()
+            with span("mongo.job_cache"):
+                doc = await self.collection.find_one(query, sort=[("created_at", DESCENDING)])
+        except PyMongoError as exc:
+            self._failed("read", exc)
+            return None
+        if doc is None:
+            return None
+        job_data = JobData(**doc["job_data"])
+        self._by_hash.set(doc["_id"], job_data)
+        return doc["_id"], job_data
+
+    async def get_by_url(self, url: str) -> Optional[JobData]:
+        url = normalize_url(url)
+        digest = self._by_url.get(url)
+        job_data = self._by_hash.get(digest) if digest else None
+        if job_data is None:
+            found = await self._load({"urls": url})
+            if found is None:
+                return None
+            digest, job_data = found
+            self._by_url.set(url, digest)
+        self._count("url_hits")
+        return job_data
+
+    async def get_by_content(self, content: str) -> Optional[JobData]:
+        digest = content_hash(content)
+        job_data = self._by_hash.get(digest)
+        if job_data is None:
+            found = await self._load({"_id": digest})
+            if found is None:
+                self._count("misses")
+                return None
+            job_data = found[1]
+        self._count("content_hits")
+        return job_data
+
+    async def put(self, url: str, content: str, job_data: JobData):
+        url = normalize_url(url)
+        digest = content_hash(content)
+        try:
+            await self._ensure_indexes()
+            with span("mongo.job_cache"):
+                await self.collection.update_one(
+                    {"_id": digest},
+                    {
+                        "$set": {"job_data": job_data.model_dump(), "created_at": datetime.utcnow()},
+                        "$addToSet": {"urls": url},
+                    },
+                    upsert=True,
+                )
+        except PyMongoError as exc:
+            self._failed("write", exc)
+        self._by_hash.set(digest, job_data)
+        self._by_url.set(url, digest)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["url_hits"] + counters["content_hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_ratio": (lookups - counters["misses"]) / lookups if lookups else 0.0,
+            "scrapes_saved": counters["url_hits"],
+            "llm_calls_saved": counters["url_hits"] + counters["content_hits"],
+            "memory_entries": len(self._by_hash),
+        }
+
+
+job_cache = JobCache(
+    job_cache_collection,
+    maxsize=settings.JOB_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.JOB_CACHE_TTL_SECONDS,
+)
+register_collector("job_cache", job_cache.stats)
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from app.core.config import settings
+from app.core.metrics import register_collector, span
+
+logger = logging.getLogger(__name__)
+
+# Pinning min/max rounds makes any hash made with a different cost "need update",
+# so changing BCRYPT_ROUNDS rehashes passwords transparently on the next login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    # bcrypt runs on a process pool; admission is bounded globally and per IP/email
+    def __init__(self, workers: int, max_queue: int, per_key_limit: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.per_key_limit = per_key_limit
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._pending = 0
+        self._per_key = {}
+        self._latencies = deque(maxlen=1000)
+        self._counters = {"hashed": 0, "verified": 0, "rehashed": 0, "rejected_queue": 0, "rejected_key": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _admit(self, keys: list[str]):
+        # Only touched from the event loop thread, so plain counters are safe. Returns the
+        # function that gives the slot back
+        if self._pending >= self.max_queue:
+            self._counters["rejected_queue"] += 1
+            logger.warning("Password hashing queue full (%d pending)", self._pending)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        if any(self._per_key.get(key, 0) >= self.per_key_limit for key in keys):
+            self._counters["rejected_key"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many concurrent attempts, please try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        for key in keys:
+            self._per_key[key] = self._per_key.get(key, 0) + 1
+
+        def release():
+            self._pending -= 1
+            for key in keys:
+                self._per_key[key] -= 1
+                if not self._per_key[key]:
+                    del self._per_key[key]
+
+        return release
+
+    async def _run(self, fn, *args, keys: list[str]):
+        release = self._admit(keys)
+        loop = asyncio.get_running_loop()
+        try:
+            job = self._get_executor().submit(fn, *args)
+        except BaseException:
+            release()
+            raise
+
+        def on_done(_):
+            # A client that disconnects stops waiting, but the hash keeps its worker busy until it
+            # finishes; the slot is held until then so the limits match the real pool load
+            try:
+                loop.call_soon_threadsafe(release)
+            except RuntimeError:
+                pass  # loop already closed at shutdown
+
+        job.add_done_callback(on_done)
+        started = time.perf_counter()
+        with span(f"bcrypt.{fn.__name__.lstrip('_')}"):
+            result = await asyncio.wrap_future(job)
+        elapsed = time.perf_counter() - started
+        self._latencies.append(elapsed)
+        logger.debug("%s took %.3fs (%d pending)", fn.__name__, elapsed, self._pending)
+        return result
+
+    async def hash(self, password: str, keys: list[str]) -> str:
+        hashed = await self._run(_hash, password, keys=keys)
+        self._counters["hashed"] += 1
+        return hashed
+
+    async def verify(self, password: str, hashed_password: str, keys: list[str]) -> tuple[bool, Optional[str]]:
+        # Returns (valid, new_hash); new_hash is set when the stored hash uses outdated parameters
+        valid, new_hash = await self._run(_verify_and_update, password, hashed_password, keys=keys)
+        self._counters["verified"] += 1
+        if new_hash:
+            self._counters["rehashed"] += 1
+        return valid, new_hash
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return {
+            **self._counters,
+            "queue_depth": self._pending,
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    per_key_limit=settings.PASSWORD_HASH_PER_KEY_LIMIT,
+)
+register_collector("password_hasher", password_hasher.stats)
@@ -1,18 +1,20 @@
 from sqlite3 import Date
 from app.utils.extract_text_pdf import extract_text_from_pdf
 from app.utils.prompts import resume_categorization_prompt
-from app.core.llm import llm
+from app.core.llm_gateway import invoke_structured
 from app.models.resumeModels import ResumeSchema
-from app.core.chroma_db import collection
 from app.models.user import User
-from app.core.database import users_collection
-from app.vector_db.resume import add_resume_to_vector_db
+from app.repositories import users
+from app.core.user_cache import invalidate_user
 
-def process_resume(file,user):
-    extracted_text = extract_text_from_pdf(file.file)
-    chain= resume_categorization_prompt()|llm.with_structured_output(ResumeSchema)
-    structured_resume=chain.invoke({"resume_text": extracted_text,"current_date": Date.today().strftime("%B %d, %Y")})
-    print(structured_resume)
+def process_resume(file,user,on_stage=None):
+    # on_stage(name) is called as each step finishes so queued jobs can report progress.
+    # Returns the structured resume; indexing it is left to the caller's process (see resume_jobs)
+    on_stage = on_stage or (lambda name: None)
+    extracted_text = extract_text_from_pdf(file)
+    on_stage("extracted")
+    structured_resume=invoke_structured("resume_categorization", resume_categorization_prompt(), ResumeSchema, {"resume_text": extracted_text,"current_date": Date.today().strftime("%B %d, %Y")})
+    on_stage("structured")
     resume_dict=structured_resume.model_dump()
     update_fields = {
         "total_experience": resume_dict.get("total_experience"),
@@ -22,12 +24,7 @@ def process_resume(file,user):
     }
 
     # Update user document in MongoDB
-    users_collection.update_one(
-        {"email": user.email},
-        {"$set": update_fields}
-    )
-    return add_resume_to_vector_db(resume_dict, user)
+    users.update_profile(user.email, update_fields)
+    invalidate_user(user.email)
+    on_stage("profile_updated")
     return resume_dict
-    
-    
-    
\ No newline at end of file
@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from gridfs.errors import NoFile
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.core.chroma_db import run_in_chroma
+from app.core.config import settings
+from app.core.database import (
+    async_resume_jobs_collection,
+    async_resume_uploads_bucket,
+    resume_job_locks_collection,
+    resume_jobs_collection,
+    resume_uploads_bucket,
+)
+from app.core.metrics import record, request_timings, span
+from app.core.user_cache import invalidate_user
+from app.models.user import UserProfile
+from app.services.resume import process_resume
+from app.utils.extract_text_pdf import extract_inline
+from app.vector_db.resume import add_resume_to_vector_db
+
+logger = logging.getLogger(__name__)
+
+# Longest pause between dispatcher retries while Mongo is failing
+MAX_LOOP_BACKOFF_SECONDS = 60.0
+
+# Stages reported by process_resume, in order; "indexed" is recorded by the dispatcher
+STAGES = ["extracted", "structured", "profile_updated", "indexed"]
+
+
+async def enqueue_resume_job(user, filename: str, content_type: str, data: bytes) -> str:
+    now = datetime.utcnow()
+    pdf_id = await async_resume_uploads_bucket.upload_from_stream(filename or "resume.pdf", data, metadata={"user_id": user.id})
+    result = await async_resume_jobs_collection.insert_one({
+        "user_id": user.id,
+        "email": user.email,
+        "filename": filename,
+        "content_type": content_type,
+        "pdf_id": pdf_id,
+        "status": "queued",
+        "stages": [],
+        "attempts": 0,
+        "error": None,
+        "run_after": now,
+        "created_at": now,
+        "updated_at": now,
+    })
+    resume_job_dispatcher.wake()
+    return str(result.inserted_id)
+
+
+async def get_resume_job(job_id: str, user) -> Optional[dict]:
+    try:
+        oid = ObjectId(job_id)
+    except InvalidId:
+        return None
+    job = await async_resume_jobs_collection.find_one({"_id": oid, "user_id": user.id}, projection={"pdf_id": 0})
+    if job is None:
+        return None
+    job["id"] = str(job.pop("_id"))
+    completed = {stage["name"] for stage in job["stages"]}
+    job["remaining_stages"] = [stage for stage in STAGES if stage not in completed]
+    return job
+
+
+def run_resume_job(job_id: str) -> tuple[dict, list]:
+    # Runs inside a worker process, which has its own Mongo client and metrics; stage timings
+    # are sent back with the result so the parent's /metrics includes them. Only extraction and
+    # the LLM call happen here: Chroma is written by the API process, which owns the store
+    timings = []
+    request_timings.set(timings)
+    job = resume_jobs_collection.find_one({"_id": ObjectId(job_id)})
+    # Indexing only needs the owner's id and email, both recorded on the job
+    user = UserProfile(id=job["user_id"], email=job["email"])
+
+    def on_stage(name):
+        now = datetime.utcnow()
+        resume_jobs_collection.update_one(
+            {"_id": job["_id"]},
+            {"$push": {"stages": {"name": name, "completed_at": now}}, "$set": {"updated_at": now}}
+        )
+
+    with resume_uploads_bucket.open_download_stream(job["pdf_id"]) as upload:
+        resume_dict = process_resume(upload, user, on_stage)
+    return resume_dict, timings
+
+
+class ResumeJobDispatcher:
+    def __init__(self, workers: int, poll_seconds: float):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self._executor = None
+        self._task = None
+        self._running = set()
+        self._wakeup = asyncio.Event()
+
+    def _new_executor(self):
+        # spawn, not fork: the parent already holds Mongo clients and model threads
+        # Each worker already is a process of its own: PDFs are extracted in it, not on a nested pool
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=extract_inline)
+
+    def start(self):
+        self._executor = self._new_executor()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        tasks = [self._task, *self._running] if self._task else list(self._running)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def wake(self):
+        self._wakeup.set()
+
+    async def _ensure_indexes(self):
+        await async_resume_jobs_collection.create_index([("status", ASCENDING), ("run_after", ASCENDING), ("created_at", ASCENDING)])
+        await async_resume_jobs_collection.create_index([("user_id", ASCENDING), ("created_at", ASCENDING)])
+
+    async def _loop(self):
+        indexed = False
+        failures = 0
+        while True:
+            # A Mongo hiccup must not end the loop: queued uploads would then never run
+            try:
+                if not indexed:
+                    await self._ensure_indexes()
+                    indexed = True
+                while len(self._running) < self.workers:
+                    job = await self._claim()
+                    if job is None:
+                        break
+                    task = asyncio.create_task(self._execute(job))
+                    self._running.add(task)
+                    task.add_done_callback(self._running.discard)
+                failures = 0
+            except Exception:
+                failures += 1
+                delay = min(MAX_LOOP_BACKOFF_SECONDS, self.poll_seconds * 2 ** failures)
+                logger.exception("Resume job dispatcher failed (%d in a row), retrying in %.1fs", failures, delay)
+                await asyncio.sleep(delay)
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _recover_stale(self, now: datetime):
+        # Jobs and locks left behind by a crashed or timed-out dispatcher
+        cutoff = now - timedelta(seconds=2 * settings.RESUME_JOB_TIMEOUT_SECONDS)
+        await resume_job_locks_collection.delete_many({"locked_at": {"$lt": cutoff}})
+        await async_resume_jobs_collection.update_many(
+            {"status": "running", "started_at": {"$lt": cutoff}},
+            {"$set": {"status": "queued", "run_after": now, "updated_at": now}}
+        )
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.utcnow()
+        await self._recover_stale(now)
+        candidates = async_resume_jobs_collection.find(
+            {"status": "queued", "run_after": {"$lte": now}},
+            projection={"user_id": 1},
+            sort=[("created_at", ASCENDING)],
+            limit=50,
+        )
+        async for candidate in candidates:
+            # One job per user at a time, so the Chroma delete/add never interleaves
+            try:
+                await resume_job_locks_collection.insert_one({"_id": candidate["user_id"], "job_id": candidate["_id"], "locked_at": now})
+            except DuplicateKeyError:
+                continue
+            job = await async_resume_jobs_collection.find_one_and_update(
+                {"_id": candidate["_id"], "status": "queued"},
+                {"$set": {"status": "running", "stages": [], "started_at": now, "updated_at": now}, "$inc": {"attempts": 1}},
+                return_document=ReturnDocument.AFTER,
+            )
+            if job is None:
+                await resume_job_locks_collection.delete_one({"_id": candidate["user_id"], "job_id": candidate["_id"]})
+                continue
+            return job
+        return None
+
+    async def _discard_upload(self, job: dict):
+        # The PDF is only kept while the job can still run
+        try:
+            await async_resume_uploads_bucket.delete(job["pdf_id"])
+        except NoFile:
+            pass
+
+    async def _execute(self, job: dict):
+        loop = asyncio.get_running_loop()
+        release_lock = True
+        try:
+            with span("resume.job"):
+                resume_dict, timings = await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, run_resume_job, str(job["_id"])),
+                    settings.RESUME_JOB_TIMEOUT_SECONDS,
+                )
+            for stage, seconds in timings:
+                record(stage, seconds)
+            invalidate_user(job["email"])
+            # Embedded Chroma is not safe to write from several processes; index through our own client
+            user = UserProfile(id=job["user_id"], email=job["email"])
+            ids = await run_in_chroma(add_resume_to_vector_db, resume_dict, user)
+            now = datetime.utcnow()
+            await async_resume_jobs_collection.update_one(
+                {"_id": job["_id"]},
+                {"$push": {"stages": {"name": "indexed", "completed_at": now}}, "$set": {"updated_at": now}}
+            )
+            update = {"status": "succeeded", "indexed_chunks": len(ids), "error": None}
+            # An older upload still waiting to retry must not overwrite this one
+            older = async_resume_jobs_collection.find(
+                {"user_id": job["user_id"], "status": "queued", "created_at": {"$lt": job["created_at"]}},
+                projection={"pdf_id": 1},
+            )
+            async for old in older:
+                await async_resume_jobs_collection.update_one({"_id": old["_id"]}, {"$set": {"status": "superseded"}})
+                await self._discard_upload(old)
+        except Exception as exc:
+            if isinstance(exc, BrokenProcessPool):
+                self._executor = self._new_executor()
+            if isinstance(exc, asyncio.TimeoutError):
+                # The worker may still be writing; keep the user locked until the lock goes stale
+                release_lock = False
+            if job["attempts"] < settings.RESUME_JOB_MAX_ATTEMPTS:
+                delay = settings.RESUME_JOB_RETRY_BACKOFF_SECONDS * 2 ** (job["attempts"] - 1)
+                update = {"status": "queued", "error": str(exc) or type(exc).__name__, "run_after": datetime.utcnow() + timedelta(seconds=delay)}
+            else:
+                update = {"status": "failed", "error": str(exc) or type(exc).__name__}
+        update["updated_at"] = datetime.utcnow()
+        await async_resume_jobs_collection.update_one({"_id": job["_id"]}, {"$set": update})
+        if update["status"] != "queued":
+            await self._discard_upload(job)
+        if release_lock:
+            await resume_job_locks_collection.delete_one({"_id": job["user_id"], "job_id": job["_id"]})
+        self.wake()
+
+
+resume_job_dispatcher = ResumeJobDispatcher(
+    workers=settings.RESUME_WORKERS,
+    poll_seconds=settings.RESUME_JOB_POLL_SECONDS,
+)
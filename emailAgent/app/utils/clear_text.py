@@ -1,16 +1,74 @@
 import re
 
+MAX_TAG_LENGTH = 2048
+
+TAG = rf"<[^<>]{{0,{MAX_TAG_LENGTH}}}>"
+URL = r"https?://\S+|www\.\S+"
+INVISIBLE = r"\x00-\x08\x7f\u200b\ufeff"
+
+# One run of anything that collapses to a single space: tags, URLs, whitespace
+# (Unicode-aware) and invisible control characters. Letters in any script and
+# punctuation such as C++, C# or "5+ years" are kept. A lone space between words
+# is already clean, so it never starts a match; that skips one no-op replacement per word.
+JUNK_RUN = re.compile(
+    rf"(?:{TAG}|{URL}|[^\S ]|[{INVISIBLE}]| (?=[\s{INVISIBLE}<]|https?://|www\.))"
+    rf"(?:{TAG}|{URL}|[\s{INVISIBLE}])*"
+)
+
+
 def clean_text(text):
-    # Remove HTML tags
-    text = re.sub(r'<[^>]*?>', '', text)
-    # Remove URLs
-    text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-    # Remove special characters
-    text = re.sub(r'[^a-zA-Z0-9 ]', '', text)
-    # Replace multiple spaces with a single space
-    text = re.sub(r'\s{2,}', ' ', text)
-    # Trim leading and trailing whitespace
-    text = text.strip()
-    # Remove extra whitespace
-    text = ' '.join(text.split())
-    return text
\ No newline at end of file
+    return JUNK_RUN.sub(" ", text).strip()
+
+
+class TextNormalizer:
+    # Streaming clean_text: feed() chunks, then flush(); the joined output equals clean_text(whole text)
+    def __init__(self):
+        self._buffer = ""
+        self._started = False
+        self._pending_space = False
+
+    def _emit(self, segment: str) -> str:
+        normalized = JUNK_RUN.sub(" ", segment)
+        core = normalized.strip()
+        if not core:
+            self._pending_space = self._pending_space or bool(normalized)
+            return ""
+        prefix = " " if self._started and (self._pending_space or normalized[0] == " ") else ""
+        self._started = True
+        self._pending_space = normalized[-1] == " "
+        return prefix + core
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk
+        # A tag still open at the end may close in the next chunk
+        limit = len(self._buffer)
+        open_tag = self._buffer.rfind("<")
+        if open_tag > self._buffer.rfind(">") and limit - open_tag <= MAX_TAG_LENGTH + 1:
+            limit = open_tag
+        # Everything before the last junk run is final; the run itself may continue.
+        # A lone space after the last run is a run of its own and also a safe cut.
+        cut = end = 0
+        for match in JUNK_RUN.finditer(self._buffer, 0, limit):
+            cut, end = match.start(), match.end()
+        space = self._buffer.rfind(" ", end, limit)
+        if space > cut:
+            cut = space
+        if not cut:
+            return ""
+        segment, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        return self._emit(segment)
+
+    def flush(self) -> str:
+        segment, self._buffer = self._buffer, ""
+        return self._emit(segment)
+
+
+def normalize_chunks(chunks):
+    normalizer = TextNormalizer()
+    for chunk in chunks:
+        text = normalizer.feed(chunk)
+        if text:
+            yield text
+    text = normalizer.flush()
+    if text:
+        yield text
@@ -1,13 +1,159 @@
+import atexit
+import hashlib
+import io
+import logging
+import math
+import multiprocessing
+import threading
+import time
+from datetime import datetime
 import pdfplumber
+from pymongo.errors import OperationFailure, PyMongoError
+from app.core.config import settings
+from app.core.database import pdf_text_cache_collection
+from app.core.metrics import span
+from app.utils.lru import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Raised by create_index when an index on the same keys exists with other options
+INDEX_OPTIONS_CONFLICT = 85
+
+# Extracted text by sha256 of the file, so re-uploading the same PDF skips extraction
+_text_cache = TTLCache(256, settings.PDF_TEXT_CACHE_TTL_SECONDS)
+_cache_indexes_ready = False
+
+_pool = None
+_pool_lock = threading.Lock()
+# Set in processes that are themselves pool workers, which must not start a pool of their own
+_inline = False
+
+
+def extract_inline():
+    global _inline
+    _inline = True
+
+
+def _get_pool():
+    # multiprocessing.Pool rather than ProcessPoolExecutor: terminate() is public API
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = multiprocessing.get_context("spawn").Pool(settings.PDF_WORKERS)
+        return _pool
+
+
+def _kill_pool():
+    # A stuck page keeps its worker busy forever; drop the whole pool
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.terminate()
+            _pool = None
+
+
+# Pool workers are not joined at interpreter exit on their own
+atexit.register(_kill_pool)
+
+
+def _extract_pages(data: bytes, start: int, end: int) -> list[str]:
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return [pdf.pages[index].extract_text() or "" for index in range(start, end)]
+
+
+def _ensure_ttl_index():
+    try:
+        pdf_text_cache_collection.create_index("created_at", expireAfterSeconds=settings.PDF_TEXT_CACHE_TTL_SECONDS)
+    except OperationFailure as exc:
+        if exc.code != INDEX_OPTIONS_CONFLICT:
+            raise
+        # PDF_TEXT_CACHE_TTL_SECONDS changed since the index was built; update it in place
+        logger.info("Changing pdf_text_cache expiry to %ds", settings.PDF_TEXT_CACHE_TTL_SECONDS)
+        pdf_text_cache_collection.database.command(
+            "collMod", pdf_text_cache_collection.name,
+            index={"keyPattern": {"created_at": 1}, "expireAfterSeconds": settings.PDF_TEXT_CACHE_TTL_SECONDS},
+        )
+
+
+def _cached_text(digest: str):
+    global _cache_indexes_ready
+    text = _text_cache.get(digest)
+    if text is not None or not settings.PDF_TEXT_CACHE_PERSIST:
+        return text
+    try:
+        if not _cache_indexes_ready:
+            _ensure_ttl_index()
+            _cache_indexes_ready = True
+        doc = pdf_text_cache_collection.find_one({"_id": digest})
+    except PyMongoError as exc:
+        # A broken cache only costs an extraction
+        logger.warning("PDF text cache read failed: %s", exc)
+        return None
+    if doc is not None:
+        _text_cache.set(digest, doc["text"])
+        return doc["text"]
+    return None
+
+
+def _store_text(digest: str, text: str):
+    _text_cache.set(digest, text)
+    if settings.PDF_TEXT_CACHE_PERSIST:
+        try:
+            pdf_text_cache_collection.update_one(
+                {"_id": digest},
+                {"$set": {"text": text, "created_at": datetime.utcnow()}},
+                upsert=True,
+            )
+        except PyMongoError as exc:
+            logger.warning("PDF text cache write failed: %s", exc)
+
+
+def _extract(data: bytes) -> list[str]:
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        page_count = len(pdf.pages)
+    if page_count > settings.PDF_MAX_PAGES:
+        raise ValueError(f"PDF has {page_count} pages, the limit is {settings.PDF_MAX_PAGES}")
+    if page_count == 0:
+        return []
+
+    # Split pages into one contiguous range per worker; short documents stay in one range
+    workers = 1 if _inline or page_count < settings.PDF_PARALLEL_MIN_PAGES else settings.PDF_WORKERS
+    step = max(1, math.ceil(page_count / workers))
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+    if len(ranges) == 1:
+        # Nothing to split: a pool would only add process startup and a copy of the file.
+        # The resume job timeout bounds this path
+        return _extract_pages(data, 0, page_count)
+
+    pool = _get_pool()
+    results = [pool.apply_async(_extract_pages, (data, start, end)) for start, end in ranges]
+    deadline = time.monotonic() + settings.PDF_TIMEOUT_SECONDS
+    for result in results:
+        result.wait(max(0.0, deadline - time.monotonic()))
+    if not all(result.ready() for result in results):
+        _kill_pool()
+        raise ValueError(f"PDF extraction timed out after {settings.PDF_TIMEOUT_SECONDS}s")
+    return [page for result in results for page in result.get()]
+
 
 def extract_text_from_pdf(file) -> str:
-    text = ""
+    data = file.read(settings.PDF_MAX_BYTES + 1)
+    if len(data) > settings.PDF_MAX_BYTES:
+        raise ValueError(f"PDF is larger than {settings.PDF_MAX_BYTES} bytes")
+
+    digest = hashlib.sha256(data).hexdigest()
+    text = _cached_text(digest)
+    if text is not None:
+        return text
+
     try:
-        with pdfplumber.open(file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        with span("pdf.extract"):
+            pages = _extract(data)
+    except ValueError:
+        raise
     except Exception as e:
         raise ValueError(f"Error reading PDF: {str(e)}")
-    return text
\ No newline at end of file
+    text = "".join(f"{page}\n" for page in pages if page)
+    _store_text(digest, text)
+    return text
@@ -0,0 +1,128 @@
+import json
+import re
+from typing import Optional
+from bs4 import BeautifulSoup
+
+# Elements that never hold the posting itself
+BOILERPLATE_TAGS = ["script", "style", "noscript", "template", "svg", "iframe", "form", "nav", "header", "footer", "aside", "button", "select"]
+CANDIDATE_TAGS = ["article", "main", "section", "div", "td"]
+BLOCK_TAGS = ["p", "li", "pre", "blockquote", "dd", "h1", "h2", "h3", "h4"]
+
+POSITIVE_HINTS = re.compile(r"job|posting|description|vacanc|career|content|article|main|detail|body", re.I)
+NEGATIVE_HINTS = re.compile(r"comment|sidebar|footer|header|nav|menu|share|social|related|recommend|cookie|banner|promo|ad-|modal|login|signup", re.I)
+MIN_MAIN_TEXT = 200
+
+
+def _iter_ld_objects(data):
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_ld_objects(item)
+    elif isinstance(data, dict):
+        yield data
+        yield from _iter_ld_objects(data.get("@graph", []))
+
+
+def extract_job_posting_ld(soup: BeautifulSoup) -> Optional[dict]:
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        for obj in _iter_ld_objects(data):
+            types = obj.get("@type")
+            types = types if isinstance(types, list) else [types]
+            if "JobPosting" in types:
+                return obj
+    return None
+
+
+def html_fragment_text(html: str) -> str:
+    # JSON-LD descriptions are usually HTML-escaped markup
+    return BeautifulSoup(html, "html.parser").get_text(" ")
+
+
+def ld_name(value) -> Optional[str]:
+    if isinstance(value, dict):
+        return value.get("name")
+    if isinstance(value, list):
+        return ", ".join(filter(None, (ld_name(item) for item in value))) or None
+    return value
+
+
+def job_posting_ld_text(posting: dict) -> str:
+    parts = []
+    for label, value in [
+        ("Title", posting.get("title")),
+        ("Company", ld_name(posting.get("hiringOrganization"))),
+        ("Location", ld_name(posting.get("jobLocation"))),
+        ("Employment type", posting.get("employmentType")),
+        ("Experience", ld_name(posting.get("experienceRequirements"))),
+        ("Education", ld_name(posting.get("educationRequirements"))),
+        ("Skills", ld_name(posting.get("skills"))),
+        ("Responsibilities", posting.get("responsibilities")),
+        ("Qualifications", posting.get("qualifications")),
+        ("Description", posting.get("description")),
+    ]:
+        if isinstance(value, list):
+            value = ", ".join(str(item) for item in value)
+        if value:
+            parts.append(f"{label}: {html_fragment_text(str(value))}")
+    return "\n".join(parts)
+
+
+def _class_weight(element) -> float:
+    hints = " ".join(element.get("class", [])) + " " + (element.get("id") or "")
+    weight = 1.0
+    if element.name in ("article", "main"):
+        weight *= 1.5
+    if POSITIVE_HINTS.search(hints):
+        weight *= 1.3
+    if NEGATIVE_HINTS.search(hints):
+        weight *= 0.3
+    return weight
+
+
+def _link_density(element, text_length: int) -> float:
+    link_text = sum(len(a.get_text(" ", strip=True)) for a in element.find_all("a"))
+    return link_text / text_length if text_length else 1.0
+
+
+def extract_main_text(soup: BeautifulSoup) -> str:
+    # Readability-style: paragraphs vote for their parent (and half for the grandparent),
+    # the best-scoring container after link-density and class/id weighting wins
+    for tag in soup.find_all(BOILERPLATE_TAGS):
+        tag.decompose()
+    body = soup.body or soup
+    scores = {}
+    for block in body.find_all(BLOCK_TAGS):
+        text = block.get_text(" ", strip=True)
+        if len(text) < 25:
+            continue
+        points = 1 + text.count(",") + min(len(text) / 100, 3)
+        parent = block.parent
+        for ancestor, share in ((parent, 1.0), (parent.parent if parent else None, 0.5)):
+            if ancestor is not None and ancestor.name in CANDIDATE_TAGS + ["body"]:
+                _, current = scores.get(id(ancestor), (ancestor, 0.0))
+                scores[id(ancestor)] = (ancestor, current + points * share)
+
+    best, best_score = None, 0.0
+    for element, score in scores.values():
+        text_length = len(element.get_text(" ", strip=True))
+        score *= _class_weight(element) * (1 - _link_density(element, text_length))
+        if score > best_score:
+            best, best_score = element, score
+    text = best.get_text(" ", strip=True) if best is not None else ""
+    if len(text) < MIN_MAIN_TEXT:
+        return body.get_text(" ", strip=True)
+    return text
+
+
+def extract_page(html: str) -> tuple[str, Optional[dict]]:
+    # Returns (relevant text, JSON-LD JobPosting or None)
+    soup = BeautifulSoup(html, "html.parser")
+    posting = extract_job_posting_ld(soup)
+    if posting is not None:
+        text = job_posting_ld_text(posting)
+        if len(text) >= MIN_MAIN_TEXT:
+            return text, posting
+    return extract_main_text(soup), posting
@@ -0,0 +1,131 @@
+import re
+from typing import Optional
+from pydantic import BaseModel, create_model
+from app.models.jobUrl import JobData
+from app.utils.html_extract import html_fragment_text, ld_name
+
+YEARS_PATTERN = re.compile(r"(\d{1,2})\s*\+?\s*(?:-\s*\d{1,2}\s*)?years?", re.I)
+SENIORITY_PATTERN = re.compile(r"\b(intern|junior|jr|entry[- ]level|graduate|mid[- ]level|senior|sr|staff|principal|lead)\b", re.I)
+LIST_SPLIT_PATTERN = re.compile(r"\s*(?:\n|•|·)\s*")
+NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+# Optional in JobData, but the eligibility check reads them: markup that leaves one out
+# says nothing about the posting, so the LLM is still asked for it
+ELIGIBILITY_FIELDS = {"education"}
+
+
+def _text(value) -> Optional[str]:
+    # Any schema.org property may repeat, and text properties sometimes hold a Thing
+    if isinstance(value, list):
+        value = ", ".join(filter(None, (_text(item) for item in value)))
+    elif isinstance(value, dict):
+        value = ld_name(value)
+    if not value:
+        return None
+    text = " ".join(html_fragment_text(str(value)).split())
+    return text or None
+
+
+def _text_list(value) -> Optional[list[str]]:
+    if not value:
+        return None
+    if isinstance(value, str):
+        # Bullet lists come through as one HTML string
+        value = LIST_SPLIT_PATTERN.split(html_fragment_text(value.replace("</li>", "\n")))
+    items = [_text(ld_name(item) if isinstance(item, dict) else item) for item in value]
+    return [item for item in items if item] or None
+
+
+def _skills(value) -> Optional[list[dict]]:
+    if isinstance(value, str):
+        value = value.split(",")
+    names = _text_list(value)
+    return [{"name": name} for name in names] if names else None
+
+
+def _location(value) -> Optional[str]:
+    locations = value if isinstance(value, list) else [value]
+    parts = []
+    for location in locations:
+        address = location.get("address") if isinstance(location, dict) else location
+        if isinstance(address, dict):
+            address = ", ".join(
+                str(address[key]) for key in ("addressLocality", "addressRegion", "addressCountry")
+                if isinstance(address.get(key), str)
+            )
+        elif isinstance(location, dict) and not isinstance(address, str):
+            address = location.get("name")
+        if address and address not in parts:
+            parts.append(address)
+    return "; ".join(parts) or None
+
+
+def _months(value) -> Optional[float]:
+    # A number per schema.org, but "36", "36 months" and "3 years" turn up as well
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    match = NUMBER_PATTERN.search(value) if isinstance(value, str) else None
+    if match is None:
+        return None
+    return float(match.group()) * (12 if "year" in value.lower() else 1)
+
+
+def _experience(posting: dict) -> Optional[str]:
+    requirement = posting.get("experienceRequirements")
+    months = _months(requirement.get("monthsOfExperience")) if isinstance(requirement, dict) else None
+    if months:
+        return f"{months / 12:g}+ years" if months >= 12 else f"{months:g}+ months"
+    text = _text(ld_name(requirement) if isinstance(requirement, (dict, list)) else requirement)
+    if text:
+        return text
+    # No explicit requirement: "5+ years" in the description, then the seniority in the title
+    match = YEARS_PATTERN.search(_text(posting.get("description")) or "")
+    if match:
+        return f"{match.group(1)}+ years"
+    match = SENIORITY_PATTERN.search(_text(posting.get("title")) or "")
+    return match.group(1).title() if match else None
+
+
+def _education(value) -> Optional[str]:
+    if isinstance(value, dict):
+        value = value.get("credentialCategory") or value.get("name")
+    elif isinstance(value, list):
+        value = ", ".join(filter(None, (_education(item) for item in value)))
+    return _text(value)
+
+
+def job_fields_from_ld(posting: dict) -> dict:
+    # Maps a schema.org JobPosting onto JobData fields, leaving out anything it does not carry
+    location = _location(posting.get("jobLocation")) if posting.get("jobLocation") else None
+    if not location and posting.get("jobLocationType") == "TELECOMMUTE":
+        location = "Remote"
+    fields = {
+        "job_title": _text(posting.get("title")),
+        "company_name": _text(ld_name(posting.get("hiringOrganization"))),
+        "description": _text(posting.get("description")),
+        "responsibilities": _text_list(posting.get("responsibilities")),
+        "skills": _skills(posting.get("skills")),
+        "experience_level": _experience(posting),
+        "location": location,
+        "education": _education(posting.get("educationRequirements")),
+    }
+    return {name: value for name, value in fields.items() if value}
+
+
+def missing_job_fields(fields: dict) -> list[str]:
+    return [
+        name for name, field in JobData.model_fields.items()
+        if (field.is_required() or name in ELIGIBILITY_FIELDS) and name not in fields
+    ]
+
+
+def partial_job_model(fields: dict) -> type[BaseModel]:
+    # JobData minus the fields markup already provided, so the LLM only extracts the rest
+    return create_model(
+        "JobData",
+        **{
+            name: (field.annotation, field)
+            for name, field in JobData.model_fields.items()
+            if name not in fields
+        },
+    )
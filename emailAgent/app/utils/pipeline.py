@@ -0,0 +1,50 @@
+import asyncio
+
+
+class PipelineAborted(Exception):
+    def __init__(self, result):
+        super().__init__(result)
+        self.result = result
+
+
+class Pipeline:
+    def __init__(self):
+        self._stages = {}
+
+    def stage(self, name: str, *deps: str):
+        def register(fn):
+            missing = [dep for dep in deps if dep not in self._stages]
+            if missing:
+                raise ValueError(f"Stage {name!r} depends on unknown stages {missing}")
+            self._stages[name] = (fn, deps)
+            return fn
+        return register
+
+    async def run(self, on_stage_done=None) -> dict:
+        tasks = {}
+        results = {}
+
+        async def run_stage(name):
+            fn, deps = self._stages[name]
+            inputs = [await tasks[dep] for dep in deps]
+            value = await fn(*inputs)
+            results[name] = value
+            if on_stage_done is not None:
+                await on_stage_done(name, value)
+            return value
+
+        # Every stage starts right away and waits only on its own inputs
+        for name in self._stages:
+            tasks[name] = asyncio.ensure_future(run_stage(name))
+
+        try:
+            done, pending = await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            # Abort or failure in one stage stops all work that has not finished yet
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+        return results
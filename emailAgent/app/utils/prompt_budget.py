@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from app.core.config import settings
+from app.core.lazy import Lazy
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+
+def _load_encoding():
+    # tiktoken's BPE is close enough to the Groq models' tokenizer for budgeting;
+    # without it (or offline, where the vocabulary cannot be fetched) fall back to len / 4
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(settings.PROMPT_TOKEN_ENCODING)
+    except Exception as exc:
+        logger.warning("tiktoken unavailable (%s), estimating tokens from length", exc)
+        return None
+
+
+encoding = Lazy(_load_encoding, "tokenizer")
+_template_tokens = {}
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if encoding.get() is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0:
+        return ""
+    if encoding.get() is None:
+        if len(text) <= max_tokens * CHARS_PER_TOKEN:
+            return text
+        truncated = text[:max_tokens * CHARS_PER_TOKEN]
+    else:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        truncated = encoding.decode(tokens[:max_tokens])
+    # Do not end on half a word
+    space = truncated.rfind(" ")
+    return truncated[:space] if space > len(truncated) * 0.8 else truncated
+
+
+def dedupe(items: list[str]) -> list[str]:
+    seen = set()
+    unique = []
+    for item in items:
+        key = " ".join(str(item).casefold().split())
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(item)
+    return unique
+
+
+def render(value) -> str:
+    # Lists go into the prompt one item per line
+    if isinstance(value, list):
+        return "\n".join(str(item) for item in value)
+    return "" if value is None else str(value)
+
+
+def _fit_list(items: list[str], max_tokens: int) -> list[str]:
+    # Items are in priority order: keep the longest prefix that fits
+    kept = []
+    used = 0
+    for item in dedupe(items):
+        tokens = count_tokens(str(item)) + 1
+        if used + tokens > max_tokens:
+            break
+        kept.append(item)
+        used += tokens
+    return kept
+
+
+def template_tokens(chain: str, prompt) -> int:
+    if chain not in _template_tokens:
+        _template_tokens[chain] = count_tokens(prompt.format(**{name: "" for name in prompt.input_variables}))
+    return _template_tokens[chain]
+
+
+def fit_prompt(chain: str, prompt, inputs: dict, budget: int, trim: dict[str, float]) -> dict:
+    """Trim prompt inputs so the rendered prompt stays within `budget` tokens.
+
+    `trim` maps the variables that may be cut, in priority order, to the largest
+    share of the free budget each may take; the last one gets whatever is left.
+    Text is truncated, lists are deduplicated and cut to a prefix. Every other
+    variable is passed through untouched.
+    """
+    fixed = {name: value for name, value in inputs.items() if name not in trim}
+    used = template_tokens(chain, prompt) + sum(count_tokens(render(value)) for value in fixed.values())
+    free = max(0, budget - used)
+    before = used + sum(count_tokens(render(inputs.get(name))) for name in trim)
+
+    fitted = dict(fixed)
+    sizes = {}
+    for position, (name, share) in enumerate(trim.items()):
+        limit = free if position == len(trim) - 1 else int(free * share)
+        value = inputs.get(name)
+        if isinstance(value, list):
+            value = _fit_list(value, limit)
+        else:
+            value = truncate_tokens(render(value), limit)
+        fitted[name] = render(value)
+        sizes[name] = count_tokens(fitted[name])
+        free -= sizes[name]
+
+    after = used + sum(sizes.values())
+    logger.info("%s prompt: %d -> %d tokens (budget %d)", chain, before, after, budget)
+    logger.debug("%s prompt variables: %s", chain, sizes)
+    return fitted
+
+
+async def afit_prompt(chain: str, prompt, inputs: dict, budget: int, trim: dict[str, float]) -> dict:
+    # Tokenizing a long page is CPU-bound, and the first call may download the BPE file
+    return await asyncio.to_thread(fit_prompt, chain, prompt, inputs, budget, trim)
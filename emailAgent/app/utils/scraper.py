@@ -1,8 +1,93 @@
-from langchain_community.document_loaders import WebBaseLoader
+import asyncio
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+import httpx
+from app.core.config import settings
+from app.core.metrics import span
+from app.models.jobUrl import ScrapedPage
 from app.utils.clear_text import clean_text
+from app.utils.html_extract import extract_page
+from app.utils.lru import TTLCache
 
+# Shared keep-alive client for all scrapes in this worker
+http_client = httpx.AsyncClient(
+    timeout=settings.SCRAPER_TIMEOUT_SECONDS,
+    follow_redirects=True,
+    limits=httpx.Limits(max_connections=settings.SCRAPER_MAX_CONNECTIONS),
+    headers={"User-Agent": "Mozilla/5.0 (compatible; JobScribe/0.1)"},
+)
 
-def fetch_page_content(url: str) -> str:
-    loader = WebBaseLoader(url)
-    data =  loader.load().pop().page_content
-    return clean_text(data)
+# url -> validators and body of the last 200 response, for conditional GETs
+_conditional_cache = TTLCache(settings.SCRAPER_CACHE_MAX_ENTRIES, settings.SCRAPER_CACHE_TTL_SECONDS)
+
+
+class HostLimiter:
+    # Caps total in-flight fetches and fetches per host, spacing requests to the same host
+    def __init__(self, max_concurrency: int, per_host: int, host_delay: float = 0.0):
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._hosts = defaultdict(lambda: asyncio.Semaphore(per_host))
+        self.host_delay = host_delay
+
+    @asynccontextmanager
+    async def limit(self, url: str):
+        async with self._hosts[urlsplit(url).hostname]:
+            async with self._global:
+                yield
+            if self.host_delay:
+                await asyncio.sleep(self.host_delay)
+
+
+def parse_page(url: str, html: str) -> ScrapedPage:
+    # Only the posting (JSON-LD or the main content block) goes to the LLM, not the whole page
+    with span("scrape.parse"):
+        text, job_posting = extract_page(html)
+        return ScrapedPage(url=url, text=clean_text(text), job_posting=job_posting)
+
+
+async def download(url: str) -> str:
+    cached = _conditional_cache.get(url)
+    headers = {}
+    if cached is not None:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    async with http_client.stream("GET", url, headers=headers) as response:
+        if response.status_code == 304 and cached is not None:
+            return cached["html"]
+        response.raise_for_status()
+        if int(response.headers.get("Content-Length") or 0) > settings.SCRAPER_MAX_BYTES:
+            raise ValueError(f"Page is larger than {settings.SCRAPER_MAX_BYTES} bytes")
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > settings.SCRAPER_MAX_BYTES:
+                raise ValueError(f"Page is larger than {settings.SCRAPER_MAX_BYTES} bytes")
+            chunks.append(chunk)
+        html = b"".join(chunks).decode(response.charset_encoding or "utf-8", errors="replace")
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        _conditional_cache.set(url, {"etag": etag, "last_modified": last_modified, "html": html})
+    return html
+
+
+async def fetch_page(url: str, limiter: HostLimiter | None = None) -> ScrapedPage:
+    if limiter is None:
+        with span("scrape.fetch"):
+            html = await download(url)
+    else:
+        async with limiter.limit(url):
+            # Time waiting on the limiter is not the site's
+            with span("scrape.fetch"):
+                html = await download(url)
+    # Parsing is CPU-bound, keep it off the event loop
+    return await asyncio.to_thread(parse_page, url, html)
+
+
+async def fetch_page_content(url: str, limiter: HostLimiter | None = None) -> str:
+    return (await fetch_page(url, limiter)).text
@@ -0,0 +1,125 @@
+import logging
+import threading
+from app.core.chroma_db import embeddings, find_chroma_collection
+from app.core.config import settings
+from app.core.metrics import register_collector, span
+from app.utils.lru import TTLCache
+from app.vector_db.tenancy import tenancy
+
+logger = logging.getLogger(__name__)
+
+
+class UserMatrix:
+    # One user's chunks, a row each. A few dozen rows are cheaper to scan than to search an index for.
+    # NumPy is imported on first use: with RETRIEVAL_BACKEND=chroma only invalidate() is ever called
+    def __init__(self, ids: list, documents: list, metadatas: list, vectors, space: str, dtype):
+        import numpy as np
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = [metadata or {} for metadata in metadatas]
+        self.types = np.array([metadata.get("type") for metadata in self.metadatas], dtype=object)
+        self.space = space
+        self.matrix = (np.asarray(vectors, dtype=np.float32) if ids else np.empty((0, 0), np.float32)).astype(dtype, copy=False)
+        rows = self.matrix.astype(np.float32, copy=False)
+        self.norms = np.einsum("ij,ij->i", rows, rows)
+        self.nbytes = self.matrix.nbytes + self.norms.nbytes + sum(len(document or "") for document in documents)
+
+    def distances(self, queries):
+        # Every query against every chunk in one matmul; same distances Chroma reports for the space
+        import numpy as np
+        dots = queries @ self.matrix.astype(np.float32, copy=False).T
+        if self.space == "ip":
+            return 1.0 - dots
+        if self.space == "cosine":
+            scale = np.linalg.norm(queries, axis=1)[:, None] * np.sqrt(self.norms)[None, :]
+            return 1.0 - dots / np.maximum(scale, 1e-12)
+        return np.einsum("ij,ij->i", queries, queries)[:, None] - 2.0 * dots + self.norms[None, :]
+
+    def search(self, queries, k: int, types: list | None = None) -> list[list[dict]]:
+        import numpy as np
+        distances = self.distances(queries)
+        if types is not None:
+            distances[:, ~np.isin(self.types, types)] = np.inf
+        rankings = []
+        for row in distances:
+            order = np.argsort(row, kind="stable")[:k]
+            rankings.append([
+                {"id": self.ids[i], "content": self.documents[i], "metadata": self.metadatas[i], "distance": float(row[i])}
+                for i in order if np.isfinite(row[i])
+            ])
+        return rankings
+
+
+class ExactIndex:
+    def __init__(self, max_bytes: int, ttl: float, dtype: str):
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unknown RETRIEVAL_DTYPE {dtype!r}, expected float32 or float16")
+        self.dtype = dtype
+        # user_id -> UserMatrix, evicted by bytes held. Re-indexing invalidates the user; entries
+        # also expire so writes made outside this process (e.g. a migration) show up within the TTL
+        self._matrices = TTLCache(max_bytes, ttl, sizeof=lambda matrix: matrix.nbytes)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._counters = {"hits": 0, "loads": 0, "invalidations": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _load(self, user_id: str) -> UserMatrix:
+        collection = find_chroma_collection(tenancy.collection_name(user_id))
+        if collection is None:
+            return UserMatrix([], [], [], None, "l2", self.dtype)
+        with span("chroma.load"):
+            rows = collection.get(where=tenancy.where(user_id), include=["embeddings", "documents", "metadatas"])
+        space = (collection.metadata or {}).get("hnsw:space", "l2")
+        return UserMatrix(rows["ids"], rows["documents"], rows["metadatas"], rows["embeddings"], space, self.dtype)
+
+    def matrix(self, user_id: str) -> UserMatrix:
+        found = self._matrices.get(user_id)
+        if found is not None:
+            self._count("hits")
+            return found
+        generation = self._generation
+        found = self._load(user_id)
+        self._count("loads")
+        with self._lock:
+            # A re-index that finished while we were reading makes this copy stale
+            if generation == self._generation:
+                self._matrices.set(user_id, found)
+        return found
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._generation += 1
+            self._counters["invalidations"] += 1
+        self._matrices.pop(user_id)
+
+    def search(self, user_id: str, queries: list[str], k: int, types: list | None = None) -> list[list[dict]]:
+        import numpy as np
+        user_matrix = self.matrix(user_id)
+        if not user_matrix.ids:
+            return [[] for _ in queries]
+        with span("embedding.query"):
+            query_embeddings = np.asarray(embeddings.embed_documents(queries), dtype=np.float32)
+        with span("exact.query"):
+            return user_matrix.search(query_embeddings, k, types)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["loads"]
+        return {
+            **counters,
+            "hit_ratio": counters["hits"] / lookups if lookups else 0.0,
+            "users": len(self._matrices),
+            "bytes": self._matrices.size,
+        }
+
+
+exact_index = ExactIndex(
+    max_bytes=settings.RETRIEVAL_CACHE_MAX_BYTES,
+    ttl=settings.RETRIEVAL_CACHE_TTL_SECONDS,
+    dtype=settings.RETRIEVAL_DTYPE,
+)
+register_collector("exact_index", exact_index.stats)
@@ -0,0 +1,97 @@
+# Moves stored resume chunks between Chroma tenancy layouts.
+#
+#   python -m app.vector_db.migrate --to per_user [--from shared] [--shards 16]
+#                                   [--batch-size 1000] [--drop-source]
+#
+# Stored embeddings are copied as they are (nothing is re-embedded), grouped by
+# each chunk's user_id into the target layout's collections. Upserts make a rerun
+# safe. Stop the app (or the resume workers) first, then set CHROMA_TENANCY to
+# the target layout. --drop-source deletes the old collections once every chunk
+# is accounted for in the target.
+import argparse
+import logging
+from collections import defaultdict
+from app.core.chroma_db import client
+from app.vector_db.tenancy import make_tenancy
+
+logger = logging.getLogger(__name__)
+
+
+def _source_collections(source) -> list:
+    chroma = client.get()
+    return [chroma.get_collection(collection.name) for collection in chroma.list_collections() if source.owns(collection.name)]
+
+
+def migrate(source, target, batch_size: int = 1000, drop_source: bool = False) -> dict:
+    chroma = client.get()
+    targets = {}
+    # target collection name -> ids copied into it, checked before anything is dropped
+    copied = defaultdict(list)
+    skipped = 0
+    sources = _source_collections(source)
+    for collection in sources:
+        offset = 0
+        while True:
+            page = collection.get(include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset)
+            if not page["ids"]:
+                break
+            offset += len(page["ids"])
+            by_target = defaultdict(lambda: {"ids": [], "embeddings": [], "documents": [], "metadatas": []})
+            for doc_id, embedding, document, metadata in zip(page["ids"], page["embeddings"], page["documents"], page["metadatas"]):
+                user_id = (metadata or {}).get("user_id")
+                if not user_id:
+                    # Without an owner the chunk cannot be placed in any layout
+                    skipped += 1
+                    continue
+                rows = by_target[target.collection_name(user_id)]
+                rows["ids"].append(doc_id)
+                rows["embeddings"].append(embedding)
+                rows["documents"].append(document)
+                rows["metadatas"].append(metadata)
+            for name, rows in by_target.items():
+                if name not in targets:
+                    targets[name] = chroma.get_or_create_collection(name, metadata=collection.metadata)
+                targets[name].upsert(**rows)
+                copied[name].extend(rows["ids"])
+        logger.info("Copied %s (%d chunks so far)", collection.name, sum(len(ids) for ids in copied.values()))
+
+    dropped = []
+    if drop_source:
+        for name, ids in copied.items():
+            found = 0
+            for start in range(0, len(ids), batch_size):
+                found += len(targets[name].get(ids=ids[start:start + batch_size], include=[])["ids"])
+            if found != len(ids):
+                raise RuntimeError(f"{name} has {found} of {len(ids)} copied chunks; source collections kept")
+        for collection in sources:
+            chroma.delete_collection(collection.name)
+            dropped.append(collection.name)
+    return {
+        "source_collections": len(sources),
+        "target_collections": len(targets),
+        "copied": sum(len(ids) for ids in copied.values()),
+        "skipped_without_user_id": skipped,
+        "dropped": len(dropped),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move resume chunks between Chroma tenancy layouts")
+    parser.add_argument("--from", dest="source", default="shared", choices=["shared", "per_user", "sharded"])
+    parser.add_argument("--to", dest="target", required=True, choices=["shared", "per_user", "sharded"])
+    parser.add_argument("--shards", type=int, default=None, help="shard count for the sharded layout (default CHROMA_SHARDS)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--drop-source", action="store_true")
+    args = parser.parse_args()
+    if args.source == args.target:
+        parser.error("--from and --to are the same layout")
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    shards = {"shards": args.shards} if args.shards else {}
+    summary = migrate(make_tenancy(args.source, **shards), make_tenancy(args.target, **shards), args.batch_size, args.drop_source)
+    print(summary)
+    print(f"Set CHROMA_TENANCY={args.target}" + (f" and CHROMA_SHARDS={args.shards}" if args.shards else "") + " before restarting the app.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,23 @@
-from app.core.chroma_db import collection
-from uuid import uuid4
+from app.core.chroma_db import find_chroma_collection, find_collection, get_collection, run_in_chroma
+from app.core.config import settings
+from app.core.metrics import span
+from app.vector_db.exact import exact_index
+from app.vector_db.search import multi_query_search, reciprocal_rank_fusion
+from app.vector_db.tenancy import tenancy
+import hashlib
+import logging
 from langchain_core.documents import Document
 
+logger = logging.getLogger(__name__)
+
+if settings.RETRIEVAL_BACKEND not in ("chroma", "exact"):
+    raise ValueError(f"Unknown RETRIEVAL_BACKEND {settings.RETRIEVAL_BACKEND!r}, expected chroma or exact")
+
+def chunk_id(user_id, section, text):
+    # Same user, section and text always map to the same id, so re-uploads can be diffed
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+    return f"{user_id}:{section}:{digest}"
+
 def add_resume_to_vector_db(resume_data,user):
     documents = []
 
@@ -27,57 +43,60 @@ def add_resume_to_vector_db(resume_data,user):
     for cert in resume_data.get("certifications", []):
         documents.append(Document(page_content=cert,metadata={"user_id": user_id, "type": "certification"}))
 
-    ids = [str(uuid4()) for _ in documents]
     if not documents:
-        print("No documents to add to vector DB. Skipping embedding.")
-        return
-    
-    result =collection.delete(where={"user_id": user_id})
-    
-    
-    result=collection.add_documents(
-        documents=documents,
-        ids=ids
-    )
-    return result
+        # Still diff against what is stored: the previous resume's chunks must not stay searchable
+        logger.info("No resume sections to index for user %s", user_id)
+    # Identical chunks collapse onto one id
+    by_id = {chunk_id(user_id, doc.metadata["type"], doc.page_content): doc for doc in documents}
+
+    name = tenancy.collection_name(user_id)
+    # With nothing to add, don't create a collection only to find it empty
+    collection = get_collection(name) if by_id else find_collection(name)
+    if collection is None:
+        exact_index.invalidate(user_id)
+        return []
+    with span("chroma.index"):
+        existing = set(collection.get(where=tenancy.where(user_id), include=[])["ids"])
+        stale_ids = list(existing - by_id.keys())
+        new_ids = [doc_id for doc_id in by_id if doc_id not in existing]
+
+        # Only changed chunks are embedded; unchanged ones keep their vectors
+        if stale_ids:
+            collection.delete(ids=stale_ids)
+        if new_ids:
+            collection.add_documents(
+                documents=[by_id[doc_id] for doc_id in new_ids],
+                ids=new_ids
+            )
+    exact_index.invalidate(user_id)
+    logger.info("Vector DB: %d added, %d removed, %d unchanged", len(new_ids), len(stale_ids), len(by_id) - len(new_ids))
+    return list(by_id)
 
 def get_user_resumes_from_vector_db(user,structured_jd):
     user_id = user.id
-    job_context = f"{structured_jd.job_title} at {structured_jd.company_name}. {structured_jd.description}."
     n_results = 5
     allowed_types = ["project", "work_experience", "achievement", "certification"]
     # Responsibilities & skills
     responsibilities_text = f"Responsibilities: {', '.join(structured_jd.responsibilities or [])}."
     skills_text = f"Required skills: {', '.join(skill.name for skill in structured_jd.skills)}."
-    resp_results = collection.similarity_search_with_score(
-        responsibilities_text,
-        k=n_results,
-        filter={"user_id": user_id},
-        
-
-    )
-
-    # Semantic search for skills
-    skills_results = collection.similarity_search_with_score(
-        skills_text,
-        k=n_results,
-        filter={"user_id": user_id}
-    )
-    combined = resp_results + skills_results
-    combined = [item for item in combined if item[0].metadata.get("type") in allowed_types]
-
-    # Remove duplicates by Document.id, keep highest score for duplicates
-    seen = {}
-    for doc, score in combined:
-        doc_id = doc.id
-        if doc_id not in seen :  
-            seen[doc_id] = (doc, score)
-
-    # Get all unique results and sort by score ascending (best match first)
-    unique_sorted = sorted(seen.values(), key=lambda x: x[1])
+    queries = [responsibilities_text, skills_text]
+    if settings.RETRIEVAL_BACKEND == "exact":
+        # A user's few dozen chunks are scored exhaustively from memory, no ANN index involved
+        rankings = exact_index.search(user_id, queries, k=n_results, types=allowed_types)
+    else:
+        rankings = multi_query_search(
+            find_chroma_collection(tenancy.collection_name(user_id)),
+            queries,
+            where=tenancy.where(user_id, {"type": {"$in": allowed_types}}),
+            k=n_results,
+        )
+
+    # Fuse both rankings, documents found by both queries rise to the top
+    fused = reciprocal_rank_fusion(rankings)
 
     # Return top n_results
     # return type and page_content
-    return [{"type": doc.metadata.get("type"), "content": doc.page_content} for doc, score in unique_sorted[:n_results]]
-
+    return [{"type": hit["metadata"].get("type"), "content": hit["content"]} for hit in fused[:n_results]]
 
+async def aget_user_resumes_from_vector_db(user,structured_jd):
+    return await run_in_chroma(get_user_resumes_from_vector_db, user, structured_jd)
@@ -0,0 +1,40 @@
+from app.core.chroma_db import embeddings
+from app.core.metrics import span
+
+RRF_K = 60
+
+
+def multi_query_search(collection, queries: list[str], where: dict | None, k: int) -> list[list[dict]]:
+    # One embedding batch and one Chroma round-trip for all queries; `collection` is a
+    # chromadb collection (chroma_db.find_chroma_collection), which takes the vectors as is
+    if collection is None:
+        return [[] for _ in queries]
+    with span("embedding.query"):
+        query_embeddings = embeddings.embed_documents(queries)
+    with span("chroma.query"):
+        result = collection.query(
+            query_embeddings=query_embeddings,
+            n_results=k,
+            where=where,
+            include=["documents", "metadatas", "distances"],
+        )
+    return [
+        [
+            {"id": doc_id, "content": document, "metadata": metadata, "distance": distance}
+            for doc_id, document, metadata, distance in zip(ids, documents, metadatas, distances)
+        ]
+        for ids, documents, metadatas, distances in zip(
+            result["ids"], result["documents"], result["metadatas"], result["distances"]
+        )
+    ]
+
+
+def reciprocal_rank_fusion(rankings: list[list[dict]], k: int = RRF_K) -> list[dict]:
+    # Distances from different queries are not comparable; ranks are
+    scores = {}
+    hits = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, start=1):
+            scores[hit["id"]] = scores.get(hit["id"], 0.0) + 1.0 / (k + rank)
+            hits.setdefault(hit["id"], hit)
+    return [hits[doc_id] for doc_id in sorted(scores, key=scores.get, reverse=True)]
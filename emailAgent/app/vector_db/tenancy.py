@@ -0,0 +1,66 @@
+import hashlib
+from typing import Optional
+from app.core.config import settings
+
+# Every layout keeps user_id in each chunk's metadata, so chunks can move between layouts
+BASE_NAME = "resumes"
+
+
+class SharedTenancy:
+    # One collection for everyone; every search filters on user_id
+    name = "shared"
+
+    def collection_name(self, user_id: str) -> str:
+        return BASE_NAME
+
+    def where(self, user_id: str, where: Optional[dict] = None) -> Optional[dict]:
+        return {"$and": [{"user_id": user_id}, where]} if where else {"user_id": user_id}
+
+    def owns(self, collection_name: str) -> bool:
+        return collection_name == BASE_NAME
+
+
+class PerUserTenancy(SharedTenancy):
+    # One small collection per user: searches only see that user's chunks, with no
+    # filter to starve the ANN results, at the cost of one collection per user
+    name = "per_user"
+    prefix = f"{BASE_NAME}-user-"
+
+    def collection_name(self, user_id: str) -> str:
+        return f"{self.prefix}{user_id}"
+
+    def where(self, user_id: str, where: Optional[dict] = None) -> Optional[dict]:
+        return where
+
+    def owns(self, collection_name: str) -> bool:
+        return collection_name.startswith(self.prefix)
+
+
+class ShardedTenancy(SharedTenancy):
+    # Users hashed over a fixed number of collections: each index is 1/shards of the
+    # shared one and the collection count stays bounded; still filtered on user_id
+    name = "sharded"
+    prefix = f"{BASE_NAME}-shard-"
+
+    def __init__(self, shards: int):
+        self.shards = shards
+
+    def collection_name(self, user_id: str) -> str:
+        shard = int.from_bytes(hashlib.sha1(user_id.encode("utf-8")).digest()[:8], "big") % self.shards
+        return f"{self.prefix}{shard:03d}"
+
+    def owns(self, collection_name: str) -> bool:
+        return collection_name.startswith(self.prefix)
+
+
+def make_tenancy(name: str, shards: int = settings.CHROMA_SHARDS) -> SharedTenancy:
+    if name == SharedTenancy.name:
+        return SharedTenancy()
+    if name == PerUserTenancy.name:
+        return PerUserTenancy()
+    if name == ShardedTenancy.name:
+        return ShardedTenancy(shards)
+    raise ValueError(f"Unknown CHROMA_TENANCY {name!r}, expected shared, per_user or sharded")
+
+
+tenancy = make_tenancy(settings.CHROMA_TENANCY)
@@ -0,0 +1,130 @@
+# Chroma tenancy layouts: filtered search recall and latency against store size.
+#
+#   python benchmarks/chroma_tenancy.py [--users 100 1000 5000] [--chunks 12]
+#                                       [--queries 200] [--k 5] [--shards 16]
+#
+# Builds a throwaway persistent store per layout (app.vector_db.tenancy: shared,
+# sharded, per_user) with random unit vectors, --chunks per user, then runs the
+# same two-query, k-nearest search the email pipeline does for random users.
+# Recall@k is measured against an exact NumPy search over that user's chunks;
+# "short" counts searches that returned fewer than min(k, chunks) hits.
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+for key, value in {
+    "GROQ_API_KEY": "benchmark",
+    "MONGODB_URL": "mongodb://localhost:27017",
+    "SECRET_KEY": "benchmark",
+    "CHROMA_HUGGINGFACE_API_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(key, value)
+
+import chromadb  # noqa: E402
+import numpy as np  # noqa: E402
+from app.vector_db.tenancy import make_tenancy  # noqa: E402
+
+TYPES = ["project", "work_experience", "achievement", "certification"]
+
+
+def percentile(samples: list[float], p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p * len(samples)))] if samples else 0.0
+
+
+def make_vectors(users: int, chunks: int, dim: int, rng) -> np.ndarray:
+    vectors = rng.standard_normal((users * chunks, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def build(layout, path: str, vectors: np.ndarray, users: int, chunks: int) -> tuple[chromadb.api.ClientAPI, float]:
+    client = chromadb.PersistentClient(path=path)
+    batch = client.get_max_batch_size()
+    rows = {}
+    for user in range(users):
+        name = layout.collection_name(f"user{user}")
+        entry = rows.setdefault(name, {"ids": [], "embeddings": [], "metadatas": [], "documents": []})
+        for chunk in range(chunks):
+            entry["ids"].append(f"user{user}:{chunk}")
+            entry["embeddings"].append(vectors[user * chunks + chunk])
+            entry["metadatas"].append({"user_id": f"user{user}", "type": TYPES[chunk % len(TYPES)]})
+            entry["documents"].append(f"chunk {chunk} of user {user}")
+    started = time.perf_counter()
+    for name, entry in rows.items():
+        collection = client.get_or_create_collection(name)
+        for start in range(0, len(entry["ids"]), batch):
+            collection.add(**{key: values[start:start + batch] for key, values in entry.items()})
+    return client, time.perf_counter() - started
+
+
+def search(layout, client, vectors: np.ndarray, users: int, chunks: int, queries: int, k: int, dim: int, rng):
+    latencies = []
+    recalls = []
+    short = 0
+    collections = {}
+    for _ in range(queries):
+        user = int(rng.integers(users))
+        name = layout.collection_name(f"user{user}")
+        if name not in collections:
+            collections[name] = client.get_collection(name)
+        query = rng.standard_normal((2, dim)).astype(np.float32)
+        query /= np.linalg.norm(query, axis=1, keepdims=True)
+        started = time.perf_counter()
+        result = collections[name].query(
+            query_embeddings=query,
+            n_results=k,
+            where=layout.where(f"user{user}", {"type": {"$in": TYPES}}),
+            include=["distances"],
+        )
+        latencies.append(time.perf_counter() - started)
+
+        own = vectors[user * chunks:(user + 1) * chunks]
+        expected = min(k, chunks)
+        for row, ids in enumerate(result["ids"]):
+            exact = np.argsort(((own - query[row]) ** 2).sum(axis=1))[:expected]
+            truth = {f"user{user}:{index}" for index in exact}
+            recalls.append(len(truth & set(ids)) / expected)
+            short += len(ids) < expected
+    return latencies, recalls, short
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--chunks", type=int, default=12)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--layouts", nargs="+", default=["shared", "sharded", "per_user"])
+    args = parser.parse_args()
+
+    print(f"{args.chunks} chunks per user, dim {args.dim}, {args.queries} searches of 2 queries, k={args.k}")
+    print(f"{'users':>6} {'chunks':>8} {'layout':<9} {'build s':>8} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'recall':>7} {'short':>6}")
+    for users in args.users:
+        rng = np.random.default_rng(users)
+        vectors = make_vectors(users, args.chunks, args.dim, rng)
+        for name in args.layouts:
+            layout = make_tenancy(name, shards=args.shards)
+            path = tempfile.mkdtemp(prefix=f"chroma-{name}-")
+            try:
+                client, build_seconds = build(layout, path, vectors, users, args.chunks)
+                latencies, recalls, short = search(layout, client, vectors, users, args.chunks, args.queries, args.k, args.dim, np.random.default_rng(7))
+                print(
+                    f"{users:>6} {users * args.chunks:>8} {name:<9} {build_seconds:>8.1f} "
+                    f"{percentile(latencies, 0.5) * 1000:>7.2f} {percentile(latencies, 0.95) * 1000:>7.2f} "
+                    f"{percentile(latencies, 0.99) * 1000:>7.2f} {statistics.mean(recalls):>7.3f} {short:>6}"
+                )
+            finally:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# clean_text microbenchmark over synthetic job pages.
+#
+#   python benchmarks/clean_text.py [--sizes 500 1000 4000] [--repeat 5]
+#
+# Compares the previous four-pass implementation with app.utils.clear_text,
+# both on the whole page and fed through TextNormalizer in 64 KB chunks.
+# Sizes are KB of raw page text, tags and URLs included.
+import argparse
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.utils.clear_text import clean_text, normalize_chunks  # noqa: E402
+
+SNIPPETS = [
+    "We are hiring a Senior Backend Engineer to build low-latency services.",
+    "Requirements: 5+ years of Python, C++ or C#, Kubernetes and PostgreSQL.",
+    "Nous recherchons un développeur expérimenté pour notre équipe à Paris.",
+    "Wir suchen eine Softwareentwicklerin (m/w/d) für unser Team in München.",
+    "東京オフィスでバックエンドエンジニアを募集しています。",
+    "Apply at https://careers.example.com/jobs/12345?ref=board&utm_source=feed today.",
+    "<li class=\"job-item\">Own services end-to-end</li>",
+    "<a href=\"/jobs/related\" data-track=\"click\">Related jobs</a>",
+    "<div class=\"description\">\n\t  <p>",
+    "</p>\n</div>",
+    "\n\n    ",
+]
+
+
+def make_page(size_kb: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    while size < size_kb * 1024:
+        snippet = rng.choice(SNIPPETS)
+        parts.append(snippet)
+        size += len(snippet.encode("utf-8"))
+    return " ".join(parts)
+
+
+def previous_clean_text(text):
+    text = re.sub(r'<[^>]*?>', '', text)
+    text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+    text = re.sub(r'[^a-zA-Z0-9 ]', '', text)
+    text = re.sub(r'\s{2,}', ' ', text)
+    text = text.strip()
+    text = ' '.join(text.split())
+    return text
+
+
+def streamed(text: str, chunk_size: int = 64 * 1024) -> str:
+    return "".join(normalize_chunks(text[i:i + chunk_size] for i in range(0, len(text), chunk_size)))
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 4000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'size KB':>8} {'previous ms':>12} {'clean_text ms':>14} {'speedup':>8} {'streamed ms':>12} {'MB/s':>7}")
+    for size_kb in args.sizes:
+        page = make_page(size_kb)
+        assert streamed(page) == clean_text(page)
+        previous = timed(lambda: previous_clean_text(page), args.repeat)
+        current = timed(lambda: clean_text(page), args.repeat)
+        stream = timed(lambda: streamed(page), args.repeat)
+        throughput = len(page.encode("utf-8")) / current / 1024 / 1024
+        print(f"{size_kb:>8} {previous * 1000:>12.1f} {current * 1000:>14.1f} {previous / current:>7.2f}x {stream * 1000:>12.1f} {throughput:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# Local eligibility matcher vs hand-labelled answers.
+#
+#   python benchmarks/eligibility_eval.py [--fixtures benchmarks/fixtures/eligibility.jsonl] [--record]
+#
+# Each eligibility fixture is one experience/education comparison with the answer
+# a reviewer expects ("expected"); they were written by hand, not taken from the
+# model. Reports how many fields the matcher decides without the LLM and how often
+# those decisions are right. --record asks experience_education_match_prompt
+# instead (needs GROQ_API_KEY) and overwrites "expected" with its answers.
+# Skill fixtures compare match_skills with the old lowercase set intersection.
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+for key, value in {
+    "GROQ_API_KEY": "benchmark",
+    "MONGODB_URL": "mongodb://localhost:27017",
+    "SECRET_KEY": "benchmark",
+    "CHROMA_HUGGINGFACE_API_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(key, value)
+
+from app.services.eligibility import match_education, match_experience, match_skills  # noqa: E402
+
+FIXTURES = ROOT / "benchmarks" / "fixtures"
+FIELDS = {
+    "experience_match": lambda case: match_experience(case["candidate_experience"], case["jd_experience"]),
+    "education_match": lambda case: match_education(case["candidate_education"], case["jd_education"]),
+}
+
+
+def load(path: Path) -> list[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def record(cases: list[dict]):
+    from app.core.llm_gateway import ainvoke_structured
+    from app.models.jobUrl import ExperienceEducationMatch
+    from app.utils.prompts import experience_education_match_prompt
+
+    for case in cases:
+        result = await ainvoke_structured("eligibility", experience_education_match_prompt(), ExperienceEducationMatch, {
+            "candidate_experience": case["candidate_experience"],
+            "candidate_education": case["candidate_education"],
+            "jd_experience": case["jd_experience"],
+            "jd_education": case["jd_education"],
+        })
+        case["expected"] = {field: getattr(result, field).value for field in FIELDS}
+
+
+def evaluate(cases: list[dict]):
+    print(f"{'field':<18} {'cases':>6} {'local':>6} {'coverage':>9} {'agree':>6} {'accuracy':>9}")
+    disagreements = []
+    for field, decide in FIELDS.items():
+        decided = agreed = 0
+        for case in cases:
+            local = decide(case)
+            if local is None:
+                continue
+            decided += 1
+            if local.value == case["expected"][field]:
+                agreed += 1
+            else:
+                disagreements.append((field, local.value, case))
+        coverage = decided / len(cases) if cases else 0.0
+        accuracy = agreed / decided if decided else 0.0
+        print(f"{field:<18} {len(cases):>6} {decided:>6} {coverage:>8.0%} {agreed:>6} {accuracy:>8.0%}")
+
+    skipped = sum(1 for case in cases if any(decide(case) is None for decide in FIELDS.values()))
+    print(f"LLM calls avoided: {len(cases) - skipped}/{len(cases)}")
+    for field, local, case in disagreements:
+        print(f"  {field}: local={local} expected={case['expected'][field]} <- {case}")
+
+
+def evaluate_skills(cases: list[dict]):
+    found = {"previous": 0, "match_skills": 0}
+    wrong = {"previous": 0, "match_skills": 0}
+    expected_total = sum(len(case["expected"]) for case in cases)
+    for case in cases:
+        expected = {skill.lower() for skill in case["expected"]}
+        previous = {skill.lower() for skill in case["candidate_skills"]} & {skill.lower() for skill in case["jd_skills"]}
+        current = {skill.lower() for skill in match_skills(case["candidate_skills"], case["jd_skills"])}
+        for name, matched in (("previous", previous), ("match_skills", current)):
+            found[name] += len(matched & expected)
+            wrong[name] += len(matched - expected)
+    for name in found:
+        print(f"skills {name:<13} recall {found[name]}/{expected_total}  false matches {wrong[name]}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES / "eligibility.jsonl")
+    parser.add_argument("--skills", type=Path, default=FIXTURES / "skills.jsonl")
+    parser.add_argument("--record", action="store_true")
+    args = parser.parse_args()
+
+    cases = load(args.fixtures)
+    if args.record:
+        asyncio.run(record(cases))
+        with open(args.fixtures, "w") as f:
+            f.writelines(json.dumps(case) + "\n" for case in cases)
+    evaluate(cases)
+    evaluate_skills(load(args.skills))
+
+
+if __name__ == "__main__":
+    main()
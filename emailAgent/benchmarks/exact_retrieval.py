@@ -0,0 +1,107 @@
+# Exact in-memory retrieval (app.vector_db.exact) against Chroma queries.
+#
+#   python benchmarks/exact_retrieval.py [--users 1000] [--chunks 5 15 30]
+#                                        [--dim 768] [--queries 500] [--k 5]
+#
+# Indexes --users users with random vectors in a throwaway store (shared layout),
+# then times the two-query, k-nearest search of the email pipeline for random
+# users: Chroma with the user_id filter, and the exact engine from an already
+# loaded float32 or float16 matrix. "load" is the one-off Chroma read that fills
+# the engine's cache for a user. Query embedding time is left out of every
+# column. Recall@k is against a float64 NumPy search.
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+for key, value in {
+    "GROQ_API_KEY": "benchmark",
+    "MONGODB_URL": "mongodb://localhost:27017",
+    "SECRET_KEY": "benchmark",
+    "CHROMA_HUGGINGFACE_API_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(key, value)
+
+import numpy as np  # noqa: E402
+from chroma_tenancy import TYPES, build, make_vectors, percentile  # noqa: E402
+from app.vector_db.exact import UserMatrix  # noqa: E402
+from app.vector_db.tenancy import SharedTenancy  # noqa: E402
+
+
+def recall(ids: list[list[str]], own: np.ndarray, query: np.ndarray, user: int, k: int) -> list[float]:
+    expected = min(k, len(own))
+    scores = []
+    for row, found in enumerate(ids):
+        exact = np.argsort(((own.astype(np.float64) - query[row]) ** 2).sum(axis=1))[:expected]
+        scores.append(len({f"user{user}:{index}" for index in exact} & set(found)) / expected)
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[5, 15, 30])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    layout = SharedTenancy()
+    print(f"{args.users} users, dim {args.dim}, {args.queries} searches of 2 queries, k={args.k}; latencies in ms")
+    print(f"{'chunks':>6} {'engine':<14} {'p50':>7} {'p95':>7} {'p99':>7} {'recall':>7}")
+    for chunks in args.chunks:
+        vectors = make_vectors(args.users, chunks, args.dim, np.random.default_rng(chunks))
+        path = tempfile.mkdtemp(prefix="chroma-exact-")
+        try:
+            client, _ = build(layout, path, vectors, args.users, chunks)
+            collection = client.get_collection(layout.collection_name("user0"))
+            rng = np.random.default_rng(7)
+            picks = [(int(rng.integers(args.users)), rng.standard_normal((2, args.dim)).astype(np.float32)) for _ in range(args.queries)]
+            results = {name: ([], []) for name in ("chroma", "load", "exact float32", "exact float16")}
+            matrices = {"float32": {}, "float16": {}}
+
+            for user, query in picks:
+                started = time.perf_counter()
+                result = collection.query(
+                    query_embeddings=query,
+                    n_results=args.k,
+                    where=layout.where(f"user{user}", {"type": {"$in": TYPES}}),
+                    include=["documents", "metadatas", "distances"],
+                )
+                results["chroma"][0].append(time.perf_counter() - started)
+                results["chroma"][1].extend(recall(result["ids"], vectors[user * chunks:(user + 1) * chunks], query, user, args.k))
+
+                if user not in matrices["float32"]:
+                    started = time.perf_counter()
+                    rows = collection.get(where=layout.where(f"user{user}"), include=["embeddings", "documents", "metadatas"])
+                    matrices["float32"][user] = UserMatrix(rows["ids"], rows["documents"], rows["metadatas"], rows["embeddings"], "l2", np.float32)
+                    results["load"][0].append(time.perf_counter() - started)
+                    matrices["float16"][user] = UserMatrix(rows["ids"], rows["documents"], rows["metadatas"], rows["embeddings"], "l2", np.float16)
+
+                for dtype in ("float32", "float16"):
+                    started = time.perf_counter()
+                    rankings = matrices[dtype][user].search(query, args.k, TYPES)
+                    results[f"exact {dtype}"][0].append(time.perf_counter() - started)
+                    ids = [[hit["id"] for hit in ranking] for ranking in rankings]
+                    results[f"exact {dtype}"][1].extend(recall(ids, vectors[user * chunks:(user + 1) * chunks], query, user, args.k))
+
+            for name, (latencies, recalls) in results.items():
+                print(
+                    f"{chunks:>6} {name:<14} {percentile(latencies, 0.5) * 1000:>7.3f} {percentile(latencies, 0.95) * 1000:>7.3f} "
+                    f"{percentile(latencies, 0.99) * 1000:>7.3f} " + (f"{statistics.mean(recalls):>7.3f}" if recalls else f"{'-':>7}")
+                )
+            held = sum(matrix.nbytes for matrix in matrices["float32"].values()) / len(matrices["float32"])
+            print(f"{'':>6} {len(matrices['float32'])} users loaded, {held / 1024:.1f} KiB each as float32")
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Import-time benchmark for the API worker.
+#
+#   python benchmarks/import_time.py [--runs 5] [--max-seconds 3.0]
+#
+# Fails if importing app.main pulls in the embedding model, Chroma or the Groq client,
+# or if the median import time goes over --max-seconds.
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Must only be loaded lazily, on first use
+HEAVY_MODULES = ["torch", "sentence_transformers", "chromadb", "langchain_huggingface", "langchain_chroma", "langchain_groq"]
+
+# Settings are required at import; real values are not needed to import
+DUMMY_ENV = {
+    "GROQ_API_KEY": "benchmark",
+    "MONGODB_URL": "mongodb://localhost:27017",
+    "SECRET_KEY": "benchmark",
+    "CHROMA_HUGGINGFACE_API_KEY": "benchmark",
+}
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(module: str) -> tuple[float, dict]:
+    env = {**DUMMY_ENV, **os.environ}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(proc.stderr[-4000:])
+    total = 0
+    self_times = {}
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        self_times[name] = int(self_us)
+        if len(indent) == 1:
+            total += int(cumulative_us)
+    return total / 1e6, self_times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    median = statistics.median(total for total, _ in runs)
+    self_times = runs[-1][1]
+
+    print(f"import {args.module}: median {median:.3f}s over {args.runs} runs")
+    print("slowest modules (self time):")
+    for name, us in sorted(self_times.items(), key=lambda item: item[1], reverse=True)[:15]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    heavy = [name for name in self_times if name.split(".")[0] in HEAVY_MODULES]
+    failed = False
+    if heavy:
+        print(f"FAIL: eagerly imported {sorted({name.split('.')[0] for name in heavy})}")
+        failed = True
+    if median > args.max_seconds:
+        print(f"FAIL: {median:.3f}s exceeds {args.max_seconds:.3f}s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# Fixture job-page server for the load benchmarks.
+#
+#   python benchmarks/job_pages.py [--port 8809] [--latency-ms 50]
+#
+# Serves the recorded postings in benchmarks/fixtures/pages at /jobs/<name>
+# (backend-engineer has complete JobPosting markup, data-scientist partial
+# markup, the other two none). ?variant=N adds a requisition number to the
+# page so each variant has its own content hash and is scraped and structured
+# again. Responses carry an ETag and answer If-None-Match with 304; the tests
+# also switch to Last-Modified/If-Modified-Since and to chunked bodies.
+import argparse
+import hashlib
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from stub_llm import StubServer  # noqa: E402
+
+PAGES_DIR = Path(__file__).resolve().parent / "fixtures" / "pages"
+LAST_MODIFIED = "Mon, 06 Oct 2025 09:00:00 GMT"
+
+
+class JobPages:
+    def __init__(self, pages_dir: Path = PAGES_DIR, latency_ms: float = 0.0,
+                 etag: bool = True, last_modified: bool = False, chunked: bool = False):
+        self.pages = {path.stem: path.read_text(encoding="utf-8") for path in sorted(pages_dir.glob("*.html"))}
+        self.latency_ms = latency_ms
+        self.etag = etag
+        self.last_modified = last_modified
+        # Chunked bodies have no Content-Length, so size limits must be enforced while reading
+        self.chunked = chunked
+        self.counters = {"requests": 0, "not_modified": 0, "not_found": 0}
+        self.lock = threading.Lock()
+
+    def count(self, key: str):
+        with self.lock:
+            self.counters[key] += 1
+
+    def render(self, name: str, variant: Optional[str]) -> Optional[str]:
+        html = self.pages.get(name)
+        if html is None or not variant:
+            return html
+        return html.replace("</h1>", f"</h1>\n<p>Requisition #{variant}</p>", 1)
+
+    def paths(self, variant: Optional[int] = None) -> list[str]:
+        query = f"?variant={variant}" if variant is not None else ""
+        return [f"/jobs/{name}{query}" for name in self.pages]
+
+    def make_handler(self):
+        pages = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                pages.count("requests")
+                parts = urlsplit(self.path)
+                variant = parse_qs(parts.query).get("variant", [None])[0]
+                html = pages.render(parts.path.rsplit("/", 1)[-1], variant) if parts.path.startswith("/jobs/") else None
+                if pages.latency_ms:
+                    time.sleep(pages.latency_ms / 1000)
+                if html is None:
+                    pages.count("not_found")
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = html.encode("utf-8")
+                validators = {}
+                if pages.etag:
+                    validators["ETag"] = '"%s"' % hashlib.sha1(body).hexdigest()
+                if pages.last_modified:
+                    validators["Last-Modified"] = LAST_MODIFIED
+                # If-None-Match wins over If-Modified-Since when both are sent
+                if "If-None-Match" in self.headers:
+                    not_modified = self.headers["If-None-Match"] == validators.get("ETag")
+                else:
+                    not_modified = "Last-Modified" in validators and self.headers.get("If-Modified-Since") == LAST_MODIFIED
+                if not_modified:
+                    pages.count("not_modified")
+                    self.send_response(304)
+                    for name, value in validators.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                for name, value in validators.items():
+                    self.send_header(name, value)
+                if not pages.chunked:
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for start in range(0, len(body), 16 * 1024):
+                    chunk = body[start:start + 16 * 1024]
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> StubServer:
+        # Starts in a daemon thread; server.server_address has the bound port
+        server = StubServer((host, port), self.make_handler())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8809)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    pages = JobPages(latency_ms=args.latency_ms)
+    server = StubServer((args.host, args.port), pages.make_handler())
+    for path in pages.paths():
+        print(f"http://{args.host}:{args.port}{path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# LLM gateway against the stub server: direct chain calls vs app.core.llm_gateway.
+#
+#   python benchmarks/llm_gateway.py [--requests 200] [--concurrency 50]
+#                                    [--rate-limit-rps 40] [--error-rate 0.05]
+#                                    [--slow-fraction 0.05] [--hedging]
+#
+# Starts benchmarks/stub_llm.py in-process, points GROQ_BASE_URL at it and fires
+# structured-output calls. Reports success rate and latency percentiles for both
+# paths plus the gateway counters and what the stub saw.
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from stub_llm import StubLLM  # noqa: E402
+
+
+def percentile(samples: list[float], p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p * len(samples)))] if samples else 0.0
+
+
+async def drive(call, requests: int, concurrency: int) -> tuple[list[float], int]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one(index):
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call(index)
+            except Exception:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    return latencies, failures
+
+
+def report(name: str, latencies: list[float], failures: int, requests: int, elapsed: float):
+    print(
+        f"{name:<8} ok {len(latencies):>4}/{requests:<4} "
+        f"p50 {percentile(latencies, 0.5) * 1000:>7.0f} ms  p95 {percentile(latencies, 0.95) * 1000:>7.0f} ms  "
+        f"p99 {percentile(latencies, 0.99) * 1000:>7.0f} ms  mean {statistics.mean(latencies) * 1000 if latencies else 0:>7.0f} ms  "
+        f"{requests / elapsed:>6.1f} req/s  failed {failures}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-ms", type=float, default=3000.0)
+    parser.add_argument("--rate-limit-rps", type=float, default=40.0)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--hedging", action="store_true")
+    args = parser.parse_args()
+
+    stub = StubLLM(args.latency_ms, args.jitter_ms, args.slow_fraction, args.slow_ms, args.rate_limit_rps, args.error_rate, seed=1)
+    server = stub.serve()
+    host, port = server.server_address
+    for key, value in {
+        "GROQ_API_KEY": "benchmark",
+        "MONGODB_URL": "mongodb://localhost:27017",
+        "SECRET_KEY": "benchmark",
+        "CHROMA_HUGGINGFACE_API_KEY": "benchmark",
+        "GROQ_BASE_URL": f"http://{host}:{port}",
+        "LLM_HEDGING": str(args.hedging).lower(),
+        "LLM_HEDGE_MIN_SAMPLES": "10",
+        "LLM_HEDGE_MIN_DELAY_SECONDS": "0.3",
+        "LLM_RETRY_BACKOFF_SECONDS": "0.2",
+        "LLM_RETRY_BACKOFF_MAX_SECONDS": "2",
+        "LLM_MAX_ATTEMPTS": "5",
+        "LLM_BREAKER_FAILURES": "50",
+    }.items():
+        os.environ[key] = value
+
+    from app.core.llm import llm
+    from app.core.llm_gateway import ainvoke_structured, gateway
+    from app.models.jobUrl import ExperienceEducationMatch
+    from app.utils.prompts import experience_education_match_prompt
+
+    prompt = experience_education_match_prompt()
+    chain = prompt | llm.with_structured_output(ExperienceEducationMatch)
+
+    def inputs(index):
+        return {"candidate_experience": f"{index % 7} years", "candidate_education": "B.Tech",
+                "jd_experience": "3+ years", "jd_education": "Bachelor's"}
+
+    async def direct(index):
+        return await chain.ainvoke(inputs(index))
+
+    async def through_gateway(index):
+        return await ainvoke_structured("eligibility", prompt, ExperienceEducationMatch, inputs(index))
+
+    print(f"stub: {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, {args.slow_fraction:.0%} at {args.slow_ms:.0f} ms, "
+          f"{args.rate_limit_rps:g} req/s limit, {args.error_rate:.0%} errors; "
+          f"{args.requests} requests at concurrency {args.concurrency}")
+
+    async def run_all():
+        # One event loop for both runs: the pooled HTTP client is bound to it
+        for name, call in (("direct", direct), ("gateway", through_gateway)):
+            before = dict(stub.counters)
+            started = time.perf_counter()
+            latencies, failures = await drive(call, args.requests, args.concurrency)
+            report(name, latencies, failures, args.requests, time.perf_counter() - started)
+            print(f"{'':<8} stub saw {({key: stub.counters[key] - before[key] for key in before})}")
+            # Let the rate limiter refill between runs
+            await asyncio.sleep(2)
+
+    asyncio.run(run_all())
+    print("gateway stats:", {key: value for key, value in gateway.stats().items() if key != "latency"})
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+# End-to-end load test of the app with local stand-ins for Groq, Mongo and job sites.
+#
+#   python benchmarks/load.py [--users 20] [--requests 100] [--concurrency 10]
+#                             [--scenarios token upload email] [--unique-pages]
+#                             [--llm-latency-ms 300] [--app-workers 1]
+#                             [--mongodb-url mongodb://localhost:27017]
+#
+# Starts benchmarks/stub_llm.py (canned answers from fixtures/llm_responses.json)
+# and benchmarks/job_pages.py in-process, then the app under uvicorn in a
+# subprocess pointed at them. The app gets its own Mongo database on
+# --mongodb-url (a local mongod; dropped afterwards) and a temporary working
+# directory for Chroma and the embedding cache. The embedding model is loaded
+# for real; --embedding-model picks a smaller one. --app-url skips all of this
+# and drives an app that is already running.
+#
+# Scenarios, run in the order given, each --requests requests at --concurrency:
+#   token   POST /user/token for the benchmark users (bcrypt bound)
+#   upload  POST /resume/upload with generated resume PDFs, then waits for the
+#           queued jobs and reports their queue-to-finish time as well
+#   email   POST /email/generate-email?url=... over the fixture pages; with
+#           --unique-pages every request gets its own page variant, so the job
+#           cache never hits
+# Registering the users is reported as "register". Prints p50/p95/p99, mean and
+# requests/s per endpoint, then the per-stage means from /metrics.
+import argparse
+import asyncio
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import httpx  # noqa: E402
+from job_pages import JobPages  # noqa: E402
+from pdf_corpus import resume_pdf  # noqa: E402
+from stub_llm import StubLLM  # noqa: E402
+
+RESPONSES = ROOT / "benchmarks" / "fixtures" / "llm_responses.json"
+PASSWORD = "benchmark-password"
+FINISHED = {"succeeded", "failed", "superseded"}
+
+
+def percentile(samples: list[float], p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p * len(samples)))] if samples else 0.0
+
+
+class Result:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = []
+        self.statuses = Counter()
+        self.elapsed = 0.0
+
+    def report(self):
+        ok = self.latencies
+        errors = {code: count for code, count in self.statuses.items() if isinstance(code, str) or not 200 <= code < 300}
+        print(
+            f"{self.name:<10} {len(ok):>5}/{sum(self.statuses.values()):<5} "
+            f"p50 {percentile(ok, 0.5) * 1000:>8.0f}  p95 {percentile(ok, 0.95) * 1000:>8.0f}  "
+            f"p99 {percentile(ok, 0.99) * 1000:>8.0f}  mean {statistics.mean(ok) * 1000 if ok else 0:>8.0f} ms  "
+            f"{sum(self.statuses.values()) / self.elapsed if self.elapsed else 0:>7.1f} req/s"
+            + (f"  errors {errors}" if errors else "")
+        )
+
+
+async def drive(name: str, call, requests: int, concurrency: int) -> tuple[Result, list]:
+    # call(index) -> httpx.Response; returns the result and (index, body) of every 2xx response
+    result = Result(name)
+    bodies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await call(index)
+            except httpx.HTTPError as exc:
+                result.statuses[type(exc).__name__] += 1
+                return
+            result.statuses[response.status_code] += 1
+            if 200 <= response.status_code < 300:
+                result.latencies.append(time.perf_counter() - started)
+                bodies.append((index, response.json()))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    result.elapsed = time.perf_counter() - started
+    return result, bodies
+
+
+def start_app(args, llm_url: str, workdir: str) -> tuple[subprocess.Popen, str]:
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "GROQ_API_KEY": "benchmark",
+        "GROQ_BASE_URL": llm_url,
+        "MONGODB_URL": args.mongodb_url,
+        "MONGODB_DATABASE": args.database,
+        "SECRET_KEY": "benchmark",
+        "CHROMA_HUGGINGFACE_API_KEY": "benchmark",
+        "EMBEDDING_MODEL": args.embedding_model,
+        "PRELOAD_RESOURCES": "true",
+        "RESUME_WORKERS": str(args.resume_workers),
+        "RESUME_JOB_POLL_SECONDS": "0.2",
+        "BCRYPT_ROUNDS": str(args.bcrypt_rounds),
+        # Every benchmark request comes from one address
+        "PASSWORD_HASH_PER_KEY_LIMIT": "1000000",
+        "PASSWORD_HASH_MAX_QUEUE": "1000000",
+        "LLM_CACHE_ENABLED": str(args.llm_cache).lower(),
+    }
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+               "--port", str(args.app_port), "--workers", str(args.app_workers), "--log-level", "warning"]
+    # Chroma and the embedding cache use paths relative to the working directory
+    process = subprocess.Popen(command, cwd=workdir, env=env)
+    return process, f"http://127.0.0.1:{args.app_port}"
+
+
+async def wait_ready(client: httpx.AsyncClient, process, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise SystemExit(f"app exited with code {process.returncode}")
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise SystemExit(f"app not ready after {timeout:.0f}s")
+
+
+async def wait_jobs(client: httpx.AsyncClient, jobs: list[tuple[str, str]], timeout: float) -> Result:
+    # Queue-to-finish time from the job documents' own timestamps
+    result = Result("upload job")
+    pending = dict(jobs)
+    started = time.perf_counter()
+    deadline = time.monotonic() + timeout
+    while pending and time.monotonic() < deadline:
+        for job_id, token in list(pending.items()):
+            job = (await client.get(f"/resume/jobs/{job_id}", headers={"Authorization": f"Bearer {token}"})).json()
+            if job.get("status") not in FINISHED:
+                continue
+            del pending[job_id]
+            if job["status"] == "succeeded":
+                result.statuses[200] += 1
+                created = datetime.fromisoformat(job["created_at"])
+                result.latencies.append((datetime.fromisoformat(job["updated_at"]) - created).total_seconds())
+            else:
+                result.statuses[job["status"]] += 1
+        await asyncio.sleep(0.2)
+    result.statuses.update({"unfinished": len(pending)} if pending else {})
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def stage_means(metrics: str) -> list[tuple[str, int, float]]:
+    sums = dict(re.findall(r'jobscribe_stage_duration_seconds_sum\{stage="([^"]+)"\} (\S+)', metrics))
+    counts = dict(re.findall(r'jobscribe_stage_duration_seconds_count\{stage="([^"]+)"\} (\S+)', metrics))
+    return sorted(
+        ((stage, int(counts[stage]), float(sums[stage]) / int(counts[stage])) for stage in counts if int(counts[stage])),
+        key=lambda row: -row[1] * row[2],
+    )
+
+
+async def run(args, base_url: str, pages_url: str, pages: JobPages, process):
+    limits = httpx.Limits(max_connections=args.concurrency + 10)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        await wait_ready(client, process, args.ready_timeout)
+        run_id = int(time.time())
+        emails = [f"bench-{run_id}-{index}@example.com" for index in range(args.users)]
+
+        async def register(index):
+            return await client.post("/user/register", json={"email": emails[index], "password": PASSWORD, "full_name": f"Bench User {index}"})
+
+        results = [(await drive("register", register, args.users, args.concurrency))[0]]
+
+        async def login(index):
+            return await client.post("/user/token", data={"username": emails[index % args.users], "password": PASSWORD})
+
+        # One token per user for the other scenarios, outside the measurements
+        _, bodies = await drive("setup", login, args.users, args.concurrency)
+        tokens = [body["access_token"] for _, body in bodies]
+        if not tokens:
+            raise SystemExit("no user could log in")
+
+        def auth(index) -> dict:
+            return {"Authorization": f"Bearer {tokens[index % len(tokens)]}"}
+
+        async def upload(index):
+            files = {"file": (f"resume-{index}.pdf", resume_pdf(run_id + index, args.resume_pages), "application/pdf")}
+            return await client.post("/resume/upload", files=files, headers=auth(index))
+
+        paths = pages.paths()
+
+        async def email(index):
+            path = pages.paths(index)[index % len(paths)] if args.unique_pages else paths[index % len(paths)]
+            return await client.post("/email/generate-email", params={"url": pages_url + path}, headers=auth(index))
+
+        for scenario in args.scenarios:
+            if scenario == "token":
+                results.append((await drive("token", login, args.requests, args.concurrency))[0])
+            elif scenario == "upload":
+                result, bodies = await drive("upload", upload, args.requests, args.concurrency)
+                results.append(result)
+                # Jobs are only visible to the user that queued them
+                jobs = [(body["job_id"], tokens[index % len(tokens)]) for index, body in bodies]
+                results.append(await wait_jobs(client, jobs, args.job_timeout))
+            elif scenario == "email":
+                results.append((await drive("email", email, args.requests, args.concurrency))[0])
+
+        print(f"\n{args.users} users, {args.requests} requests per scenario at concurrency {args.concurrency}\n")
+        for result in results:
+            result.report()
+
+        metrics = (await client.get("/metrics")).text
+        print(f"\n{'stage':<28} {'count':>7} {'mean ms':>9}" + ("  (one app worker's view)" if args.app_workers > 1 else ""))
+        for stage, count, mean in stage_means(metrics)[:20]:
+            print(f"{stage:<28} {count:>7} {mean * 1000:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", nargs="+", choices=["token", "upload", "email"], default=["token", "upload", "email"])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--unique-pages", action="store_true")
+    parser.add_argument("--resume-pages", type=int, default=2)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-cache", action="store_true", help="leave the LLM response cache on")
+    parser.add_argument("--page-latency-ms", type=float, default=50.0)
+    parser.add_argument("--app-url", help="drive an already running app instead of starting one")
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--app-workers", type=int, default=1)
+    parser.add_argument("--resume-workers", type=int, default=2)
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--mongodb-url", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="emailagent_benchmark")
+    parser.add_argument("--embedding-model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--ready-timeout", type=float, default=300.0)
+    parser.add_argument("--job-timeout", type=float, default=600.0)
+    args = parser.parse_args()
+
+    stub = StubLLM(args.llm_latency_ms, args.llm_jitter_ms, error_rate=args.llm_error_rate,
+                   seed=1, responses=json.loads(RESPONSES.read_text()))
+    llm_server = stub.serve()
+    pages = JobPages(latency_ms=args.page_latency_ms)
+    pages_server = pages.serve()
+    llm_url = "http://%s:%d" % llm_server.server_address
+    pages_url = "http://%s:%d" % pages_server.server_address
+
+    process = None
+    workdir = None
+    base_url = args.app_url
+    if base_url is None:
+        workdir = tempfile.mkdtemp(prefix="jobscribe-load-")
+        process, base_url = start_app(args, llm_url, workdir)
+    try:
+        asyncio.run(run(args, base_url, pages_url, pages, process))
+        # With --app-url the app talks to whatever LLM it was configured with
+        print(f"\n{'' if args.app_url else f'stub LLM saw {stub.counters}, '}page server saw {pages.counters}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+            from pymongo import MongoClient
+            MongoClient(args.mongodb_url).drop_database(args.database)
+            shutil.rmtree(workdir, ignore_errors=True)
+        llm_server.shutdown()
+        pages_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Synthetic PDF corpus shared by the benchmarks.
+#
+# make_pdf() writes filler pages for extraction timing; resume_pdf() writes a
+# resume-shaped document (contact line, experience, projects, skills) for the
+# upload scenarios in benchmarks/load.py. Both are minimal PDF 1.4 files with
+# one Helvetica text stream per page, readable by pdfplumber.
+import io
+import random
+
+WORDS = ("python fastapi kubernetes designed built shipped migrated latency throughput "
+         "pipeline postgres react led mentored reduced improved scaled service").split()
+
+ROLES = ["Software Engineer", "Backend Developer", "Data Engineer", "Platform Engineer", "Full Stack Developer"]
+COMPANIES = ["Acme Freight", "Initech", "Globex", "Umbrella Health", "Hooli", "Vandelay Imports"]
+SKILLS = ["Python", "FastAPI", "Django", "PostgreSQL", "MongoDB", "Redis", "Kafka", "Docker",
+          "Kubernetes", "AWS", "React", "TypeScript", "Terraform", "Go", "Airflow"]
+DEGREES = ["B.Tech in Computer Science", "B.Sc. in Mathematics", "M.Sc. in Computer Science", "BE in Electronics"]
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(pages: list[list[str]]) -> bytes:
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for lines in pages:
+        body = " ".join(f"({_escape(line)}) Tj T*" for line in lines)
+        stream = ("BT /F1 9 Tf 11 TL 40 800 Td " + body + " ET").encode("latin-1", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(pages))
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def make_pdf(pages: int, lines_per_page: int = 45, seed: int = 0) -> bytes:
+    return write_pdf([
+        [
+            f"{page + 1}.{line + 1} " + " ".join(WORDS[(seed + page * 31 + line * 7 + i) % len(WORDS)] for i in range(12))
+            for line in range(lines_per_page)
+        ]
+        for page in range(pages)
+    ])
+
+
+def resume_pdf(seed: int, pages: int = 2) -> bytes:
+    # Deterministic per seed; different seeds give different file hashes and chunks
+    rng = random.Random(seed)
+    lines = [
+        f"Candidate {seed}",
+        f"candidate{seed}@example.com | +1 555 {1000 + seed % 9000:04d} | github.com/candidate{seed}",
+        "",
+        "EXPERIENCE",
+    ]
+    year = 2025
+    for _ in range(2 * pages):
+        start = year - rng.randint(1, 3)
+        lines.append(f"{rng.choice(ROLES)}, {rng.choice(COMPANIES)} ({start} - {year})")
+        for _ in range(4):
+            lines.append("- " + " ".join(rng.choice(WORDS) for _ in range(14)).capitalize())
+        year = start
+    lines += ["", "PROJECTS"]
+    for index in range(3):
+        lines.append(f"Project {seed}-{index}: " + " ".join(rng.choice(WORDS) for _ in range(16)))
+    lines += ["", "SKILLS", ", ".join(rng.sample(SKILLS, 8)), "", "EDUCATION", f"{rng.choice(DEGREES)}, State University ({year - 4} - {year})"]
+    per_page = -(-len(lines) // pages)
+    return write_pdf([lines[start:start + per_page] for start in range(0, len(lines), per_page)])
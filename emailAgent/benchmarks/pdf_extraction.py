@@ -0,0 +1,79 @@
+# PDF extraction benchmark over synthetic multi-page resumes.
+#
+#   python benchmarks/pdf_extraction.py [--pages 1 4 16 50] [--repeat 3]
+#
+# Compares the previous serial pdfplumber loop (text += page) with
+# app.utils.extract_text_pdf, cold and with the file-hash cache warm.
+# The Mongo-backed cache is disabled; only the in-process cache is measured.
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+for key, value in {
+    "GROQ_API_KEY": "benchmark",
+    "MONGODB_URL": "mongodb://localhost:27017",
+    "SECRET_KEY": "benchmark",
+    "CHROMA_HUGGINGFACE_API_KEY": "benchmark",
+    "PDF_TEXT_CACHE_PERSIST": "false",
+    "PDF_MAX_PAGES": "1000",
+}.items():
+    os.environ.setdefault(key, value)
+
+import pdfplumber  # noqa: E402
+from app.utils import extract_text_pdf  # noqa: E402
+from pdf_corpus import make_pdf  # noqa: E402
+
+def serial_baseline(data: bytes) -> str:
+    text = ""
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                text += page_text + "\n"
+    return text
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 4, 16, 50])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Start the worker pool outside the measurements; shorter documents never use it
+    extract_text_pdf.extract_text_from_pdf(io.BytesIO(make_pdf(extract_text_pdf.settings.PDF_PARALLEL_MIN_PAGES, seed=-1)))
+
+    print(f"{'pages':>5} {'size KB':>8} {'serial s':>9} {'engine s':>9} {'speedup':>8} {'cached ms':>10}")
+    for pages in args.pages:
+        data = make_pdf(pages)
+        baseline = timed(lambda: serial_baseline(data), args.repeat)
+
+        # A distinct document each run so the hash cache never hits
+        fresh = iter([make_pdf(pages, seed=seed) for seed in range(1, args.repeat + 1)])
+
+        def cold():
+            extract_text_pdf.extract_text_from_pdf(io.BytesIO(next(fresh)))
+
+        engine = timed(cold, args.repeat)
+        assert extract_text_pdf.extract_text_from_pdf(io.BytesIO(data)) == serial_baseline(data)
+        cached = timed(lambda: extract_text_pdf.extract_text_from_pdf(io.BytesIO(data)), args.repeat)
+        print(f"{pages:>5} {len(data) / 1024:>8.1f} {baseline:>9.3f} {engine:>9.3f} {baseline / engine:>7.2f}x {cached * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# Stub Groq/OpenAI-compatible chat completions server.
+#
+#   python benchmarks/stub_llm.py [--port 8808] [--latency-ms 300] [--jitter-ms 100]
+#                                 [--slow-fraction 0.05] [--slow-ms 3000]
+#                                 [--rate-limit-rps 20] [--error-rate 0.02]
+#                                 [--responses benchmarks/fixtures/llm_responses.json]
+#
+# Point the app at it with GROQ_BASE_URL=http://127.0.0.1:8808. Tool calls
+# (with_structured_output / bind_tools) are answered with arguments generated
+# from the tool's JSON schema, streamed when the request asks for it. Canned
+# values from --responses (tool name -> arguments) replace the generated ones
+# field by field. Requests over the rate limit get a 429 with Retry-After, a
+# share of requests get a 500.
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 refuses connections under load tests
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Cancelled hedges and retries hang up mid-response; that is expected here
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+def fake_value(schema: dict, defs: dict, name: str = "value"):
+    if "$ref" in schema:
+        return fake_value(defs[schema["$ref"].split("/")[-1]], defs, name)
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [option for option in schema[key] if option.get("type") != "null"]
+            return fake_value(options[0] if options else {"type": "null"}, defs, name)
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type", "string")
+    if kind == "object":
+        properties = schema.get("properties", {})
+        return {key: fake_value(value, defs, key) for key, value in properties.items()}
+    if kind == "array":
+        return [fake_value(schema.get("items", {}), defs, name) for _ in range(2)]
+    if kind == "integer":
+        return 1
+    if kind == "number":
+        return 1.0
+    if kind == "boolean":
+        return True
+    if kind == "null":
+        return None
+    return f"Stub {name.replace('_', ' ')}"
+
+
+class TokenBucket:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        if self.rate <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class StubLLM:
+    def __init__(self, latency_ms=300.0, jitter_ms=100.0, slow_fraction=0.0, slow_ms=3000.0,
+                 rate_limit_rps=0.0, error_rate=0.0, seed=None, responses=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.slow_fraction = slow_fraction
+        self.slow_ms = slow_ms
+        self.error_rate = error_rate
+        self.responses = responses or {}
+        self.bucket = TokenBucket(rate_limit_rps)
+        self.random = random.Random(seed)
+        self.counters = {"requests": 0, "rate_limited": 0, "errors": 0, "ok": 0}
+        self.lock = threading.Lock()
+
+    def count(self, key: str):
+        with self.lock:
+            self.counters[key] += 1
+
+    def delay(self) -> float:
+        with self.lock:
+            slow = self.random.random() < self.slow_fraction
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, (self.slow_ms if slow else self.latency_ms) + jitter) / 1000
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    def completion(self, request: dict) -> tuple[dict, str]:
+        # Returns (message, finish_reason) for the request
+        tools = request.get("tools") or []
+        if not tools:
+            return {"role": "assistant", "content": "Stub response."}, "stop"
+        function = tools[0]["function"]
+        choice = request.get("tool_choice")
+        if isinstance(choice, dict):
+            wanted = choice.get("function", {}).get("name")
+            function = next((tool["function"] for tool in tools if tool["function"]["name"] == wanted), function)
+        parameters = function.get("parameters", {})
+        arguments = fake_value(parameters, parameters.get("$defs", parameters.get("definitions", {})), function["name"])
+        # Only fields the schema asks for, so partial schemas still validate
+        canned = self.responses.get(function["name"], {})
+        arguments.update({key: value for key, value in canned.items() if key in arguments})
+        return {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": "call_stub",
+                "type": "function",
+                "function": {"name": function["name"], "arguments": json.dumps(arguments)},
+            }],
+        }, "tool_calls"
+
+    def make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, code: int, body: dict, headers=None):
+                payload = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self.send_json(200, stub.counters)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                stub.count("requests")
+                if not self.path.endswith("/chat/completions"):
+                    self.send_json(404, {"error": {"message": "not found"}})
+                    return
+                if not stub.bucket.take():
+                    stub.count("rate_limited")
+                    self.send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit"}}, {"Retry-After": "1"})
+                    return
+                time.sleep(stub.delay())
+                if stub.should_fail():
+                    stub.count("errors")
+                    self.send_json(500, {"error": {"message": "Stub internal error", "type": "server_error"}})
+                    return
+                stub.count("ok")
+                message, finish_reason = stub.completion(request)
+                base = {"id": "chatcmpl-stub", "created": int(time.time()), "model": request.get("model", "stub")}
+                usage = {"prompt_tokens": len(json.dumps(request.get("messages", []))) // 4, "completion_tokens": 50, "total_tokens": 0}
+                usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+                if not request.get("stream"):
+                    self.send_json(200, {
+                        **base,
+                        "object": "chat.completion",
+                        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                        "usage": usage,
+                    })
+                    return
+                self.stream(base, message, finish_reason, usage)
+
+            def stream(self, base: dict, message: dict, finish_reason: str, usage: dict):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                def send(delta: dict, finish=None, extra=None):
+                    chunk = {**base, "object": "chat.completion.chunk",
+                             "choices": [{"index": 0, "delta": delta, "finish_reason": finish}], **(extra or {})}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+
+                send({"role": "assistant", "content": ""})
+                if message.get("tool_calls"):
+                    call = message["tool_calls"][0]
+                    send({"tool_calls": [{"index": 0, "id": call["id"], "type": "function",
+                                          "function": {"name": call["function"]["name"], "arguments": ""}}]})
+                    arguments = call["function"]["arguments"]
+                    for start in range(0, len(arguments), 16):
+                        send({"tool_calls": [{"index": 0, "function": {"arguments": arguments[start:start + 16]}}]})
+                else:
+                    for word in message["content"].split(" "):
+                        send({"content": word + " "})
+                send({}, finish_reason, {"x_groq": {"usage": usage}})
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+        # Starts in a daemon thread; server.server_address has the bound port
+        server = StubServer((host, port), self.make_handler())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--slow-fraction", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=float, default=3000.0)
+    parser.add_argument("--rate-limit-rps", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--responses", help="JSON file of canned tool arguments by tool name")
+    args = parser.parse_args()
+
+    responses = json.loads(open(args.responses).read()) if args.responses else None
+    stub = StubLLM(args.latency_ms, args.jitter_ms, args.slow_fraction, args.slow_ms, args.rate_limit_rps, args.error_rate, responses=responses)
+    server = StubServer((args.host, args.port), stub.make_handler())
+    print(f"Stub LLM on http://{args.host}:{args.port} (set GROQ_BASE_URL to this)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
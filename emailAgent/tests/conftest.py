@@ -0,0 +1,15 @@
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+# The stub servers in benchmarks/ double as test fixtures
+sys.path.insert(0, str(ROOT / "benchmarks"))
+for key, value in {
+    "GROQ_API_KEY": "test",
+    "MONGODB_URL": "mongodb://localhost:27017",
+    "SECRET_KEY": "test",
+    "CHROMA_HUGGINGFACE_API_KEY": "test",
+}.items():
+    os.environ.setdefault(key, value)
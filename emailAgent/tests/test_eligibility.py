@@ -0,0 +1,82 @@
+import asyncio
+import json
+from pathlib import Path
+import pytest
+from app.models.jobUrl import ExperienceEducationMatch, JobData, MatchEnum
+from app.services import eligibility
+from app.services.eligibility import canonical_skill, match_education, match_experience, match_skills
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+YES, NO = MatchEnum.YES, MatchEnum.NO
+BTECH = [{"degree": "B.Tech in Computer Science", "institution": "NIT"}]
+
+
+@pytest.mark.parametrize("candidate, required, expected", [
+    ("3.5", "2+ years", YES),
+    ("1.0", "3-5 years", NO),
+    ("8 months", "1 year", NO),
+    ("8 months", "Entry level", YES),
+    ("4", "Senior Engineer", None),
+    ("1", "Senior Engineer", NO),
+    ("1", "Internship - 6 months", YES),
+    (None, "6 month internship", YES),
+    ("0", "3+ years", None),
+    (0, "2 years", None),
+    (None, "2 years", None),
+    ("2", "Not specified", YES),
+    ("2", "Relevant experience", None),
+])
+def test_match_experience(candidate, required, expected):
+    assert match_experience(candidate, required) == expected
+
+
+@pytest.mark.parametrize("candidate, required, expected", [
+    (BTECH, "Bachelor's degree in Computer Science", YES),
+    (BTECH, "Master's degree", NO),
+    (BTECH, "Master's degree preferred", None),
+    ([{"degree": "Diploma in Electronics"}], "Any graduate", NO),
+    ([{"degree": "PhD in Physics"}], "Bachelor's or Master's", YES),
+    (None, "Bachelor's degree", None),
+    (BTECH, None, YES),
+    (BTECH, "Relevant qualification", None),
+])
+def test_match_education(candidate, required, expected):
+    assert match_education(candidate, required) == expected
+
+
+def test_skill_aliases():
+    assert canonical_skill("React.js") == canonical_skill("ReactJS") == canonical_skill("react")
+    assert canonical_skill("C++") != canonical_skill("C#") != canonical_skill("C")
+    assert match_skills(["k8s", "Python3", "Java"], ["Kubernetes", "Python", "Go"]) == ["Kubernetes", "Python"]
+
+
+def test_local_decisions_agree_with_the_fixtures():
+    with open(FIXTURES / "eligibility.jsonl") as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+    for case in cases:
+        for field, local in (
+            ("experience_match", match_experience(case["candidate_experience"], case["jd_experience"])),
+            ("education_match", match_education(case["candidate_education"], case["jd_education"])),
+        ):
+            if local is not None:
+                assert local.value == case["expected"][field], case
+
+
+def test_only_undecided_fields_come_from_the_llm(monkeypatch):
+    calls = []
+
+    async def fake_llm(name, prompt, schema, inputs):
+        calls.append(inputs)
+        return ExperienceEducationMatch(experience_match=NO, education_match=NO)
+
+    monkeypatch.setattr(eligibility, "ainvoke_structured", fake_llm)
+    job = JobData(job_title="Engineer", company_name="Acme", description="", skills=[], experience_level="3+ years", education="Bachelor's degree")
+
+    decided = asyncio.run(eligibility.check_eligibility({"total_experience": "4", "education": BTECH}, job))
+    assert (decided.experience_match, decided.education_match) == (YES, YES)
+    assert calls == []
+
+    # Unknown experience goes to the LLM; the education decided locally is kept
+    unknown = asyncio.run(eligibility.check_eligibility({"total_experience": "0", "education": BTECH}, job))
+    assert (unknown.experience_match, unknown.education_match) == (NO, YES)
+    assert len(calls) == 1
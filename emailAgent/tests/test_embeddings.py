@@ -0,0 +1,81 @@
+import sqlite3
+import pytest
+from app.core.embeddings import BatchingEmbeddings, DiskEmbeddingCache
+
+
+class FakeModel:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.texts = []
+
+    def embed_documents(self, texts):
+        if self.fail:
+            raise RuntimeError("model failed")
+        self.texts.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class BrokenDiskCache:
+    def __init__(self, error: Exception):
+        self.error = error
+
+    def get(self, key):
+        raise self.error
+
+    def set_many(self, items):
+        raise self.error
+
+
+def make(model, disk_cache=None) -> BatchingEmbeddings:
+    return BatchingEmbeddings(model, max_batch_size=8, max_wait_ms=1, cache_size=100, disk_cache=disk_cache)
+
+
+def test_vectors_are_memoized():
+    model = FakeModel()
+    embeddings = make(model)
+    assert embeddings.embed_documents(["a", "bb", "a"]) == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    embeddings.embed_query("bb")
+    assert sorted(model.texts) == ["a", "bb"]
+
+
+def test_locked_disk_cache_does_not_fail_embedding():
+    embeddings = make(FakeModel(), BrokenDiskCache(sqlite3.OperationalError("database is locked")))
+    assert embeddings.embed_query("abc") == [3.0, 1.0]
+    assert embeddings.stats()["errors"] == 2
+
+
+def test_model_error_reaches_the_caller_and_the_batcher_survives():
+    model = FakeModel(fail=True)
+    embeddings = make(model)
+    with pytest.raises(RuntimeError, match="model failed"):
+        embeddings.embed_query("abc")
+    model.fail = False
+    assert embeddings.embed_query("abc") == [3.0, 1.0]
+    assert embeddings._thread.is_alive()
+
+
+def test_unexpected_batch_error_reaches_the_caller_and_the_batcher_survives():
+    disk_cache = BrokenDiskCache(sqlite3.OperationalError("database is locked"))
+    embeddings = make(FakeModel(), disk_cache)
+    disk_cache.set_many = lambda items: (_ for _ in ()).throw(ValueError("bad row"))
+    with pytest.raises(ValueError, match="bad row"):
+        embeddings.embed_query("abc")
+    assert embeddings._thread.is_alive()
+    disk_cache.set_many = lambda items: None
+    assert embeddings.embed_query("abc") == [3.0, 1.0]
+
+
+def test_disk_cache_round_trip(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    make(FakeModel(), DiskEmbeddingCache(path, 100)).embed_query("abc")
+    model = FakeModel()
+    assert make(model, DiskEmbeddingCache(path, 100)).embed_query("abc") == [3.0, 1.0]
+    assert model.texts == []
+
+
+def test_disk_cache_is_opened_on_first_use(tmp_path):
+    path = tmp_path / "embeddings.sqlite3"
+    disk_cache = DiskEmbeddingCache(str(path), 100)
+    assert not path.exists()
+    assert disk_cache.get("missing") is None
+    assert path.exists()
@@ -0,0 +1,69 @@
+import asyncio
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
+from app.models.jobUrl import JobData, Skill
+from app.services.job_cache import INDEX_OPTIONS_CONFLICT, JobCache, normalize_url
+
+JOB = JobData(job_title="Backend Engineer", company_name="Acme", description="APIs", skills=[Skill(name="Python")], experience_level="2 years")
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.commands = []
+
+    async def command(self, *args, **kwargs):
+        self.commands.append((args, kwargs))
+
+
+class FakeCollection:
+    # Just enough of AsyncCollection for JobCache; the TTL index already exists with another expiry
+    name = "job_cache"
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.database = FakeDatabase()
+        self.docs = {}
+
+    async def create_index(self, keys, **options):
+        if self.fail:
+            raise ServerSelectionTimeoutError("no servers")
+        if "expireAfterSeconds" in options:
+            raise OperationFailure("IndexOptionsConflict", code=INDEX_OPTIONS_CONFLICT)
+
+    async def find_one(self, query, sort=None):
+        if self.fail:
+            raise ServerSelectionTimeoutError("no servers")
+        if "_id" in query:
+            return self.docs.get(query["_id"])
+        return next((doc for doc in self.docs.values() if query["urls"] in doc["urls"]), None)
+
+    async def update_one(self, query, update, upsert=False):
+        if self.fail:
+            raise ServerSelectionTimeoutError("no servers")
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"], "urls": []})
+        doc.update(update["$set"])
+        doc["urls"].append(update["$addToSet"]["urls"])
+
+
+def test_urls_differing_only_in_tracking_are_one_key():
+    assert normalize_url("HTTPS://Jobs.example.com:443/a/?utm_source=x&b=2&a=1") == normalize_url("https://jobs.example.com/a?a=1&b=2")
+
+
+def test_changed_ttl_is_applied_with_coll_mod():
+    collection = FakeCollection()
+    cache = JobCache(collection, maxsize=10, ttl_seconds=60)
+    asyncio.run(cache.put("https://jobs.example.com/a", "page", JOB))
+    (args, kwargs), = collection.database.commands
+    assert args == ("collMod", "job_cache")
+    assert kwargs["index"] == {"keyPattern": {"created_at": 1}, "expireAfterSeconds": 60}
+    # A fresh process finds the entry in Mongo
+    assert asyncio.run(JobCache(collection, maxsize=10, ttl_seconds=60).get_by_url("https://jobs.example.com/a/")) == JOB
+
+
+def test_unreachable_store_is_a_miss():
+    cache = JobCache(FakeCollection(fail=True), maxsize=10, ttl_seconds=60)
+    assert asyncio.run(cache.get_by_url("https://jobs.example.com/a")) is None
+    assert asyncio.run(cache.get_by_content("page")) is None
+    # Writes fail quietly, and the answer is still kept in memory
+    asyncio.run(cache.put("https://jobs.example.com/a", "page", JOB))
+    assert asyncio.run(cache.get_by_content("page")) == JOB
+    assert cache.stats()["errors"] == 3
@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from app.models.jobUrl import JobData, ScrapedPage
+from app.services import email
+from app.utils.job_posting import job_fields_from_ld, missing_job_fields, partial_job_model
+
+POSTING = {
+    "@type": "JobPosting",
+    "title": "Backend Engineer",
+    "hiringOrganization": {"@type": "Organization", "name": "Acme"},
+    "description": "<p>Build <b>APIs</b>. 3+ years of Python.</p>",
+    "skills": "Python, FastAPI",
+    "jobLocation": {"address": {"addressLocality": "Pune", "addressCountry": "IN"}},
+}
+
+
+def posting(**changes) -> dict:
+    return {**POSTING, **changes}
+
+
+@pytest.mark.parametrize("months, expected", [
+    (36, "3+ years"),
+    ("36", "3+ years"),
+    ("36 months", "3+ years"),
+    ("2 years", "2+ years"),
+    (6, "6+ months"),
+])
+def test_months_of_experience(months, expected):
+    fields = job_fields_from_ld(posting(experienceRequirements={"monthsOfExperience": months}))
+    assert fields["experience_level"] == expected
+
+
+def test_unreadable_months_fall_back_to_the_description():
+    fields = job_fields_from_ld(posting(experienceRequirements={"monthsOfExperience": "several"}))
+    assert fields["experience_level"] == "3+ years"
+
+
+def test_repeated_properties_are_joined():
+    fields = job_fields_from_ld(posting(title=["Senior Backend Engineer"], description="APIs"))
+    assert fields["job_title"] == "Senior Backend Engineer"
+    assert fields["experience_level"] == "Senior"
+
+
+def test_markup_without_education_still_asks_the_llm_for_it():
+    fields = job_fields_from_ld(posting())
+    assert missing_job_fields(fields) == ["education"]
+    assert set(partial_job_model(fields).model_fields) == {"responsibilities", "education"}
+    complete = job_fields_from_ld(posting(educationRequirements={"credentialCategory": "bachelor degree"}))
+    assert missing_job_fields(complete) == []
+
+
+def test_malformed_markup_falls_back_to_the_llm(monkeypatch):
+    calls = []
+
+    async def fake_llm(name, prompt, schema, inputs):
+        calls.append(schema)
+        return JobData(job_title="Backend Engineer", company_name="Acme", description="APIs", skills=[], experience_level="3+ years")
+
+    monkeypatch.setattr(email, "ainvoke_structured", fake_llm)
+    page = ScrapedPage(url="https://jobs.example.com/1", text="Backend Engineer at Acme", job_posting=posting(jobLocation=5))
+    job = asyncio.run(email.structure_job(page))
+    # Nothing from the broken markup is trusted; the full schema goes to the LLM
+    assert calls == [JobData]
+    assert job.location is None
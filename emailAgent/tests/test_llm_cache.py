@@ -0,0 +1,40 @@
+import asyncio
+from app.core.llm_cache import llm_cache, llm_cache_bypass
+from app.core.middleware import LLMCacheBypassMiddleware
+from app.models.resumeModels import ResumeSchema
+from app.utils.prompts import resume_categorization_prompt
+
+
+def resume_key(resume_text: str, current_date: str) -> str:
+    inputs = {"resume_text": resume_text, "current_date": current_date}
+    return llm_cache.key("resume_categorization", resume_categorization_prompt(), ResumeSchema, inputs)
+
+
+def test_inputs_the_prompt_does_not_render_are_not_keyed():
+    assert resume_key("resume", "March 03, 2026") == resume_key("resume", "April 29, 2026")
+
+
+def test_resume_key_depends_on_the_resume():
+    assert resume_key("resume", "March 03, 2026") != resume_key("other resume", "March 03, 2026")
+
+
+def bypassed(headers: dict) -> bool:
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(llm_cache_bypass.get())
+
+    scope = {"type": "http", "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()]}
+    asyncio.run(LLMCacheBypassMiddleware(app)(scope, None, None))
+    return seen[0]
+
+
+def test_only_the_explicit_header_bypasses_the_cache():
+    assert bypassed({"X-LLM-Cache": "bypass"})
+    assert not bypassed({"Cache-Control": "no-cache"})
+    assert not bypassed({})
+
+
+def test_uncapped_collection_is_converted():
+    assert llm_cache._check_capped({})
+    assert not llm_cache._check_capped({"capped": True, "size": llm_cache.max_bytes})
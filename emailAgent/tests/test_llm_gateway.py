@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from langchain_groq import ChatGroq
+from stub_llm import StubLLM
+from app.core.llm_gateway import CircuitBreaker, LLMGateway
+from app.models.jobUrl import ExperienceEducationMatch
+from app.utils.prompts import experience_education_match_prompt
+
+INPUTS = {
+    "candidate_experience": "4 years",
+    "candidate_education": "B.Tech",
+    "jd_experience": "3+ years",
+    "jd_education": "Bachelor's",
+}
+RESET_SECONDS = 0.2
+
+
+@pytest.fixture
+def stub():
+    stub = StubLLM(latency_ms=0, jitter_ms=0, error_rate=1.0, seed=1)
+    server = stub.serve()
+    host, port = server.server_address
+    stub.url = f"http://{host}:{port}"
+    yield stub
+    server.shutdown()
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker(failures=2, reset_seconds=RESET_SECONDS)
+
+
+@pytest.fixture
+def gateway(breaker):
+    return LLMGateway(
+        max_concurrency=4,
+        deadline=10.0,
+        max_attempts=1,
+        backoff=0.01,
+        backoff_max=0.01,
+        hedging=False,
+        hedge_percentile=0.95,
+        hedge_min_samples=10,
+        hedge_min_delay=0.1,
+        breaker=breaker,
+    )
+
+
+def make_chain(stub):
+    llm = ChatGroq(model="stub", api_key="test", base_url=stub.url, temperature=0, max_retries=0)
+    return experience_education_match_prompt() | llm.with_structured_output(ExperienceEducationMatch)
+
+
+async def open_breaker(gateway, breaker, chain):
+    for _ in range(breaker.failures):
+        with pytest.raises(Exception):
+            await gateway.ainvoke("eligibility", chain, INPUTS)
+    assert breaker.state == "open"
+    await asyncio.sleep(RESET_SECONDS)
+    assert breaker.state == "half_open"
+
+
+async def cancel_soon(task):
+    # Long enough for the request to reach the stub, well short of its latency
+    await asyncio.sleep(0.2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+def test_cancelled_probe_lets_the_next_call_probe(stub, breaker, gateway):
+    chain = make_chain(stub)
+
+    async def scenario():
+        await open_breaker(gateway, breaker, chain)
+        stub.error_rate = 0.0
+        stub.latency_ms = 2000
+        await cancel_soon(asyncio.ensure_future(gateway.ainvoke("eligibility", chain, INPUTS)))
+
+        stub.latency_ms = 0
+        result = await gateway.ainvoke("eligibility", chain, INPUTS)
+        assert isinstance(result, ExperienceEducationMatch)
+        assert breaker.state == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_abandoned_streaming_probe_lets_the_next_call_probe(stub, breaker, gateway):
+    chain = make_chain(stub)
+
+    async def consume():
+        async for _ in gateway.astream("eligibility", chain, INPUTS):
+            pass
+
+    async def scenario():
+        await open_breaker(gateway, breaker, chain)
+        stub.error_rate = 0.0
+        stub.latency_ms = 2000
+        await cancel_soon(asyncio.ensure_future(consume()))
+
+        stub.latency_ms = 0
+        await consume()
+        assert breaker.state == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_open_breaker_rejects_calls(stub, breaker, gateway):
+    from fastapi import HTTPException
+
+    chain = make_chain(stub)
+
+    async def scenario():
+        for _ in range(breaker.failures):
+            with pytest.raises(Exception):
+                await gateway.ainvoke("eligibility", chain, INPUTS)
+        with pytest.raises(HTTPException) as rejected:
+            await gateway.ainvoke("eligibility", chain, INPUTS)
+        assert rejected.value.status_code == 503
+        assert stub.counters["requests"] == breaker.failures
+
+    asyncio.run(scenario())
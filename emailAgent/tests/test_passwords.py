@@ -0,0 +1,57 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi import HTTPException
+from app.services.passwords import PasswordHasher
+
+
+def make_hasher(**limits) -> PasswordHasher:
+    hasher = PasswordHasher(workers=1, **{"max_queue": 1, "per_key_limit": 1, **limits})
+    # A thread stands in for the bcrypt process; admission does not care which
+    hasher._executor = ThreadPoolExecutor(1)
+    return hasher
+
+
+def test_slot_is_held_until_the_job_finishes():
+    hasher = make_hasher()
+    started = threading.Event()
+    finish = threading.Event()
+
+    def slow():
+        started.set()
+        finish.wait(5)
+        return "hashed"
+
+    async def scenario():
+        waiting = asyncio.create_task(hasher._run(slow, keys=["ip:1"]))
+        await asyncio.to_thread(started.wait, 5)
+        # The client goes away, the hash does not
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert hasher.stats()["queue_depth"] == 1
+        with pytest.raises(HTTPException) as busy:
+            await hasher._run(slow, keys=["ip:2"])
+        assert busy.value.status_code == 503
+
+        finish.set()
+        for _ in range(100):
+            if not hasher._pending:
+                break
+            await asyncio.sleep(0.01)
+        assert hasher._pending == 0 and hasher._per_key == {}
+        assert await hasher._run(slow, keys=["ip:2"]) == "hashed"
+
+    asyncio.run(scenario())
+
+
+def test_per_key_limit():
+    hasher = make_hasher(max_queue=10)
+    release = hasher._admit(["email:a"])
+    with pytest.raises(HTTPException) as limited:
+        hasher._admit(["ip:9", "email:a"])
+    assert limited.value.status_code == 429
+    release()
+    hasher._admit(["ip:9", "email:a"])()
+    assert hasher._per_key == {}
@@ -0,0 +1,64 @@
+import io
+import pytest
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
+from pdf_corpus import make_pdf, write_pdf
+from app.core.config import settings
+from app.utils import extract_text_pdf
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.commands = []
+
+    def command(self, *args, **kwargs):
+        self.commands.append((args, kwargs))
+
+
+class BrokenCollection:
+    # The TTL index exists with another expiry, and every read and write fails
+    name = "pdf_text_cache"
+
+    def __init__(self):
+        self.database = FakeDatabase()
+
+    def create_index(self, keys, **options):
+        raise OperationFailure("IndexOptionsConflict", code=extract_text_pdf.INDEX_OPTIONS_CONFLICT)
+
+    def find_one(self, query):
+        raise ServerSelectionTimeoutError("no servers")
+
+    def update_one(self, *args, **kwargs):
+        raise ServerSelectionTimeoutError("no servers")
+
+
+@pytest.fixture
+def no_pool(monkeypatch):
+    extract_text_pdf._kill_pool()
+    monkeypatch.setattr(settings, "PDF_TEXT_CACHE_PERSIST", False)
+    yield
+    assert extract_text_pdf._pool is None
+    extract_text_pdf._text_cache.clear()
+
+
+def test_empty_pdf_gives_empty_text(no_pool):
+    assert extract_text_pdf.extract_text_from_pdf(io.BytesIO(write_pdf([]))) == ""
+
+
+def test_pool_workers_extract_inline(no_pool, monkeypatch):
+    monkeypatch.setattr(settings, "PDF_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(extract_text_pdf, "_inline", True)
+    text = extract_text_pdf.extract_text_from_pdf(io.BytesIO(make_pdf(4, lines_per_page=3)))
+    assert text.count("\n") == 12
+
+
+def test_broken_cache_store_only_costs_an_extraction(no_pool, monkeypatch):
+    collection = BrokenCollection()
+    monkeypatch.setattr(settings, "PDF_TEXT_CACHE_PERSIST", True)
+    monkeypatch.setattr(extract_text_pdf, "pdf_text_cache_collection", collection)
+    monkeypatch.setattr(extract_text_pdf, "_cache_indexes_ready", False)
+    text = extract_text_pdf.extract_text_from_pdf(io.BytesIO(make_pdf(1, lines_per_page=3)))
+    assert text.startswith("1.1 ")
+    # The changed TTL is applied in place instead of failing every read
+    (args, kwargs), = collection.database.commands
+    assert args == ("collMod", "pdf_text_cache")
+    assert kwargs["index"]["expireAfterSeconds"] == settings.PDF_TEXT_CACHE_TTL_SECONDS
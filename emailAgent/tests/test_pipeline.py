@@ -0,0 +1,82 @@
+import asyncio
+import time
+import pytest
+from app.utils.pipeline import Pipeline, PipelineAborted
+
+
+def test_stages_get_their_inputs_and_independent_ones_overlap():
+    pipeline = Pipeline()
+    finished = []
+
+    @pipeline.stage("job")
+    async def job():
+        await asyncio.sleep(0.1)
+        return "jd"
+
+    @pipeline.stage("profile")
+    async def profile():
+        await asyncio.sleep(0.1)
+        return "profile"
+
+    @pipeline.stage("email", "job", "profile")
+    async def email(jd, user):
+        return f"{jd}+{user}"
+
+    async def on_stage_done(name, value):
+        finished.append(name)
+
+    started = time.perf_counter()
+    results = asyncio.run(pipeline.run(on_stage_done))
+    assert time.perf_counter() - started < 0.18
+    assert results == {"job": "jd", "profile": "profile", "email": "jd+profile"}
+    assert finished[-1] == "email"
+
+
+def test_unknown_dependency_is_rejected():
+    pipeline = Pipeline()
+    with pytest.raises(ValueError, match="unknown stages"):
+        pipeline.stage("email", "job")(lambda job: job)
+
+
+def abortable(error: Exception) -> tuple[Pipeline, list]:
+    pipeline = Pipeline()
+    ran = []
+
+    @pipeline.stage("job")
+    async def job():
+        return "jd"
+
+    @pipeline.stage("eligibility", "job")
+    async def eligibility(jd):
+        raise error
+
+    @pipeline.stage("retrieval", "job")
+    async def retrieval(jd):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            ran.append("retrieval cancelled")
+            raise
+
+    @pipeline.stage("email", "eligibility", "retrieval")
+    async def email(eligible, chunks):
+        ran.append("email")
+
+    return pipeline, ran
+
+
+def test_abort_cancels_sibling_stages():
+    pipeline, ran = abortable(PipelineAborted({"message": "not eligible"}))
+    started = time.perf_counter()
+    with pytest.raises(PipelineAborted) as aborted:
+        asyncio.run(pipeline.run())
+    assert aborted.value.result == {"message": "not eligible"}
+    assert ran == ["retrieval cancelled"]
+    assert time.perf_counter() - started < 1
+
+
+def test_stage_failure_propagates_and_skips_dependents():
+    pipeline, ran = abortable(RuntimeError("LLM down"))
+    with pytest.raises(RuntimeError, match="LLM down"):
+        asyncio.run(pipeline.run())
+    assert "email" not in ran
@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from langchain_core.prompts import PromptTemplate
+from app.core.lazy import Lazy
+from app.utils import prompt_budget
+from app.utils.prompt_budget import afit_prompt, count_tokens, fit_prompt, truncate_tokens
+
+PROMPT = PromptTemplate.from_template("Write to {name} about {job_title}.\nChunks:\n{chunks}\nPosting:\n{description}")
+WORDS = "python services latency kafka mentoring migrations observability".split()
+
+
+@pytest.fixture(autouse=True)
+def length_estimate(monkeypatch):
+    # Token counts from len / 4, so the test needs no BPE download
+    monkeypatch.setattr(prompt_budget, "encoding", Lazy(lambda: None))
+    monkeypatch.setattr(prompt_budget, "_template_tokens", {})
+
+
+def text(words: int) -> str:
+    return " ".join(WORDS[i % len(WORDS)] for i in range(words))
+
+
+def inputs(chunks: list[str], description: str) -> dict:
+    return {"name": "Ada Lovelace", "job_title": "Backend Engineer", "chunks": chunks, "description": description}
+
+
+def test_prompt_fits_the_budget_and_fixed_fields_are_untouched():
+    chunks = [f"- Project {i}: {text(40)}" for i in range(20)]
+    fitted = fit_prompt("test", PROMPT, inputs(chunks, text(2000)), 600, {"chunks": 0.5, "description": 1.0})
+    assert count_tokens(PROMPT.format(**fitted)) <= 600
+    assert fitted["name"] == "Ada Lovelace" and fitted["job_title"] == "Backend Engineer"
+    # Chunks arrive best-first: a prefix is kept, and the description takes what is left
+    kept = fitted["chunks"].split("\n")
+    assert kept == chunks[:len(kept)] and 0 < len(kept) < len(chunks)
+    assert fitted["description"] and count_tokens(PROMPT.format(**fitted)) > 500
+
+
+def test_prompt_under_budget_is_only_rendered():
+    fitted = fit_prompt("small", PROMPT, inputs(["- a", "- b"], "short posting"), 600, {"chunks": 0.5, "description": 1.0})
+    assert fitted["chunks"] == "- a\n- b"
+    assert fitted["description"] == "short posting"
+
+
+def test_duplicate_list_items_are_dropped():
+    fitted = fit_prompt("dupes", PROMPT, inputs(["- Kafka", "-  kafka", "- Go"], ""), 600, {"chunks": 0.5, "description": 1.0})
+    assert fitted["chunks"] == "- Kafka\n- Go"
+
+
+def test_truncation_does_not_end_mid_word():
+    truncated = truncate_tokens(text(100), 20)
+    assert count_tokens(truncated) <= 20
+    assert text(100).startswith(truncated) and truncated.split()[-1] in WORDS
+
+
+def test_afit_prompt_matches_fit_prompt():
+    args = ("async", PROMPT, inputs(["- a"], text(500)), 200, {"chunks": 0.5, "description": 1.0})
+    assert asyncio.run(afit_prompt(*args)) == fit_prompt(*args)
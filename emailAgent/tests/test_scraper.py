@@ -0,0 +1,90 @@
+import asyncio
+import httpx
+import pytest
+from job_pages import JobPages
+from app.core.config import settings
+from app.utils import scraper
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    # Fresh client and conditional cache per test: each test runs its own event loop
+    servers = []
+    scraper._conditional_cache.clear()
+
+    def start(timeout: float = 5.0, **options) -> tuple[JobPages, str]:
+        monkeypatch.setattr(scraper, "http_client", httpx.AsyncClient(timeout=timeout))
+        pages = JobPages(**options)
+        server = pages.serve()
+        servers.append(server)
+        host, port = server.server_address
+        return pages, f"http://{host}:{port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+    scraper._conditional_cache.clear()
+
+
+def download_twice(url: str) -> tuple[str, str]:
+    async def both():
+        return await scraper.download(url), await scraper.download(url)
+
+    return asyncio.run(both())
+
+
+def test_etag_revalidation_reuses_the_cached_body(serve):
+    pages, base = serve(etag=True)
+    first, second = download_twice(f"{base}/jobs/backend-engineer")
+    assert first == second == pages.pages["backend-engineer"]
+    assert pages.counters["requests"] == 2
+    assert pages.counters["not_modified"] == 1
+
+
+def test_last_modified_revalidation_reuses_the_cached_body(serve):
+    pages, base = serve(etag=False, last_modified=True)
+    first, second = download_twice(f"{base}/jobs/frontend-developer")
+    assert first == second == pages.pages["frontend-developer"]
+    assert pages.counters["not_modified"] == 1
+
+
+def test_pages_without_validators_are_fetched_in_full(serve):
+    pages, base = serve(etag=False, last_modified=False)
+    download_twice(f"{base}/jobs/devops-engineer")
+    assert pages.counters["not_modified"] == 0
+    assert f"{base}/jobs/devops-engineer" not in scraper._conditional_cache
+
+
+@pytest.mark.parametrize("chunked", [False, True], ids=["content-length", "chunked"])
+def test_pages_over_the_size_cap_are_rejected(serve, monkeypatch, chunked):
+    pages, base = serve(chunked=chunked)
+    pages.pages["huge"] = "<html><body><p>" + "x" * (64 * 1024) + "</p></body></html>"
+    monkeypatch.setattr(settings, "SCRAPER_MAX_BYTES", 32 * 1024)
+    with pytest.raises(ValueError, match="larger than"):
+        asyncio.run(scraper.download(f"{base}/jobs/huge"))
+    # Pages under the cap still go through
+    assert asyncio.run(scraper.download(f"{base}/jobs/backend-engineer")) == pages.pages["backend-engineer"]
+
+
+def test_slow_pages_time_out(serve):
+    _, base = serve(timeout=0.2, latency_ms=1000)
+    with pytest.raises(httpx.TimeoutException):
+        asyncio.run(scraper.download(f"{base}/jobs/backend-engineer"))
+
+
+def test_json_ld_job_posting_is_used_when_complete(serve):
+    _, base = serve()
+    page = asyncio.run(scraper.fetch_page(f"{base}/jobs/backend-engineer"))
+    assert page.job_posting is not None
+    assert page.job_posting["title"] == "Backend Engineer"
+    assert "Backend Engineer" in page.text
+
+
+def test_main_block_is_extracted_without_markup(serve):
+    _, base = serve()
+    page = asyncio.run(scraper.fetch_page(f"{base}/jobs/frontend-developer"))
+    assert page.job_posting is None
+    assert "React" in page.text
+    # Navigation, filters and the footer are not part of the posting
+    for boilerplate in ("Sign in", "Filter by", "Privacy"):
+        assert boilerplate not in page.text
@@ -0,0 +1,89 @@
+import asyncio
+import time
+import pytest
+from jose import jwt
+from app.core import middleware
+from app.core.config import settings
+from app.core.middleware import AuthMiddleware
+from app.core.user_cache import cache_token, invalidate_user, token_cache, user_cache
+from app.models.user import UserProfile
+from app.utils.lru import TTLCache
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    token_cache.clear()
+    user_cache.clear()
+    yield
+    token_cache.clear()
+    user_cache.clear()
+
+
+@pytest.fixture
+def profiles(monkeypatch):
+    reads = []
+
+    async def aget_profile(email):
+        reads.append(email)
+        return UserProfile(id="1", email=email) if email == "ada@example.com" else None
+
+    monkeypatch.setattr(middleware.users, "aget_profile", aget_profile)
+    return reads
+
+
+def token(email: str, expires_in: float = 600) -> str:
+    return jwt.encode({"sub": email, "exp": time.time() + expires_in}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def call(bearer: str) -> tuple[int, object]:
+    seen = {}
+    sent = []
+
+    async def app(scope, receive, send):
+        seen["user"] = scope["user"]
+        sent.append({"type": "http.response.start", "status": 200})
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "method": "GET", "path": "/email/generate-email", "query_string": b"",
+        "headers": [(b"authorization", f"Bearer {bearer}".encode())],
+    }
+    asyncio.run(AuthMiddleware(app)(scope, None, send))
+    return sent[0]["status"], seen.get("user")
+
+
+def test_profile_is_read_once_until_invalidated(profiles):
+    bearer = token("ada@example.com")
+    assert call(bearer) == (200, UserProfile(id="1", email="ada@example.com"))
+    assert call(bearer)[0] == 200
+    assert profiles == ["ada@example.com"]
+    invalidate_user("ada@example.com")
+    call(bearer)
+    assert profiles == ["ada@example.com", "ada@example.com"]
+
+
+def test_unknown_users_and_bad_tokens_are_rejected(profiles):
+    assert call(token("eve@example.com"))[0] == 401
+    assert call("not-a-jwt")[0] == 401
+    assert "eve@example.com" not in user_cache
+
+
+def test_cached_token_expires_with_the_jwt():
+    cache_token("short", "ada@example.com", time.time() + 0.05)
+    cache_token("expired", "ada@example.com", time.time() - 1)
+    assert token_cache.get("short") == "ada@example.com"
+    assert "expired" not in token_cache
+    time.sleep(0.06)
+    assert "short" not in token_cache
+
+
+def test_lru_evicts_least_recently_used_by_size():
+    cache = TTLCache(10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "xxxx")
+    cache.get("a")
+    cache.set("c", "xxxx")
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.size == 8
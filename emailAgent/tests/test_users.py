@@ -0,0 +1,38 @@
+import asyncio
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from app.repositories import users
+
+
+class UsersWithoutIndex:
+    # users collection whose unique email index cannot be built (existing duplicates)
+    def __init__(self):
+        self.docs = []
+        self.index_attempts = 0
+
+    async def create_index(self, keys, **options):
+        self.index_attempts += 1
+        raise OperationFailure("E11000 duplicate key error", code=11000)
+
+    async def find_one(self, query, projection=None):
+        return next((doc for doc in self.docs if doc["email"] == query["email"]), None)
+
+    async def insert_one(self, doc):
+        doc = {**doc, "_id": ObjectId()}
+        self.docs.append(doc)
+        return type("InsertOneResult", (), {"inserted_id": doc["_id"]})()
+
+
+def test_registration_checks_for_the_email_without_the_index(monkeypatch):
+    collection = UsersWithoutIndex()
+    monkeypatch.setattr(users, "async_users_collection", collection)
+    monkeypatch.setattr(users, "_email_index_ready", False)
+
+    asyncio.run(users.ensure_indexes())
+    asyncio.run(users.insert({"email": "a@example.com"}))
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(users.insert({"email": "a@example.com"}))
+    assert len(collection.docs) == 1
+    # The index is retried on every registration until it can be built
+    assert collection.index_attempts == 3
@@ -0,0 +1,143 @@
+import hashlib
+import random
+import numpy as np
+import pytest
+from app.core import chroma_db
+from app.core.config import settings
+from app.core.lazy import Lazy
+from app.models.jobUrl import JobData, Skill
+from app.models.user import UserProfile
+from app.utils.lru import TTLCache
+from app.vector_db.exact import ExactIndex, UserMatrix
+from app.vector_db import resume
+from app.vector_db.resume import add_resume_to_vector_db, get_user_resumes_from_vector_db
+from app.vector_db.tenancy import tenancy
+
+ALICE = UserProfile(id="alice", email="alice@example.com")
+BOB = UserProfile(id="bob", email="bob@example.com")
+RESUME = {
+    "projects": [
+        {"title": "Search", "description": "Ranking service in Python"},
+        {"title": "Billing", "description": "Invoices on Kafka"},
+    ],
+    "work_experience": [
+        {"role": "Backend Engineer", "company": "Acme", "duration": "2 years", "description": "FastAPI services"},
+    ],
+    "achievements": ["Cut p99 latency by half"],
+    "certifications": ["AWS Developer"],
+}
+JOB = JobData(
+    job_title="Backend Engineer", company_name="Globex", description="APIs", experience_level="2 years",
+    responsibilities=["Build Python services"], skills=[Skill(name="Python"), Skill(name="Kafka")],
+)
+
+
+class HashModel:
+    # Deterministic vectors per text, no model download
+    def __init__(self):
+        self.texts = []
+
+    def embed_documents(self, texts):
+        self.texts.extend(texts)
+        return [self.vector(text) for text in texts]
+
+    @staticmethod
+    def vector(text: str) -> list[float]:
+        rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+        return [rng.uniform(-1.0, 1.0) for _ in range(16)]
+
+
+@pytest.fixture
+def model(tmp_path, monkeypatch):
+    import chromadb
+    client = chromadb.PersistentClient(path=str(tmp_path))
+    model = HashModel()
+    monkeypatch.setattr(chroma_db, "client", Lazy(lambda: client))
+    monkeypatch.setattr(chroma_db.embeddings, "model", model)
+    monkeypatch.setattr(chroma_db.embeddings, "disk_cache", None)
+    monkeypatch.setattr(chroma_db.embeddings, "_memory", TTLCache(1000))
+    chroma_db._stores.clear()
+    chroma_db._collections.clear()
+    yield model
+    chroma_db._stores.clear()
+    chroma_db._collections.clear()
+
+
+def stored_ids(user: UserProfile) -> set[str]:
+    collection = chroma_db.find_chroma_collection(tenancy.collection_name(user.id))
+    return set(collection.get(where=tenancy.where(user.id), include=[])["ids"])
+
+
+def test_reindexing_embeds_only_changed_chunks(model):
+    first = add_resume_to_vector_db(RESUME, ALICE)
+    assert len(first) == len(model.texts) == 5
+    changed = {**RESUME, "certifications": ["AWS Developer", "AWS Developer"], "achievements": ["Led the on-call rotation"]}
+    second = add_resume_to_vector_db(changed, ALICE)
+    # One new chunk embedded; the duplicate certification collapses onto one id
+    assert model.texts[5:] == ["Led the on-call rotation"]
+    assert stored_ids(ALICE) == set(second)
+    assert len(set(first) - set(second)) == 1
+
+
+def test_empty_resume_removes_stale_chunks(model):
+    add_resume_to_vector_db(RESUME, ALICE)
+    add_resume_to_vector_db(RESUME, BOB)
+    assert add_resume_to_vector_db({}, ALICE) == []
+    assert stored_ids(ALICE) == set()
+    assert len(stored_ids(BOB)) == 5
+
+
+def test_empty_resume_creates_no_collection(model):
+    assert add_resume_to_vector_db({}, ALICE) == []
+    assert chroma_db.find_chroma_collection(tenancy.collection_name(ALICE.id)) is None
+
+
+def test_search_finds_only_the_users_chunks(model):
+    add_resume_to_vector_db(RESUME, ALICE)
+    add_resume_to_vector_db({"projects": [{"title": "Kafka", "description": "Python streaming"}]}, BOB)
+    hits = get_user_resumes_from_vector_db(ALICE, JOB)
+    assert len(hits) == 5
+    assert "Kafka: Python streaming" not in {hit["content"] for hit in hits}
+    assert get_user_resumes_from_vector_db(UserProfile(id="carol", email="carol@example.com"), JOB) == []
+
+
+def test_search_without_a_collection_is_empty(model):
+    assert chroma_db.find_chroma_collection(tenancy.collection_name(ALICE.id)) is None
+    assert get_user_resumes_from_vector_db(ALICE, JOB) == []
+
+
+@pytest.fixture
+def exact(model, monkeypatch):
+    index = ExactIndex(max_bytes=1024 * 1024, ttl=600, dtype="float32")
+    monkeypatch.setattr(resume, "exact_index", index)
+    monkeypatch.setattr(settings, "RETRIEVAL_BACKEND", "exact")
+    return index
+
+
+def test_exact_search_agrees_with_chroma(exact, monkeypatch):
+    add_resume_to_vector_db(RESUME, ALICE)
+    add_resume_to_vector_db({"projects": [{"title": "Kafka", "description": "Python streaming"}]}, BOB)
+    found = get_user_resumes_from_vector_db(ALICE, JOB)
+    monkeypatch.setattr(settings, "RETRIEVAL_BACKEND", "chroma")
+    assert found == get_user_resumes_from_vector_db(ALICE, JOB)
+    assert exact.stats()["loads"] == 1
+
+
+def test_reindexing_drops_the_cached_matrix(exact):
+    add_resume_to_vector_db(RESUME, ALICE)
+    before = {hit["content"] for hit in get_user_resumes_from_vector_db(ALICE, JOB)}
+    add_resume_to_vector_db({"achievements": ["Shipped the Kafka migration"]}, ALICE)
+    after = get_user_resumes_from_vector_db(ALICE, JOB)
+    assert [hit["content"] for hit in after] == ["Shipped the Kafka migration"]
+    assert before != after
+    assert exact.stats()["loads"] == 2
+
+
+def test_user_matrix_filters_types_and_keeps_distances():
+    vectors = [HashModel.vector(text) for text in ("a", "b", "c")]
+    metadatas = [{"type": "project"}, {"type": "education"}, None]
+    for dtype in ("float32", "float16"):
+        matrix = UserMatrix(["a", "b", "c"], ["A", "B", "C"], metadatas, vectors, "l2", dtype)
+        (ranking,) = matrix.search(np.asarray([vectors[1]], dtype=np.float32), k=3, types=["project", "education"])
+        assert [hit["id"] for hit in ranking] == ["b", "a"]
+        assert ranking[0]["distance"] == pytest.approx(0.0, abs=1e-2)
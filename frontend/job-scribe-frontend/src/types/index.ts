@@ -112,5 +112,6 @@ export interface ApiResponse<T = any> {
 export interface ResumeUploadResponse {
     filename: string;
     content_type: string;
-    user: User;
+    job_id: string;
+    status: string;
 }
\ No newline at end of file